@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""Benchmark: Graph page load of a full history window, GUI thread time.
+
+Fills the bridge's ring buffers with --minutes of 1 Hz samples for
+--channels series (a full window by default), loads src/ui/Graph.qml on
+the offscreen QPA, then times every stage of showing that window:
+
+    snapshot   historyWindow(): ring buffer copy + hand-off (GUI thread)
+    downsample window_view(): LTTB to --max-points, then the QPointF lists
+               (executor, not the GUI thread)
+    deliver    historyDataChanged -> Graph.qml updateGraph -> charts.fillSeries
+               for every series (GUI thread)
+    render     one frame of the page (software raster here, the GPU on a Pi)
+
+The run fails (exit 1) when snapshot + deliver, the time the GUI thread
+cannot process touch input, goes over --max-ms on any repeat:
+
+    python3 scripts/bench_charts.py
+    python3 scripts/bench_charts.py --max-points 0      # no cap: every sample
+    python3 scripts/bench_charts.py --json charts.json
+
+config.json is neither read nor written; history goes to a temporary directory.
+"""
+import argparse
+import json
+import math
+import os
+import sys
+import threading
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, os.path.join(ROOT, "src"))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from PySide6.QtCore import QUrl  # noqa: E402
+from PySide6.QtQuick import QQuickView  # noqa: E402
+from PySide6.QtWidgets import QApplication  # noqa: E402
+
+from bench_e2e import bench_config, percentile  # noqa: E402
+from bridge import PiFireBridge, _series_points  # noqa: E402
+from fake_pifire import make_server  # noqa: E402
+from history import window_view  # noqa: E402
+
+CHANNELS = ("Grill", "SetPoint", "Probe1", "Probe2", "Probe3", "Probe4", "Probe5", "Probe6")
+
+
+def fill_store(bridge, minutes, channels):
+    """`minutes` of 1 Hz samples ending now, a slow wave per channel."""
+    now_ms = time.time() * 1000
+    count = int(minutes * 60)
+    for i in range(count):
+        x = now_ms - (count - i) * 1000
+        bridge._history_store.append(x, {name: 150 + 80 * math.sin(i / 300.0 + k) + (i % 7) for k, name in enumerate(channels)})
+
+
+def stats(values):
+    return {
+        "avg": round(sum(values) / len(values), 2) if values else 0.0,
+        "p95": round(percentile(values, 95), 2),
+        "max": round(max(values), 2) if values else 0.0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Graph page history load benchmark")
+    parser.add_argument("--minutes", type=float, default=60.0, help="History window (1 Hz samples)")
+    parser.add_argument("--channels", type=int, default=5, help=f"Series, up to {len(CHANNELS)}")
+    parser.add_argument("--max-points", type=int, default=PiFireBridge.HISTORY_MAX_POINTS,
+                        help="Points per series after downsampling, 0 = no cap")
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--max-ms", type=float, default=PiFireBridge.STALL_MS,
+                        help="Budget: GUI thread ms per window load (default: the stall watchdog threshold)")
+    parser.add_argument("--json", help="Write the summary to this file")
+    args = parser.parse_args()
+
+    server = make_server("127.0.0.1", 0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    host = "127.0.0.1:%d" % server.server_address[1]
+
+    app = QApplication(sys.argv)
+    bridge = PiFireBridge(config=bench_config(host))
+    bridge.timer.stop() # Only the ring buffers below feed the graph
+    channels = CHANNELS[:max(1, min(args.channels, len(CHANNELS)))]
+    fill_store(bridge, args.minutes, channels)
+    max_points = args.max_points or 10 ** 9
+    bridge._history_max_points = max_points
+
+    view = QQuickView()
+    view.rootContext().setContextProperty("bridge", bridge)
+    view.resize(800, 480)
+    view.setSource(QUrl.fromLocalFile(os.path.join(ROOT, "src", "ui", "Graph.qml")))
+    if view.status() != QQuickView.Ready:
+        sys.exit("Graph.qml failed to load: " + "; ".join(e.toString() for e in view.errors()))
+    view.show()
+    # First load goes the real way: executor, queued delivery
+    deadline = time.monotonic() + 10
+    while not bridge.historyData and time.monotonic() < deadline:
+        app.processEvents()
+    view.grabWindow()
+
+    points = len(bridge._history_store)
+    print(f"{len(channels)} series x {points} samples, cap {args.max_points or 'none'} points per series")
+    print("{:>6} {:>10} {:>11} {:>9} {:>9} {:>9}".format("repeat", "snapshot", "downsample", "deliver", "render", "gui_ms"))
+    # The executor's result is delivered through _process_response: time that call
+    delivered = []
+
+    def timed_response(result):
+        start = time.perf_counter()
+        bridge._process_response(result)
+        if result.get("history_view"):
+            delivered.append((time.perf_counter() - start) * 1000.0)
+
+    bridge._apiResponseReceived.disconnect(bridge._process_response)
+    bridge._apiResponseReceived.connect(timed_response)
+
+    rows = []
+    for i in range(args.repeat):
+        delivered.clear()
+        start = time.perf_counter()
+        bridge.historyWindow(int(args.minutes))
+        snapshot_ms = (time.perf_counter() - start) * 1000.0
+        deadline = time.monotonic() + 30
+        while not delivered and time.monotonic() < deadline:
+            app.processEvents()
+        if not delivered:
+            sys.exit("historyWindow() result never arrived")
+        deliver_ms = delivered[0]
+
+        start = time.perf_counter()
+        view.grabWindow()
+        render_ms = (time.perf_counter() - start) * 1000.0
+
+        # Same work as the executor task, timed here with nothing else running
+        columns = {name: bridge._history_store.columns(name) for name in bridge._history_store.channels()}
+        start = time.perf_counter()
+        _series_points(window_view(columns, max_points)[0])
+        downsample_ms = (time.perf_counter() - start) * 1000.0
+
+        row = {"snapshot_ms": round(snapshot_ms, 2), "downsample_ms": round(downsample_ms, 2),
+               "deliver_ms": round(deliver_ms, 2), "render_ms": round(render_ms, 2),
+               "gui_ms": round(snapshot_ms + deliver_ms, 2)}
+        rows.append(row)
+        print("{:>6} {snapshot_ms:>10} {downsample_ms:>11} {deliver_ms:>9} {render_ms:>9} {gui_ms:>9}".format(i, **row))
+
+    series_points = {name: len(points) for name, points in bridge._history_points.items()}
+    summary = {
+        "series": len(channels),
+        "samples": points,
+        "max_points": args.max_points,
+        "series_points": series_points,
+        **{key: stats([r[key] for r in rows]) for key in ("snapshot_ms", "downsample_ms", "deliver_ms", "render_ms", "gui_ms")},
+    }
+    over = [r["gui_ms"] for r in rows if r["gui_ms"] > args.max_ms]
+    summary["verdict"] = "FAIL" if over else "PASS"
+    print(json.dumps({k: v for k, v in summary.items() if k != "series_points"}, indent=2))
+    print(f"{summary['verdict']}: GUI thread max {summary['gui_ms']['max']} ms (budget {args.max_ms})")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(summary, f, indent=2)
+
+    bridge.shutdown()
+    server.shutdown()
+    sys.exit(1 if over else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""End-to-end benchmark: headless PiFireBridge against the fake server.
+
+Starts scripts/fake_pifire.py in-process, drives a PiFireBridge on the
+offscreen QPA through a simulated cook (set point changes, a history
+fetch) and reports, per interval and overall:
+
+    poll round-trip time   from the client's per-endpoint latency stats
+    _parse_data time       per applied /api/current payload
+    signals/s              bridge signals emitted
+    threads, RSS           process-wide, from /proc when available
+
+    python3 scripts/bench_e2e.py [--duration 120 --speed 180 --latency 40 --jitter 20]
+    python3 scripts/bench_e2e.py --json results.json   # machine-readable summary
+
+config.json is neither read nor written; history goes to a temporary directory.
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, os.path.join(ROOT, "src"))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from PySide6.QtCore import QTimer, Signal  # noqa: E402
+from PySide6.QtGui import QGuiApplication  # noqa: E402
+
+from bridge import PiFireBridge  # noqa: E402
+from fake_pifire import make_server  # noqa: E402
+
+
+def process_stats():
+    """(threads, rss MB) for this process; /proc on Linux, best effort elsewhere."""
+    try:
+        with open("/proc/self/status", "r") as f:
+            fields = dict(line.split(":", 1) for line in f if ":" in line)
+        return int(fields["Threads"]), int(fields["VmRSS"].split()[0]) / 1024.0
+    except (OSError, KeyError, ValueError):
+        import resource
+        return threading.active_count(), resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0
+
+
+def bench_config(host, transport="poll", prefix="pifire-bench-"):
+    """Bridge settings for a run against `host`, used instead of config.json; history goes to a temporary directory."""
+    return {
+        "server_selection": "custom",
+        "custom_ip": host,
+        "transport": transport,
+        "history_dir": tempfile.mkdtemp(prefix=prefix),
+    }
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(int(len(ordered) * pct / 100.0), len(ordered) - 1)]
+
+
+class Probe:
+    """Counts bridge signals and times _parse_data without changing behaviour."""
+
+    def __init__(self, bridge):
+        self.signals = 0
+        self.parse_ms = []
+        # Public signals are what QML bindings react to
+        for name, attr in vars(type(bridge)).items():
+            if isinstance(attr, Signal) and not name.startswith("_"):
+                getattr(bridge, name).connect(self._count)
+
+        parse = bridge._parse_data
+
+        def timed_parse(data):
+            start = time.perf_counter()
+            parse(data)
+            self.parse_ms.append((time.perf_counter() - start) * 1000)
+
+        bridge._parse_data = timed_parse
+
+    def _count(self, *args):
+        self.signals += 1
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless bridge benchmark against a fake PiFire")
+    parser.add_argument("--duration", type=float, default=120.0, help="Real seconds to run")
+    parser.add_argument("--speed", type=float, default=180.0, help="Simulated seconds per real second")
+    parser.add_argument("--latency", type=float, default=20.0, help="Server response delay (ms)")
+    parser.add_argument("--jitter", type=float, default=10.0, help="Extra random delay 0..jitter (ms)")
+    parser.add_argument("--transport", choices=("poll", "sse"), default="poll")
+    parser.add_argument("--report", type=float, default=10.0, help="Seconds between interval lines")
+    parser.add_argument("--json", help="Write the summary to this file")
+    args = parser.parse_args()
+
+    server = make_server("127.0.0.1", 0, latency_ms=args.latency, jitter_ms=args.jitter, speed=args.speed)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    host = "127.0.0.1:%d" % server.server_address[1]
+
+    app = QGuiApplication(sys.argv)
+    # Settings passed in, not read from config.json: nothing goes to the configured server
+    bridge = PiFireBridge(config=bench_config(host, args.transport))
+    probe = Probe(bridge)
+
+    grill = server.RequestHandlerClass.grill
+    started = time.monotonic()
+    last = {"t": started, "signals": 0, "parses": 0, "step": -1}
+    rows = []
+    set_points = [110, 225, 250, 225, 160]
+
+    def cook_step():
+        # A set point change every 2 simulated hours, plus one history fetch
+        step = int((grill.now() - grill._t0) / 7200.0)
+        if step != last["step"]:
+            last["step"] = step
+            bridge.setTargetTemp(set_points[step % len(set_points)])
+        if len(rows) == 1:
+            bridge.fetchHistory("60")
+
+    def report():
+        now = time.monotonic()
+        dt = now - last["t"]
+        threads, rss = process_stats()
+        current = bridge.latencyStats().get("/api/current", {})
+        parses = probe.parse_ms[last["parses"]:]
+        row = {
+            "t_s": round(now - started, 1),
+            "sim_h": round((grill.now() - grill._t0) / 3600.0, 2),
+            "polls": current.get("count", 0),
+            "rtt_avg_ms": current.get("avg_ms", 0.0),
+            "rtt_max_ms": current.get("max_ms", 0.0),
+            "parse_avg_ms": round(sum(parses) / len(parses), 3) if parses else 0.0,
+            "signals_per_s": round((probe.signals - last["signals"]) / dt, 1) if dt else 0.0,
+            "threads": threads,
+            "rss_mb": round(rss, 1),
+        }
+        rows.append(row)
+        last.update(t=now, signals=probe.signals, parses=len(probe.parse_ms))
+        print("{t_s:>7} {sim_h:>6} {polls:>6} {rtt_avg_ms:>8} {rtt_max_ms:>8} {parse_avg_ms:>8} "
+              "{signals_per_s:>8} {threads:>4} {rss_mb:>7}".format(**row), flush=True)
+        cook_step()
+        if now - started >= args.duration:
+            app.quit()
+
+    print(f"fake PiFire on {host}: latency {args.latency}+{args.jitter} ms, speed x{args.speed}, transport {args.transport}")
+    print("{:>7} {:>6} {:>6} {:>8} {:>8} {:>8} {:>8} {:>4} {:>7}".format(
+        "t_s", "sim_h", "polls", "rtt_avg", "rtt_max", "parse", "sig/s", "thr", "rss_mb"))
+    timer = QTimer()
+    timer.timeout.connect(report)
+    timer.start(int(args.report * 1000))
+    cook_step()
+    app.exec()
+
+    bridge.shutdown()
+    server.shutdown()
+
+    stats = bridge.latencyStats()
+    summary = {
+        "duration_s": round(time.monotonic() - started, 1),
+        "sim_hours": rows[-1]["sim_h"] if rows else 0.0,
+        "latency": stats,
+        "parse_ms": {
+            "count": len(probe.parse_ms),
+            "avg": round(sum(probe.parse_ms) / len(probe.parse_ms), 3) if probe.parse_ms else 0.0,
+            "p95": round(percentile(probe.parse_ms, 95), 3),
+            "max": round(max(probe.parse_ms), 3) if probe.parse_ms else 0.0,
+        },
+        "signals_per_s": round(probe.signals / max(time.monotonic() - started, 1e-9), 1),
+        "threads_max": max((r["threads"] for r in rows), default=0),
+        "rss_mb_first": rows[0]["rss_mb"] if rows else 0.0,
+        "rss_mb_last": rows[-1]["rss_mb"] if rows else 0.0,
+        "intervals": rows,
+    }
+    print(json.dumps({k: v for k, v in summary.items() if k != "intervals"}, indent=2))
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(summary, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""Micro-benchmark: /api/current decode + diff time per payload.
+
+Uses examples/api_current.json (no Qt or network needed):
+
+    python3 scripts/bench_parse.py [--iterations 20000] [--ticks 600 --change-every 5]
+
+The second part measures the raw-body decode stage (payload.PayloadDecoder):
+the cost of a hash hit, a section decode and a full decode, then replays
+--ticks poll bodies where the temperatures move every --change-every ticks
+(Stop / Monitor / Hold) and reports the hit rate and the decode + parse
+time saved against decoding and parsing every body.
+"""
+import argparse
+import copy
+import json
+import os
+import sys
+import timeit
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, os.path.join(ROOT, "src"))
+
+from payload import CURRENT_SECTIONS, DECODER, PayloadDecoder, SectionDecoder, body_hash, loads  # noqa: E402
+from snapshot import decode_current, diff_snapshots  # noqa: E402
+
+
+def load_payload():
+    with open(os.path.join(ROOT, "examples", "api_current.json"), "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def bench(label, fn, iterations):
+    seconds = min(timeit.repeat(fn, number=iterations, repeat=3))
+    per_call_us = seconds / iterations * 1e6
+    print(f"{label:<32} {per_call_us:8.2f} us/payload")
+    return per_call_us
+
+
+def tick_bodies(payload, ticks, change_every):
+    """Serialized poll bodies: temperatures and TS move every `change_every` ticks."""
+    bodies = []
+    data = copy.deepcopy(payload)
+    for i in range(ticks):
+        if i and i % change_every == 0:
+            data["current"]["TS"] += change_every * 1000
+            data["current"]["P"]["Grill"] = round(data["current"]["P"]["Grill"] + 0.3, 1)
+        bodies.append(json.dumps(data, separators=(",", ":")).encode("utf-8"))
+    return bodies
+
+
+def bench_decode_stage(payload, hopper, iterations, ticks, change_every):
+    body = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    moved = copy.deepcopy(payload)
+    moved["current"]["TS"] += 1000
+    moved_body = json.dumps(moved, separators=(",", ":")).encode("utf-8")
+    print(f"\ndecode stage ({DECODER}), body {len(body)} bytes")
+
+    full_us = bench("json.loads (stdlib)", lambda: json.loads(body), iterations)
+    if DECODER != "json":
+        bench(f"loads ({DECODER})", lambda: loads(body), iterations)
+    bench("hash (unchanged body)", lambda: body_hash(body), iterations)
+    sections = SectionDecoder(CURRENT_SECTIONS)
+    sections.decode(body)
+    flip = [moved_body, body]
+
+    def section_decode():
+        flip.reverse()
+        sections.decode(flip[0])
+
+    bench("section decode (TS moved)", section_decode, iterations)
+    parse_us = bench("decode_current (downstream)", lambda: decode_current(payload, hopper), iterations)
+
+    # Old path: json + parse on every tick. New path: hash, decode/parse only changes.
+    bodies = tick_bodies(payload, ticks, change_every)
+    started = timeit.default_timer()
+    for b in bodies:
+        decode_current(json.loads(b), hopper)
+    baseline_ms = (timeit.default_timer() - started) * 1000.0
+
+    decoder = PayloadDecoder(CURRENT_SECTIONS)
+    hits = 0
+    started = timeit.default_timer()
+    for b in bodies:
+        data, changed = decoder.decode(b)
+        if changed:
+            decode_current(data, hopper)
+        else:
+            hits += 1
+    staged_ms = (timeit.default_timer() - started) * 1000.0
+
+    reused, decoded = decoder.sections.sections_reused, decoder.sections.sections_decoded
+    print(f"{ticks} ticks, temps move every {change_every}: hit rate {hits / ticks:.0%}, "
+          f"sections reused on a change {reused}/{reused + decoded}")
+    print(f"decode + parse {baseline_ms:.1f} ms -> {staged_ms:.1f} ms, saved {baseline_ms - staged_ms:.1f} ms "
+          f"({(baseline_ms - staged_ms) / ticks * 1000:.1f} us/tick; full decode + parse is {full_us + parse_us:.1f} us)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark snapshot decode + diff")
+    parser.add_argument("--iterations", type=int, default=20000)
+    parser.add_argument("--ticks", type=int, default=600, help="Simulated poll ticks for the hit rate")
+    parser.add_argument("--change-every", type=int, default=5, help="Ticks between temperature moves")
+    args = parser.parse_args()
+
+    payload = load_payload()
+    changed = copy.deepcopy(payload)
+    changed["current"]["P"]["Grill"] += 1.0
+    for name in changed["current"]["F"]:
+        changed["current"]["F"][name] += 1.0
+    hopper = {"level": 80, "name": "Hickory"}
+
+    base = decode_current(payload, hopper)
+    fields = diff_snapshots(base, decode_current(changed, hopper))
+    print(f"payload: {len(json.dumps(payload))} bytes, changed fields on temp move: {fields}")
+
+    bench("decode", lambda: decode_current(payload, hopper), args.iterations)
+    bench("decode + diff (unchanged)", lambda: diff_snapshots(base, decode_current(payload, hopper)), args.iterations)
+    bench("decode + diff (temps moved)", lambda: diff_snapshots(base, decode_current(changed, hopper)), args.iterations)
+    bench_decode_stage(payload, hopper, args.iterations, args.ticks, max(args.change_every, 1))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+"""Headless behaviour checks for PiFireBridge, no server needed.
+
+Each check drives the bridge through _process_response (and the cached
+endpoints behind it) the way a poll would, then asserts on what QML sees.
+Exits 1 when any check fails:
+
+    python3 scripts/check_bridge.py
+    python3 scripts/check_bridge.py status_recovers     # one check by name
+
+config.json is neither read nor written; history goes to a temporary directory.
+"""
+import json
+import os
+import sys
+import threading
+import time
+import traceback
+from array import array
+
+import requests
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, os.path.join(ROOT, "src"))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from PySide6.QtCore import QCoreApplication  # noqa: E402
+
+from bench_e2e import bench_config  # noqa: E402
+from bridge import PiFireBridge  # noqa: E402
+from commands import Command  # noqa: E402
+from startup import binding_problem  # noqa: E402
+
+
+def load_body():
+    with open(os.path.join(ROOT, "examples", "api_current.json"), "rb") as f:
+        return f.read()
+
+
+def make_bridge():
+    # Nothing listens on the discard port; polling is stopped, results are fed in by hand
+    bridge = PiFireBridge(config=bench_config("127.0.0.1:9"))
+    bridge.timer.stop()
+    return bridge
+
+
+def poll_result(bridge, body):
+    """The result dict _poll() builds for a 200 carrying `body`."""
+    entry = bridge._endpoints["current"]
+    changed = entry.apply(body, time.monotonic())
+    return {"success": True, "data": entry.data if changed else None, "hopper_data": None, "poll": True}
+
+
+def check_status_recovers(bridge):
+    """poll -> error -> poll: the status leaves the error once a good payload arrives."""
+    body = load_body()
+    bridge._process_response(poll_result(bridge, body))
+    good = bridge.status
+    assert not good.startswith("Error"), good
+
+    bridge._process_response({"success": False, "error": "Error: 500", "poll": True})
+    assert bridge.status == "Error: 500", bridge.status
+
+    # Same bytes as before the error: must not be skipped as unchanged
+    seen = []
+    bridge.statusChanged.connect(seen.append)
+    bridge._process_response(poll_result(bridge, body))
+    assert bridge.status == good, bridge.status
+    assert seen == [good], seen
+
+    # And with a payload that did move on
+    data = json.loads(body)
+    data["current"]["P"]["Grill"] = data["current"]["P"]["Grill"] + 5
+    bridge._process_response({"success": False, "error": "Error: 502", "poll": True})
+    bridge._process_response(poll_result(bridge, json.dumps(data).encode("utf-8")))
+    assert bridge.status == good, bridge.status
+
+
+def check_models_row_level(bridge):
+    """One probe moving updates one row / role; timers and notify targets reach their models."""
+    data = json.loads(load_body())
+    bridge._process_response(poll_result(bridge, json.dumps(data).encode("utf-8")))
+    assert bridge.probeModel.count == len(data["current"]["F"]), bridge.probeModel.count
+    targets = [item for item in data["notify_data"] if item["type"].startswith("probe")]
+    assert bridge.notifyModel.count == len(targets), bridge.notifyModel.count
+    assert bridge.timerModel.count == 1, bridge.timerModel.items()
+
+    changes, resets = [], []
+    bridge.probeModel.dataChanged.connect(lambda first, last, roles: changes.append((first.row(), last.row(), list(roles))))
+    bridge.probeModel.rowsInserted.connect(lambda *args: resets.append("insert"))
+    bridge.probeModel.rowsRemoved.connect(lambda *args: resets.append("remove"))
+    data["current"]["F"]["Probe2"] += 3
+    timer = next(item for item in data["notify_data"] if item["type"] == "timer")
+    timer.update(req=True, time_remaining=600)
+    bridge._process_response(poll_result(bridge, json.dumps(data).encode("utf-8")))
+    temp_role = [role for role, name in bridge.probeModel.roleNames().items() if name == b"temp"]
+    assert changes == [(1, 1, temp_role)], changes
+    assert not resets, resets
+    assert bridge.timerModel.count == 1 and bridge.timerModel.get(0)["time_remaining"] == 600, bridge.timerModel.items()
+
+    del data["current"]["F"]["Probe3"]
+    data["status"]["probe_status"]["F"]["Probe3"]["enabled"] = False
+    bridge._process_response(poll_result(bridge, json.dumps(data).encode("utf-8")))
+    assert resets == ["remove"], resets
+    assert bridge.probeModel.count == 2, bridge.probeModel.count
+
+
+def http_response(status_code, body=b""):
+    response = requests.Response()
+    response.status_code = status_code
+    response._content = body
+    return response
+
+
+def check_hopper_missing(bridge):
+    """A 404 on /api/hopper is cached for the hopper ttl instead of refetched every tick."""
+    hopper, current = bridge._endpoints["hopper"], bridge._endpoints["current"]
+    now = time.monotonic()
+    assert hopper.is_due(now)
+    hopper.update(http_response(404), now)
+    assert not hopper.is_due(now + 1)
+    assert not hopper.is_due(now + hopper.ttl - 0.1)
+    assert hopper.is_due(now + hopper.ttl)
+
+    hopper.update(http_response(200, b'{"hopper_level": 40}'), now + hopper.ttl)
+    assert hopper.data == {"hopper_level": 40} and not hopper.is_due(now + hopper.ttl + 1)
+
+    # ttl 0: an error on /api/current is still retried on the next tick
+    current.update(http_response(500), now)
+    assert current.is_due(now)
+
+
+def http_error(status_code):
+    response = requests.Response()
+    response.status_code = status_code
+    return requests.exceptions.HTTPError(f"{status_code} Error", response=response)
+
+
+def check_command_retries(bridge):
+    """Only idempotent commands are retried, and only on no answer or a 5xx."""
+    queue = bridge.commands
+    queue.RETRY_DELAYS = (0.01, 0.01, 0.01)
+    done = threading.Event()
+    outcome = {}
+
+    def run(command, errors):
+        # Fails with errors[0], errors[1], ... then succeeds; returns (attempts, ok)
+        pending = list(errors)
+
+        async def send(command):
+            if pending:
+                raise pending.pop(0)
+
+        def on_done(command, ok, error):
+            outcome["result"] = (command.attempts, ok)
+            done.set()
+
+        done.clear()
+        queue._send, queue._on_done = send, on_done
+        queue.enqueue(command)
+        assert done.wait(5), "command never finished"
+        return outcome["result"]
+
+    def set_point():
+        return Command("set_point", [("/api/control", {})], value=225, idempotent=True)
+
+    def prime():
+        return Command(None, [("/api/control", {})], label="Prime")
+
+    assert run(set_point(), [http_error(503)] * 4) == (4, False)
+    assert run(set_point(), [requests.exceptions.ConnectionError()] * 2) == (3, True)
+    assert run(set_point(), [requests.exceptions.Timeout()]) == (2, True)
+    assert run(set_point(), [http_error(400)]) == (1, False)
+    assert run(prime(), [requests.exceptions.ReadTimeout()]) == (1, False)
+    assert run(Command("mode", [("/api/control", {})], label="Startup"), [http_error(503)]) == (1, False)
+    assert run(prime(), []) == (1, True)
+
+
+def wait_for(predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            raise AssertionError("timed out")
+        QCoreApplication.processEvents()
+        time.sleep(0.001)
+
+
+def check_history_merge(bridge):
+    """A fetched range is spliced in on the executor; live points recorded meanwhile survive."""
+    store = bridge._history_store
+    now_ms = time.time() * 1000
+    for i in range(600):
+        store.append(now_ms - (600 - i) * 1000, {"Grill": 100.0})
+    fetched_x = array("d", (now_ms - (400 - i) * 1000 + 500 for i in range(200)))
+    bridge._merge_history([("Grill", fetched_x, array("d", [200.0] * 200)), ("Probe9", fetched_x, array("d", [50.0] * 200))])
+    assert len(store.columns("Grill")[0]) == 600, "merged on the GUI thread"
+    store.append(now_ms + 1000, {"Grill": 300.0}) # Live point while the merge runs
+    wait_for(lambda: not bridge._history_merges)
+
+    xs, ys = store.columns("Grill")
+    assert list(xs) == sorted(xs)
+    assert xs[-1] == now_ms + 1000 and ys[-1] == 300.0
+    inside = [y for x, y in zip(xs, ys) if fetched_x[0] <= x <= fetched_x[-1]]
+    assert inside == [200.0] * 200, inside[:5]
+    assert len(xs) == 600 - 199 + 200 + 1, len(xs) # 199 old samples fell inside the fetched range
+    assert len(store.columns("Probe9")[0]) == 200
+
+    # Results for a store cleared meanwhile (server switch) are dropped
+    bridge._merge_history([("Grill", fetched_x, array("d", [1.0] * 200))])
+    bridge._open_history()
+    time.sleep(0.2)
+    QCoreApplication.processEvents()
+    assert 1.0 not in store.columns("Grill")[1]
+
+
+CHECKS = {name[len("check_"):]: fn for name, fn in sorted(globals().items()) if name.startswith("check_")}
+
+
+def main():
+    names = sys.argv[1:] or list(CHECKS)
+    unknown = [name for name in names if name not in CHECKS]
+    if unknown:
+        sys.exit("unknown check(s): %s (have: %s)" % (", ".join(unknown), ", ".join(CHECKS)))
+    problem = binding_problem()
+    if problem:
+        sys.exit(problem) # The checks would pass, then the interpreter aborts on exit
+
+    app = QCoreApplication(sys.argv)  # noqa: F841 (results are fed in directly, no event loop)
+    failed = []
+    for name in names:
+        bridge = make_bridge()
+        try:
+            CHECKS[name](bridge)
+            print(f"ok    {name}")
+        except Exception:
+            failed.append(name)
+            print(f"FAIL  {name}\n{traceback.format_exc()}")
+        finally:
+            bridge.shutdown()
+    print(f"{len(names) - len(failed)}/{len(names)} passed")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -21,6 +21,9 @@ echo "--> Setting up virtual environment on remote..."
 # Force remove existing .venv (in case it was copied corrupted) and recreate
 #ssh $TARGET_USER@$TARGET_IP "cd $TARGET_DIR && rm -rf .venv && python3 -m venv .venv && .venv/bin/pip install -r requirements.txt"
 
+# 3. Precompile QML into the disk cache so the next start skips compilation
+echo "--> Precompiling QML..."
+ssh $TARGET_USER@$TARGET_IP "cd $TARGET_DIR && [ -x .venv/bin/python3 ] && QT_QPA_PLATFORM=offscreen .venv/bin/python3 src/main.py --precompile-qml" || echo "    (skipped: run again once the venv is installed)"
 
 echo "=== Deployment Complete ==="
 echo "IMPORTANT: First Time Setup (Run this once on Pi):"
@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+"""Local stand-in PiFire server for offline development.
+
+Serves the payloads from examples/ around a simulated cook (the grill
+follows its set point, probes creep up behind it) so the touch UI has
+something live to show:
+
+    GET  /api/current     status snapshot (examples/api_current.json)
+    GET  /api/hopper      pellet level / type
+    GET  /api/server      server availability
+    GET  /api/stream      server-sent events pushing /api/current
+    POST /api/control     mode / primary_setpoint / s_plus updates
+    POST /api/settings    accepted and ignored
+    POST /history/refresh chart_data for the last num_mins
+
+--latency/--jitter delay every response to mimic a Pi on Wi-Fi, and
+--speed runs the simulated clock faster than real time for long cooks.
+
+Usage:
+    python3 scripts/fake_pifire.py --port 8080 [--latency 40 --jitter 20 --speed 60]
+    # then in the app: Settings > Server Address > Custom "127.0.0.1:8080"
+"""
+import argparse
+import collections
+import copy
+import hashlib
+import json
+import math
+import os
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+EXAMPLES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "examples")
+
+
+def load_example(name):
+    with open(os.path.join(EXAMPLES_DIR, name), "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+class FakeGrill:
+    """Simulated controller, seeded from examples/api_current.json.
+
+    State advances lazily on each request against a clock that runs `speed`
+    times faster than real time. History is kept at HISTORY_STEP_S simulated
+    seconds for /history/refresh.
+    """
+
+    AMBIENT = 20.0
+    GRILL_TAU_S = 300.0 # Grill reaches ~63% of a set point change in 5 simulated minutes
+    PROBE_TAU_S = 3600.0
+    HISTORY_STEP_S = 3.0
+
+    def __init__(self, speed=1.0):
+        self._lock = threading.Lock()
+        self._base = load_example("api_current.json")
+        self.speed = speed
+        self._t0 = time.time()
+        self._sim_last = self._t0
+        current = self._base["current"]
+        status = self._base["status"]
+        self.mode = status.get("mode", "Hold")
+        self.set_point = float(current.get("PSP") or 0)
+        self.s_plus = bool(status.get("s_plus", False))
+        self.grill = float(current["P"]["Grill"])
+        self.probes = dict(current["F"])
+        self.hopper = {"hopper_level": 80, "hopper_pellets": "Hickory"}
+        self.history = collections.deque(maxlen=int(24 * 3600 / self.HISTORY_STEP_S))
+        self._next_sample = self._t0
+
+    def now(self):
+        """Simulated wall clock (s)."""
+        return self._t0 + (time.time() - self._t0) * self.speed
+
+    def _advance(self):
+        # Integrate in HISTORY_STEP_S steps up to the simulated now (caller holds the lock)
+        now = self.now()
+        while self._sim_last < now:
+            dt = min(self.HISTORY_STEP_S, now - self._sim_last)
+            self._sim_last += dt
+            heating = self.mode in ("Hold", "Smoke", "Startup", "Reignite")
+            target = self.set_point if heating and self.set_point else self.AMBIENT
+            self.grill += (target - self.grill) * (1 - math.exp(-dt / self.GRILL_TAU_S))
+            for name, value in self.probes.items():
+                goal = min(self.grill, 95.0) if heating else self.AMBIENT
+                self.probes[name] = value + (goal - value) * (1 - math.exp(-dt / self.PROBE_TAU_S))
+            if self._sim_last >= self._next_sample:
+                self._next_sample = self._sim_last + self.HISTORY_STEP_S
+                self.history.append((self._sim_last, self._temps()))
+
+    def _temps(self):
+        wobble = 3.0 * math.sin(self._sim_last / 30.0)
+        temps = {"Grill": round(self.grill + wobble, 1), "SetPoint": self.set_point}
+        temps.update((name, round(value, 1)) for name, value in self.probes.items())
+        return temps
+
+    def current(self):
+        with self._lock:
+            self._advance()
+            data = copy.deepcopy(self._base)
+            temps = self._temps()
+            data["status"]["mode"] = self.mode
+            data["status"]["display_mode"] = self.mode
+            data["status"]["s_plus"] = self.s_plus
+            data["current"]["PSP"] = self.set_point
+            data["current"]["TS"] = int(self._sim_last * 1000)
+        current = data["current"]
+        current["P"]["Grill"] = temps["Grill"]
+        for name in current.get("F", {}):
+            current["F"][name] = temps[name]
+        return data
+
+    def control(self, payload):
+        """Apply an /api/control body; unknown keys are ignored like the real server."""
+        with self._lock:
+            self._advance()
+            if "mode" in payload:
+                self.mode = payload["mode"]
+            if "primary_setpoint" in payload:
+                self.set_point = float(payload["primary_setpoint"])
+            if "s_plus" in payload:
+                self.s_plus = bool(payload["s_plus"])
+        return {"control": payload, "result": "OK"}
+
+    def chart_data(self, num_mins):
+        with self._lock:
+            self._advance()
+            cutoff = self._sim_last - num_mins * 60
+            points = [(ts, temps) for ts, temps in self.history if ts >= cutoff]
+        names = list(points[-1][1]) if points else []
+        return {"chart_data": [
+            {"label": name, "data": [{"x": int(ts * 1000), "y": temps.get(name)} for ts, temps in points]}
+            for name in names
+        ]}
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    grill = None
+    stream_interval = 1.0
+    latency_ms = 0.0
+    jitter_ms = 0.0
+
+    def _delay(self):
+        delay = self.latency_ms + random.uniform(0, self.jitter_ms)
+        if delay > 0:
+            time.sleep(delay / 1000.0)
+
+    def _read_json(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        if not length:
+            return {}
+        try:
+            return json.loads(self.rfile.read(length))
+        except ValueError:
+            return {}
+
+    def _send_json(self, payload, status=200):
+        body = json.dumps(payload).encode("utf-8")
+        etag = '"%s"' % hashlib.md5(body).hexdigest()
+        if status == 200 and self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("ETag", etag)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path != "/api/stream":
+            self._delay()
+        if self.path == "/api/current":
+            self._send_json(self.grill.current())
+        elif self.path == "/api/hopper":
+            self._send_json(self.grill.hopper)
+        elif self.path == "/api/server":
+            self._send_json(load_example("api_server.json"))
+        elif self.path == "/api/stream":
+            self._stream()
+        else:
+            self._send_json({"Error": "Not found"}, status=404)
+
+    def do_POST(self):
+        payload = self._read_json()
+        self._delay()
+        if self.path == "/api/control":
+            self._send_json(self.grill.control(payload))
+        elif self.path == "/api/settings":
+            self._send_json({"settings": payload, "result": "OK"})
+        elif self.path == "/history/refresh":
+            try:
+                num_mins = int(payload.get("num_mins", 60))
+            except (TypeError, ValueError):
+                num_mins = 60
+            self._send_json(self.grill.chart_data(num_mins))
+        else:
+            self._send_json({"Error": "Not found"}, status=404)
+
+    def _stream(self):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+        try:
+            while True:
+                payload = json.dumps(self.grill.current())
+                self.wfile.write(f"event: current\ndata: {payload}\n\n".encode("utf-8"))
+                self.wfile.flush()
+                time.sleep(self.stream_interval)
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def log_message(self, format, *args):
+        pass
+
+
+def make_server(host="127.0.0.1", port=8080, stream_interval=1.0, latency_ms=0.0, jitter_ms=0.0, speed=1.0):
+    handler = type("FakePiFireHandler", (Handler,), {
+        "grill": FakeGrill(speed),
+        "stream_interval": stream_interval,
+        "latency_ms": latency_ms,
+        "jitter_ms": jitter_ms,
+    })
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local stand-in PiFire server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--stream-interval", type=float, default=1.0, help="Seconds between pushed updates")
+    parser.add_argument("--latency", type=float, default=0.0, help="Fixed response delay (ms)")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Extra random delay, 0..jitter (ms)")
+    parser.add_argument("--speed", type=float, default=1.0, help="Simulated seconds per real second")
+    args = parser.parse_args()
+
+    server = make_server(args.host, args.port, args.stream_interval, args.latency, args.jitter, args.speed)
+    print(f"Fake PiFire listening on http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
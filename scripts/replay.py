@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""Replay a recorded cook through a headless PiFireBridge.
+
+Captures are written by the bridge when "capture_dir" is set in
+config.json (one .jsonl.gz per run). Replaying one feeds every recorded
+/api/current, /api/hopper and history payload back into
+_process_response, so field issues reproduce and parsing / QML update
+cost can be measured on real data without a grill:
+
+    python3 scripts/replay.py cook.jsonl.gz              # as fast as possible
+    python3 scripts/replay.py cook.jsonl.gz --speed 10   # 10x recorded speed
+    python3 scripts/replay.py cook.jsonl.gz --qml        # include main.qml bindings
+    python3 scripts/replay.py cook.jsonl.gz --json replay.json
+
+config.json is neither read nor written; replayed history is kept in memory only.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, os.path.join(ROOT, "src"))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from PySide6.QtCore import QTimer, QUrl  # noqa: E402
+from PySide6.QtWidgets import QApplication  # noqa: E402
+
+from bench_e2e import Probe, percentile, process_stats  # noqa: E402
+from grills import GrillManager  # noqa: E402
+from startup import binding_problem  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay a capture through the bridge")
+    parser.add_argument("capture", help="Capture file (.jsonl.gz)")
+    parser.add_argument("--speed", type=float, default=0.0, help="Playback speed, 0 = as fast as possible")
+    parser.add_argument("--qml", action="store_true", help="Load main.qml so binding updates are part of the cost")
+    parser.add_argument("--report", type=float, default=5.0, help="Seconds between progress lines")
+    parser.add_argument("--json", help="Write the summary to this file")
+    args = parser.parse_args()
+    problem = binding_problem()
+    if problem:
+        sys.exit(problem) # A replay emits far faster than polling: it would abort within seconds
+
+    app = QApplication(sys.argv)
+    # Replays from construction on: no poll, stream or lookup ever goes to the configured server
+    grills = GrillManager(parent=app, config={"replay_file": args.capture, "replay_speed": args.speed})
+    bridge = grills.active
+    replay = bridge._replay
+    probe = Probe(bridge)
+
+    engine = None
+    if args.qml:
+        from PySide6.QtQml import QQmlApplicationEngine
+        engine = QQmlApplicationEngine()
+        engine.rootContext().setContextProperty("grills", grills)
+        engine.rootContext().setContextProperty("bridge", bridge)
+        engine.load(QUrl.fromLocalFile(os.path.join(ROOT, "src", "ui", "main.qml")))
+        if not engine.rootObjects():
+            sys.exit("main.qml failed to load")
+
+    replay.finished.connect(app.quit)
+    started = time.monotonic()
+
+    def report():
+        threads, rss = process_stats()
+        elapsed = time.monotonic() - started
+        print(f"{elapsed:7.1f}s {replay.records:>8} records {replay.records / max(elapsed, 1e-9):>9.1f}/s "
+              f"{threads:>3} threads {rss:7.1f} MB", flush=True)
+
+    timer = QTimer()
+    timer.timeout.connect(report)
+    timer.start(int(args.report * 1000))
+    app.exec()
+    report()
+
+    elapsed = time.monotonic() - started
+    grills.shutdown()
+    summary = {
+        "capture": args.capture,
+        "speed": args.speed,
+        "qml": args.qml,
+        "wall_s": round(elapsed, 2),
+        "records": replay.records,
+        "records_per_s": round(replay.records / max(elapsed, 1e-9), 1),
+        "parse_ms": {
+            "count": len(probe.parse_ms),
+            "avg": round(sum(probe.parse_ms) / len(probe.parse_ms), 3) if probe.parse_ms else 0.0,
+            "p95": round(percentile(probe.parse_ms, 95), 3),
+            "max": round(max(probe.parse_ms), 3) if probe.parse_ms else 0.0,
+        },
+        "signals": probe.signals,
+        "signals_per_record": round(probe.signals / max(replay.records, 1), 2),
+    }
+    print(json.dumps(summary, indent=2))
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(summary, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
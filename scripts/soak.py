@@ -0,0 +1,311 @@
+#!/usr/bin/env python3
+"""Soak test: a headless panel against the fake server for many simulated hours.
+
+Runs scripts/fake_pifire.py in a subprocess (so only the panel side is
+measured) and drives the active grill's PiFireBridge through a long cook:
+a mode / set point change every simulated hour, history reloads, and the
+Graph page (real QtCharts series) opened and closed every --page-every
+seconds, with main.qml loaded on the offscreen QPA. Every --sample seconds
+it records:
+
+    traced    Python heap (tracemalloc), MB
+    rss       resident set size, MB
+    threads   process threads (incl. Qt's)
+    fds       open file descriptors
+    objects   gc-tracked Python objects
+    tasks     asyncio tasks alive on the network loop
+    refs_true / refs_none
+              sys.getrefcount(True) / (None); PySide6 6.12.0 on Python 3.11
+              drops a reference on every emit / void call (see requirements.txt)
+
+The first sample after --warmup is the baseline. The run fails (exit 1)
+when, at the end, traced or RSS growth over the baseline, or the thread /
+fd counts, are over budget, or when the refcounts drift down fast enough
+to reach zero within --min-ref-hours (down on every sample since the
+baseline, not just noise). The process exits normally, so a
+crash in interpreter finalization fails the run too (non-zero status).
+The top allocation sites since the baseline are printed either way:
+
+    python3 scripts/soak.py                                  # 10 min, 100 simulated hours
+    python3 scripts/soak.py --duration 3600 --speed 168     # a simulated week in an hour
+    python3 scripts/soak.py --json soak.json --top 25
+
+Server outages are not simulated. config.json is neither read nor written, and history
+goes to a temporary directory.
+"""
+import argparse
+import asyncio
+import gc
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+import tracemalloc
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, os.path.join(ROOT, "src"))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from PySide6.QtCore import QTimer, QUrl  # noqa: E402
+from PySide6.QtWidgets import QApplication  # noqa: E402
+
+from bench_e2e import bench_config, process_stats  # noqa: E402
+from grills import GrillManager  # noqa: E402
+
+MODES = ("startup", "hold", "smoke", "hold", "shutdown", "monitor", "stop")
+SET_POINTS = (110, 225, 250, 225, 160, 180)
+# Where the allocations of interest are not: the tracer itself and imports
+SITE_FILTERS = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>"),
+    tracemalloc.Filter(False, os.path.abspath(__file__)), # The samples kept by this script
+)
+
+
+def start_server(args):
+    """fake_pifire.py on a free local port; returns (process, "127.0.0.1:port")."""
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+    server = subprocess.Popen([
+        sys.executable, os.path.join(os.path.dirname(os.path.abspath(__file__)), "fake_pifire.py"),
+        "--port", str(port), "--speed", str(args.speed),
+        "--latency", str(args.latency), "--jitter", str(args.jitter),
+    ])
+    deadline = time.monotonic() + 10
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.5).close()
+            return server, f"127.0.0.1:{port}"
+        except OSError:
+            time.sleep(0.1)
+    server.kill()
+    sys.exit("fake_pifire.py did not start")
+
+
+def fd_count():
+    try:
+        return len(os.listdir("/proc/self/fd"))
+    except OSError:
+        return 0
+
+
+def loop_tasks(client):
+    async def count():
+        return len(asyncio.all_tasks())
+    try:
+        return client.submit(count()).result(timeout=2)
+    except Exception:
+        return -1
+
+
+def ref_drift(samples, key):
+    """Least-squares slope of samples[key] per real hour, the hours until it reaches zero, and
+    whether it went down on every sample (a leak; objects coming and going move it both ways)."""
+    if len(samples) < 2:
+        return 0.0, None, False
+    ts = [row["t_s"] / 3600.0 for row in samples]
+    ys = [row[key] for row in samples]
+    t_avg, y_avg = sum(ts) / len(ts), sum(ys) / len(ys)
+    var = sum((t - t_avg) ** 2 for t in ts)
+    if not var:
+        return 0.0, None, False
+    slope = sum((t - t_avg) * (y - y_avg) for t, y in zip(ts, ys)) / var
+    return slope, (ys[-1] / -slope if slope < 0 else None), all(b < a for a, b in zip(ys, ys[1:]))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Long-running memory / resource soak test")
+    parser.add_argument("--duration", type=float, default=600.0, help="Real seconds to run")
+    parser.add_argument("--speed", type=float, default=600.0, help="Simulated seconds per real second")
+    parser.add_argument("--latency", type=float, default=20.0, help="Server response delay (ms)")
+    parser.add_argument("--jitter", type=float, default=10.0, help="Extra random delay 0..jitter (ms)")
+    parser.add_argument("--transport", choices=("poll", "sse"), default="sse")
+    parser.add_argument("--sample", type=float, default=15.0, help="Seconds between samples")
+    parser.add_argument("--warmup", type=float, default=60.0, help="Seconds before the baseline sample")
+    parser.add_argument("--page-every", type=float, default=20.0, help="Seconds between Graph page open/close, 0 = never")
+    parser.add_argument("--no-qml", action="store_true", help="Bridge only, no main.qml or Graph page")
+    parser.add_argument("--frames", type=int, default=1, help="tracemalloc frames per allocation site")
+    parser.add_argument("--top", type=int, default=15, help="Allocation sites to report")
+    parser.add_argument("--max-traced-mb", type=float, default=4.0, help="Budget: Python heap growth over the baseline")
+    parser.add_argument("--max-rss-mb", type=float, default=24.0, help="Budget: RSS growth over the baseline")
+    parser.add_argument("--max-extra-threads", type=int, default=2, help="Budget: threads over the baseline")
+    parser.add_argument("--max-extra-fds", type=int, default=8, help="Budget: open fds over the baseline")
+    parser.add_argument("--min-ref-hours", type=float, default=168.0,
+                        help="Budget: real hours before the True / None refcounts, at their drift since the baseline, reach zero")
+    parser.add_argument("--json", help="Write the samples and the verdict to this file")
+    args = parser.parse_args()
+
+    tracemalloc.start(max(args.frames, 1))
+    server, host = start_server(args)
+
+    app = QApplication(sys.argv)
+    # Settings passed in, not read from config.json: nothing goes to the configured server
+    config = bench_config(host, args.transport, prefix="pifire-soak-")
+    grills = GrillManager([{"name": "Soak", "address": host}], app, config)
+    bridge = grills.active
+
+    engine = graph = None
+    if not args.no_qml:
+        from PySide6.QtQml import QQmlApplicationEngine
+        from PySide6.QtQuick import QQuickView
+        engine = QQmlApplicationEngine()
+        engine.rootContext().setContextProperty("grills", grills)
+        engine.rootContext().setContextProperty("bridge", bridge)
+        engine.load(QUrl.fromLocalFile(os.path.join(ROOT, "src", "ui", "main.qml")))
+        if not engine.rootObjects():
+            sys.exit("main.qml failed to load")
+        # The Graph page on its own view, opened and closed like a user would
+        graph = QQuickView()
+        graph.rootContext().setContextProperty("bridge", bridge)
+        graph.resize(800, 480)
+
+    graph_url = QUrl.fromLocalFile(os.path.join(ROOT, "src", "ui", "Graph.qml"))
+    started = time.monotonic()
+    state = {"hour": -1, "page": False, "baseline": None, "snapshot": None}
+    samples = []
+
+    def sim_hours():
+        return (time.monotonic() - started) * args.speed / 3600.0
+
+    def cook_step():
+        hour = int(sim_hours())
+        if hour == state["hour"]:
+            return
+        state["hour"] = hour
+        mode = MODES[hour % len(MODES)]
+        if mode == "hold":
+            bridge.setTargetTemp(SET_POINTS[hour % len(SET_POINTS)]) # Also switches to Hold
+        else:
+            bridge.sendCommand(mode)
+        if hour % 3 == 0:
+            bridge.reloadHistory("60")
+
+    def toggle_page():
+        state["page"] = not state["page"]
+        graph.setSource(graph_url if state["page"] else QUrl())
+        if state["page"]:
+            graph.show()
+        else:
+            graph.hide()
+
+    def sample():
+        gc.collect()
+        refs_true, refs_none = sys.getrefcount(True), sys.getrefcount(None)
+        threads, rss = process_stats()
+        traced, _ = tracemalloc.get_traced_memory()
+        row = {
+            "t_s": round(time.monotonic() - started, 1),
+            "sim_h": round(sim_hours(), 1),
+            "traced_mb": round(traced / 2 ** 20, 2),
+            "rss_mb": round(rss, 1),
+            "threads": threads,
+            "fds": fd_count(),
+            "objects": len(gc.get_objects()),
+            "tasks": loop_tasks(grills.client),
+            "refs_true": refs_true,
+            "refs_none": refs_none,
+            "history_points": len(bridge._history_store),
+            "updates": bridge.metrics.histogram("http_ms", "/api/current")["count"] + bridge.metrics.counter("stream_events", "current"),
+        }
+        samples.append(row)
+        print("{t_s:>7} {sim_h:>7} {traced_mb:>8} {rss_mb:>7} {threads:>4} {fds:>4} {objects:>8} {tasks:>5} "
+              "{refs_true:>7} {refs_none:>7} {history_points:>7} {updates:>7}".format(**row), flush=True)
+        if state["baseline"] is None and row["t_s"] >= args.warmup:
+            state["baseline"] = row
+            state["snapshot"] = tracemalloc.take_snapshot().filter_traces(SITE_FILTERS)
+            print("-- baseline --", flush=True)
+        if row["t_s"] >= args.duration:
+            app.quit()
+
+    print(f"fake PiFire on {host}: speed x{args.speed}, {args.duration * args.speed / 3600:.0f} simulated hours, "
+          f"transport {args.transport}, qml {'off' if args.no_qml else 'on'}")
+    print("{:>7} {:>7} {:>8} {:>7} {:>4} {:>4} {:>8} {:>5} {:>7} {:>7} {:>7} {:>7}".format(
+        "t_s", "sim_h", "traced", "rss_mb", "thr", "fds", "objects", "tasks", "r_true", "r_none", "history", "updates"))
+
+    timers = []
+    for interval, callback in ((1.0, cook_step), (args.sample, sample)):
+        timer = QTimer()
+        timer.timeout.connect(callback)
+        timer.start(int(interval * 1000))
+        timers.append(timer)
+    if graph is not None and args.page_every > 0:
+        timer = QTimer()
+        timer.timeout.connect(toggle_page)
+        timer.start(int(args.page_every * 1000))
+        timers.append(timer)
+    cook_step()
+    sample()
+    app.exec()
+
+    final = tracemalloc.take_snapshot().filter_traces(SITE_FILTERS)
+    baseline = state["baseline"] or samples[0]
+    last = samples[-1]
+    growth = {
+        "traced_mb": round(last["traced_mb"] - baseline["traced_mb"], 2),
+        "rss_mb": round(last["rss_mb"] - baseline["rss_mb"], 1),
+        "threads": last["threads"] - baseline["threads"],
+        "fds": last["fds"] - baseline["fds"],
+        "objects": last["objects"] - baseline["objects"],
+        "refs_true": last["refs_true"] - baseline["refs_true"],
+        "refs_none": last["refs_none"] - baseline["refs_none"],
+    }
+    # A binding that leaks them takes the interpreter down once they reach zero
+    since_baseline = samples[samples.index(baseline):]
+    refs = {}
+    for key in ("refs_true", "refs_none"):
+        slope, hours, monotonic = ref_drift(since_baseline, key)
+        refs[key] = {"per_hour": round(slope, 1), "hours_to_zero": round(hours, 1) if hours is not None else None,
+                     "monotonic": monotonic}
+    failures = []
+    if growth["traced_mb"] > args.max_traced_mb:
+        failures.append(f"Python heap grew {growth['traced_mb']} MB (budget {args.max_traced_mb})")
+    if growth["rss_mb"] > args.max_rss_mb:
+        failures.append(f"RSS grew {growth['rss_mb']} MB (budget {args.max_rss_mb})")
+    if growth["threads"] > args.max_extra_threads:
+        failures.append(f"{growth['threads']} more threads (budget {args.max_extra_threads})")
+    if growth["fds"] > args.max_extra_fds:
+        failures.append(f"{growth['fds']} more open fds (budget {args.max_extra_fds})")
+    for key in ("refs_true", "refs_none"):
+        hours = refs[key]["hours_to_zero"]
+        if refs[key]["monotonic"] and hours is not None and hours < args.min_ref_hours:
+            failures.append(f"{key} drifts {refs[key]['per_hour']}/h, zero in {hours} h (budget {args.min_ref_hours} h)")
+
+    sites = []
+    if state["snapshot"] is not None:
+        key = "traceback" if args.frames > 1 else "lineno"
+        for stat in final.compare_to(state["snapshot"], key)[:args.top]:
+            sites.append({
+                "site": " <- ".join(f"{os.path.relpath(f.filename, ROOT) if f.filename.startswith(ROOT) else f.filename}:{f.lineno}"
+                                    for f in stat.traceback),
+                "size_diff_kb": round(stat.size_diff / 1024, 1),
+                "count_diff": stat.count_diff,
+                "size_kb": round(stat.size / 1024, 1),
+            })
+        print(f"\ntop {len(sites)} allocation sites since the baseline:")
+        for site in sites:
+            print(f"{site['size_diff_kb']:>+10} KB {site['count_diff']:>+8} blocks {site['size_kb']:>9} KB  {site['site']}")
+
+    grills.shutdown()
+    server.terminate()
+    server.wait(timeout=5)
+
+    verdict = "FAIL" if failures else "PASS"
+    print(f"\ngrowth since the baseline ({baseline['t_s']} s): {json.dumps(growth)}")
+    print(f"refcount drift: {json.dumps(refs)}")
+    print(verdict + ("".join(f"\n  {f}" for f in failures)))
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"verdict": verdict, "failures": failures, "growth": growth, "refs": refs, "baseline": baseline,
+                       "sites": sites, "samples": samples, "args": vars(args)}, f, indent=2)
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,358 @@
+import asyncio
+import functools
+import ipaddress
+import logging
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from metrics import Metrics
+from payload import PayloadDecoder
+
+log = logging.getLogger("pifire.net")
+
+
+class CachedEndpoint:
+    """Last payload of one GET endpoint plus what is needed to revalidate it.
+
+    ttl is the refresh period in seconds: 0 refreshes on every poll tick,
+    None only when invalidated (on demand). Unchanged payloads are detected
+    through ETag / Last-Modified (304) or, failing that, a hash of the body,
+    so callers can skip decoding and parsing them. `sections` is the
+    endpoint's top-level key order when known (see payload.SectionDecoder).
+    An error answer (e.g. 404 from a server without the endpoint) is cached
+    as well: the endpoint is not due again until its ttl has passed.
+    """
+
+    def __init__(self, path, ttl=0, sections=None):
+        self.path = path
+        self.ttl = ttl
+        self.decoder = PayloadDecoder(sections)
+        self.invalidate()
+
+    def invalidate(self):
+        self.data = None
+        self.missing = False # Last answer was an error status
+        self.fetched_at = 0.0
+        self.etag = None
+        self.last_modified = None
+        self.decoder.reset()
+
+    def is_due(self, now):
+        if self.data is None and not self.missing:
+            return True
+        if self.ttl is None:
+            return False
+        return now - self.fetched_at >= self.ttl
+
+    def request_headers(self):
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+    def update(self, response, now):
+        """Apply a response; returns True only when the payload actually changed."""
+        if response.status_code == 304:
+            self.fetched_at = now
+            return False
+        if response.status_code not in (200, 201):
+            self.fetched_at = now
+            self.missing = True
+            return False
+
+        self.etag = response.headers.get("ETag")
+        self.last_modified = response.headers.get("Last-Modified")
+        return self.apply(response.content, now)
+
+    def apply(self, body, now):
+        """Take a raw body (poll response or pushed event); True when it changed."""
+        self.fetched_at = now
+        self.missing = False
+        self.data, changed = self.decoder.decode(body)
+        return changed
+
+
+class HostResolver:
+    """Cached hostname -> IP lookups on the network loop.
+
+    The first lookup of a name waits for the resolver (mDNS for .local can
+    take hundreds of ms); after that the cached address is returned at once.
+    Entries older than `ttl`, or invalidated after a connection failure, are
+    refreshed in the background while the last known address stays in use.
+    A name that never resolved is retried at most every `retry` seconds.
+    Lookup time is recorded as "resolve_ms" in metrics.
+    """
+
+    def __init__(self, metrics, ttl=300.0, timeout=5.0, retry=10.0):
+        self.metrics = metrics
+        self.ttl = ttl
+        self.timeout = timeout
+        self.retry = retry
+        self._cache = {} # host -> (ip, resolved at, monotonic)
+        self._failed = {} # host -> last failed attempt (monotonic), names with no address yet
+        self._refreshing = {} # host -> Task
+
+    async def lookup(self, host):
+        """IP for host, or None if it never resolved (caller falls back to the name)."""
+        entry = self._cache.get(host)
+        if entry is not None:
+            if time.monotonic() - entry[1] >= self.ttl and host not in self._refreshing:
+                self._refreshing[host] = asyncio.ensure_future(self._refresh(host))
+            return entry[0]
+        task = self._refreshing.get(host)
+        if task is None:
+            if time.monotonic() - self._failed.get(host, float("-inf")) < self.retry:
+                return None
+            task = self._refreshing[host] = asyncio.ensure_future(self._refresh(host))
+        return await asyncio.shield(task)
+
+    def invalidate(self, host):
+        """Re-resolve on the next lookup (keeps serving the old address meanwhile)."""
+        entry = self._cache.get(host)
+        if entry is not None:
+            self._cache[host] = (entry[0], float("-inf"))
+
+    async def _refresh(self, host):
+        loop = asyncio.get_running_loop()
+        start = time.perf_counter()
+        try:
+            try:
+                # IPv4 first: avoids link-local IPv6 answers that need a scope id
+                infos = await asyncio.wait_for(loop.getaddrinfo(host, None, family=socket.AF_INET, type=socket.SOCK_STREAM), self.timeout)
+            except socket.gaierror:
+                infos = await asyncio.wait_for(loop.getaddrinfo(host, None, type=socket.SOCK_STREAM), self.timeout)
+            ip = infos[0][4][0]
+            elapsed_ms = (time.perf_counter() - start) * 1000.0
+            self.metrics.observe("resolve_ms", elapsed_ms, host)
+            previous = self._cache.get(host)
+            if previous is None or previous[0] != ip:
+                log.info("Resolved %s -> %s in %.0f ms", host, ip, elapsed_ms)
+            self._cache[host] = (ip, time.monotonic())
+            self._failed.pop(host, None)
+            return ip
+        except (OSError, asyncio.TimeoutError) as e:
+            self.metrics.inc("resolve_failures", host)
+            log.warning("Resolving %s failed after %.0f ms: %s", host, (time.perf_counter() - start) * 1000.0, e)
+            entry = self._cache.get(host)
+            if entry is None:
+                self._failed[host] = time.monotonic()
+                return None
+            return entry[0]
+        finally:
+            self._refreshing.pop(host, None)
+
+
+def _needs_lookup(host):
+    if not host or host == "localhost":
+        return False
+    try:
+        ipaddress.ip_address(host)
+        return False
+    except ValueError:
+        return True
+
+
+class PiFireClient:
+    """Single asyncio networking engine for the bridge.
+
+    One event loop runs on a dedicated "pifire-net" thread. Requests go out
+    on a shared keep-alive requests.Session (connections and TLS sessions are
+    reused) through a small fixed executor, so there is no per-request thread
+    churn. Every request gets an asyncio timeout, in-flight requests are
+    bounded by a semaphore, and everything is cancelled on close().
+    Request latency and errors are recorded per endpoint into `metrics`
+    ("http_ms" / "http_errors", cancelled requests only as "http_cancelled").
+    Plain-http hostnames are resolved once by a HostResolver and requests go
+    to the cached IP with the original Host header, so the poll path never
+    waits on DNS/mDNS.
+    """
+
+    def __init__(self, max_in_flight=4, timeout=2, metrics=None, hosts=2):
+        self.timeout = timeout
+        self.session = requests.Session()
+        self.session.verify = False
+        # One keep-alive pool per server host (several controllers share a client)
+        adapter = HTTPAdapter(pool_connections=hosts, pool_maxsize=max_in_flight + 1, max_retries=0)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.metrics = metrics if metrics is not None else Metrics()
+        self.resolver = HostResolver(self.metrics)
+
+        # +1 worker so a long-lived stream read never starves polls/commands
+        self._executor = ThreadPoolExecutor(max_workers=max_in_flight + 1, thread_name_prefix="pifire-io")
+        self._loop = asyncio.new_event_loop()
+        self._loop.set_default_executor(self._executor)
+        self._in_flight = None
+        self._closed = False
+        started = threading.Event()
+        self._thread = threading.Thread(target=self._run_loop, args=(max_in_flight, started), name="pifire-net", daemon=True)
+        self._thread.start()
+        started.wait()
+
+    def _run_loop(self, max_in_flight, started):
+        asyncio.set_event_loop(self._loop)
+        self._in_flight = asyncio.Semaphore(max_in_flight)
+        self._loop.call_soon(started.set)
+        self._loop.run_forever()
+
+    # --- Scheduling (any thread) ---
+
+    def submit(self, coro):
+        """Schedule a coroutine on the network loop.
+
+        Returns a concurrent.futures.Future; cancelling it cancels the task.
+        """
+        if self._closed:
+            coro.close()
+            raise RuntimeError("PiFireClient is closed")
+        return asyncio.run_coroutine_threadsafe(coro, self._loop)
+
+    def call_soon(self, fn, *args):
+        """Run a plain callable on the network loop thread."""
+        self._loop.call_soon_threadsafe(fn, *args)
+
+    def prefetch(self, url):
+        """Warm the resolver cache for url's host in the background (any thread)."""
+        host = urlsplit(url).hostname
+        if _needs_lookup(host) and not self._closed:
+            self.submit(self.resolver.lookup(host))
+
+    # --- Coroutines (network loop only) ---
+
+    async def direct_url(self, url, headers=None):
+        """(url, headers) rewritten to the cached IP of an http:// host, Host header preserved.
+
+        https URLs are left alone (certificate / SNI need the name). Raises
+        ConnectionError right away for a name that does not resolve, rather
+        than letting the request block on the system resolver again.
+        """
+        parts = urlsplit(url)
+        if parts.scheme != "http" or not _needs_lookup(parts.hostname):
+            return url, headers
+        ip = await self.resolver.lookup(parts.hostname)
+        if ip is None:
+            raise requests.exceptions.ConnectionError(f"Cannot resolve {parts.hostname}")
+        netloc = f"[{ip}]" if ":" in ip else ip
+        if parts.port:
+            netloc += f":{parts.port}"
+        headers = dict(headers or {}, Host=parts.netloc)
+        return parts._replace(netloc=netloc).geturl(), headers
+
+    def connection_failed(self, url):
+        """Note a connect/timeout failure: the host's address gets re-resolved."""
+        host = urlsplit(url).hostname
+        if host:
+            self.resolver.invalidate(host)
+
+    async def request(self, method, url, endpoint=None, timeout=None, **kwargs):
+        """Request on the pooled session, bounded, timed into `metrics`."""
+        timeout = timeout or self.timeout
+        kwargs["timeout"] = timeout
+        key = endpoint or url
+        async with self._in_flight:
+            start = time.perf_counter()
+            ok = False
+            try:
+                direct, kwargs["headers"] = await self.direct_url(url, kwargs.get("headers"))
+                call = functools.partial(self.session.request, method, direct, **kwargs)
+                # Small grace period over the socket timeout for connect + read
+                response = await asyncio.wait_for(self._loop.run_in_executor(None, call), timeout + 0.5)
+                ok = response.status_code < 400
+                return response
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout, asyncio.TimeoutError):
+                self.connection_failed(url)
+                raise
+            except asyncio.CancelledError:
+                # Superseded by the caller, not a server problem
+                self.metrics.inc("http_cancelled", key)
+                ok = None
+                raise
+            finally:
+                if ok is not None:
+                    self.metrics.observe("http_ms", (time.perf_counter() - start) * 1000.0, key)
+                if ok is False:
+                    self.metrics.inc("http_errors", key)
+
+    async def get(self, url, endpoint=None, **kwargs):
+        return await self.request("GET", url, endpoint, **kwargs)
+
+    async def post(self, url, endpoint=None, **kwargs):
+        return await self.request("POST", url, endpoint, **kwargs)
+
+    async def run_blocking(self, fn, *args):
+        """Run a blocking call (e.g. a stream read) on the engine's executor."""
+        return await self._loop.run_in_executor(None, fn, *args)
+
+    # --- Shutdown ---
+
+    def close(self, timeout=2.0):
+        """Cancel all pending work, stop the loop and release connections."""
+        if self._closed:
+            return
+        self._closed = True
+
+        async def _cancel_all():
+            tasks = [t for t in asyncio.all_tasks() if t is not asyncio.current_task()]
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+        try:
+            asyncio.run_coroutine_threadsafe(_cancel_all(), self._loop).result(timeout)
+        except Exception:
+            pass
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout)
+        if not self._thread.is_alive():
+            self._loop.close()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self.session.close()
+
+
+def _iter_stream_lines(response):
+    # iter_lines() buffers until its chunk is full; read1() hands back whatever
+    # has arrived, so pushed events are seen immediately (urllib3 >= 2).
+    raw = response.raw
+    if hasattr(raw, "read1"):
+        chunks = iter(lambda: raw.read1(8192), b"")
+    else:
+        chunks = response.iter_content(chunk_size=1)
+    pending = b""
+    for chunk in chunks:
+        pending += chunk
+        *lines, pending = pending.split(b"\n")
+        for line in lines:
+            yield line.rstrip(b"\r").decode("utf-8", errors="replace")
+
+
+def iter_sse(response):
+    """Yield (event, data) pairs from a text/event-stream response.
+
+    Only for the "sse" transport: stock PiFire pushes over Socket.IO, so the
+    stream comes from a custom endpoint (see scripts/fake_pifire.py).
+
+    Comment lines (": ping") are swallowed; they only keep the read
+    timeout from firing while the server has nothing new to say.
+    """
+    event = "message"
+    data_lines = []
+    for line in _iter_stream_lines(response):
+        if line == "":
+            if data_lines:
+                yield event, "\n".join(data_lines)
+            event = "message"
+            data_lines = []
+        elif line.startswith(":"):
+            continue
+        elif line.startswith("event:"):
+            event = line[6:].strip()
+        elif line.startswith("data:"):
+            data_lines.append(line[5:].lstrip())
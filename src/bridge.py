@@ -1,14 +1,37 @@
+import asyncio
+import copy
+import functools
 import requests
-import threading
 import time
 import json
+import logging
+import math
 import os
-from PySide6.QtCore import QObject, Signal, Slot, QTimer, Property, Qt
+import re
+from collections import deque
+from urllib.parse import urlsplit
+from PySide6.QtCore import QObject, Signal, Slot, QTimer, Property, Qt, QPointF
+
+from api_client import PiFireClient, CachedEndpoint, iter_sse
+from commands import Command, CommandQueue
+from snapshot import StatusSnapshot, decode_current, diff_snapshots
+from payload import CURRENT_SECTIONS
+from clock import ServerClock
+from models import ProbeListModel, TimerListModel, NotifyTargetModel
+from history import HistoryStore, merged_buffer, normalize_chart_data, series_meta, window_view, lttb
+from history_db import HistoryDB
+from metrics import Metrics, MetricsServer
+from logs import setup_logging, recent_lines
+from connection import ConnectionMonitor, CONNECTED, OFFLINE, PROBING
+from scheduler import PollScheduler
+from capture import CaptureWriter, CaptureReplay
+from watchdog import StallWatchdog
+
+log = logging.getLogger("pifire.bridge")
 
 class PiFireBridge(QObject):
     # Signals to notify QML of property changes
     grillTempChanged = Signal(int)
-    probesChanged = Signal(list)
     setPointChanged = Signal(int)
     modeChanged = Signal(str)
     statusChanged = Signal(str)
@@ -16,7 +39,6 @@ class PiFireBridge(QObject):
     outpinsChanged = Signal(dict)
     sPlusChanged = Signal(bool)
     lidOpenChanged = Signal(bool)
-    timersChanged = Signal(list)
     startupProgressChanged = Signal(float)
     shutdownProgressChanged = Signal(float)
     startTimeChanged = Signal(float)
@@ -25,13 +47,20 @@ class PiFireBridge(QObject):
     modeStartTimeChanged = Signal(float)
     primeProgressChanged = Signal(float)
     hopperChanged = Signal(dict)
+    commandFailed = Signal(str)
+    connectionStateChanged = Signal(str)
+    staleChanged = Signal(bool)
     pModeChanged = Signal(str)
     unitsChanged = Signal(str)
     historyDataChanged = Signal(list)
     historyPointChanged = Signal(dict)
+    historyViewportChanged = Signal(list)
     
+    streamingChanged = Signal(bool)
+
     # Internal Signal for Thread -> Main communication
     _apiResponseReceived = Signal(dict)
+    _streamStateChanged = Signal(bool)
 
     langDataChanged = Signal(dict)
     
@@ -39,11 +68,96 @@ class PiFireBridge(QObject):
     serverAddressChanged = Signal(str)
     serverSelectionChanged = Signal(str)
     
-    def __init__(self, parent=None):
+    POLL_INTERVAL_MS = 100
+    # Adaptive poll scheduler: base interval per grill mode (ms), clamped to
+    # poll_min_ms / poll_max_ms from config.json
+    # (Progress bars and countdowns are interpolated between polls, see _interpolate)
+    MODE_POLL_INTERVALS = {
+        "Prime": 1000,
+        "Startup": 1500,
+        "Reignite": 1500,
+        "Smoke": 1000,
+        "Hold": 1500,
+        "Shutdown": 1000,
+        "Monitor": 2000,
+        "Stop": 5000,
+        "Error": 5000,
+    }
+    DEFAULT_MODE_POLL_MS = 1000
+    COMMAND_BOOST_S = 5.0 # Poll at the minimum interval this long after a command
+    RATE_WINDOW_S = 30.0
+    FAST_RATE = 0.5 # deg/s: grill is moving, halve the interval
+    STEADY_RATE = 0.05 # deg/s: grill is flat, double the interval
+    HISTORY_POLL_MS = 1000 # Graph page needs a point per second
+    # Modes whose progress bar runs on the server clock, advanced locally every INTERPOLATE_MS
+    PROGRESS_MODES = ("Prime", "Startup", "Reignite")
+    INTERPOLATE_MS = 100
+    BACKGROUND_POLL_MS = 5000 # Grills not on screen (multi-grill panel): summary only
+    # Optimistic UI state: how long a value is held against the server's
+    OPTIMISTIC_PENDING_S = 15.0 # ...while its command is queued/retrying
+    OPTIMISTIC_SETTLE_S = 3.0 # ...after the server acknowledged it
+    # Live history: fixed-size ring buffer per channel (1 Hz -> 1 h per channel)
+    HISTORY_CAPACITY = 3600
+    # Points per series handed to the Graph page: about one per pixel of the plot
+    HISTORY_MAX_POINTS = 800
+    # On-disk history: batched writes, retention (overridable in config.json)
+    HISTORY_FLUSH_S = 30.0
+    HISTORY_RETENTION_H = 48
+    HISTORY_MAX_ROWS = 1000000
+    HISTORY_MAX_GAP_S = 30.0 # Holes longer than this are re-fetched from the server
+    # While the push stream is up the timer only refreshes the hopper
+    STREAM_HOPPER_INTERVAL_MS = 5000
+    STREAM_RETRY_MAX = 60.0
+    # GUI event-loop lag is measured as the lateness of this timer
+    LAG_PROBE_MS = 250
+    STALL_MS = 200 # Lag beyond this is a stall: the watchdog records the GUI thread's stack
+
+    # Per-endpoint refresh policy: (path, ttl seconds, top-level key order for
+    # section decoding); ttl 0 = every poll tick, None = on demand
+    ENDPOINT_POLICIES = {
+        "current": ("/api/current", 0, CURRENT_SECTIONS),
+        "hopper": ("/api/hopper", 30, None),
+    }
+
+    # Snapshot field -> (bridge attribute, change signal or None)
+    SNAPSHOT_BINDINGS = {
+        "mode": ("_mode", "modeChanged"),
+        "status": ("_status", "statusChanged"),
+        "outpins": ("_outpins", "outpinsChanged"),
+        "lid_open": ("_lid_open", "lidOpenChanged"),
+        "s_plus": ("_s_plus", "sPlusChanged"),
+        "p_mode": ("_p_mode", "pModeChanged"),
+        "start_duration": ("_start_duration", "startDurationChanged"),
+        "startup_progress": ("_startup_progress", "startupProgressChanged"),
+        "start_time": ("_start_time", "startTimeChanged"),
+        "prime_duration": ("_prime_duration", "primeDurationChanged"),
+        "mode_start_time": ("_mode_start_time", "modeStartTimeChanged"),
+        "prime_progress": ("_prime_progress", "primeProgressChanged"),
+        "units": ("_units", "unitsChanged"),
+        "grill_temp": ("_grill_temp", "grillTempChanged"),
+        "set_point": ("_set_point", "setPointChanged"),
+        "hopper": ("_hopper", "hopperChanged"),
+    }
+    # Snapshot list fields exposed only as row-level QML models: no whole-list signal
+    MODEL_BINDINGS = {
+        "timers": "_timer_model",
+        "probes": "_probe_model",
+        "notify_targets": "_notify_model",
+    }
+
+    def __init__(self, parent=None, grill=None, manager=None, background=False, config=None):
+        """grill: {name, address} from config.json "grills" (None: the single
+        configured server). manager: the GrillManager whose client, metrics and
+        scheduler are shared, None for a standalone bridge. config: settings
+        used instead of config.json, which is then neither read nor written
+        (benchmarks: nothing goes to the configured server)."""
         super().__init__(parent)
-        print("PiFireBridge: Initializing...")
+        log.info("Initializing...")
+        self._grill = grill
+        self._config = config
+        self._manager = manager
+        self._background = background
         self._grill_temp = 0
-        self._probes = []
         self._set_point = 0
         self._mode = "Disconnected"
         self._status = "Connecting..."
@@ -52,7 +166,6 @@ class PiFireBridge(QObject):
         self._outpins = {"fan": False, "auger": False, "igniter": False, "power": False}
         self._s_plus = False
         self._lid_open = False
-        self._timers = []
         self._startup_progress = 0.0
         self._shutdown_progress = 0.0
         self._start_time = 0.0
@@ -60,12 +173,39 @@ class PiFireBridge(QObject):
         self._start_duration = 0
         self._history_active = False
         self._last_history_emit = 0
+        self._history_data = [] # Series meta for QML: [{name, count, minX, maxX, minY, maxY}]
+        self._history_points = {} # name -> [QPointF] behind the current graph, built off the GUI thread
+        self._history_max_points = self.HISTORY_MAX_POINTS # Plot width, last seen by queryHistory
+        self._history_view_generation = 0 # Bumped per historyWindow: older views are dropped
+        self._charts = None # SeriesLoader, created when the Graph page first asks
+        self._history_store = HistoryStore(self.HISTORY_CAPACITY)
+        self._history_merges = [] # Series waiting to be spliced into the store; [0] is on the executor
+        self._history_store_generation = 0 # Bumped when the store is cleared: in-flight merges are dropped
+        self._history_db = None # HistoryDB for the current server, see _open_history
+        self._history_fetch = None # (num_mins, future) of the one in-flight /history/refresh
+        self._history_generation = 0 # Bumped per fetch/cancel: older results are dropped
+        self._clock = ServerClock() # Server time from TS, drives progress between polls
+        self._history_dir = "" # Empty: "history/" next to this file
+        self._history_retention_h = self.HISTORY_RETENTION_H
+        self._history_max_rows = self.HISTORY_MAX_ROWS
+        self._history_window_min = 60
+        self._last_history_flush = time.monotonic()
+        self._last_command_time = 0.0
+        self._temp_samples = deque(maxlen=64) # (monotonic, grill temp) for rate of change
+        self._poll_min_ms = self.POLL_INTERVAL_MS
+        self._poll_max_ms = 5000
         self._mode_start_time = 0.0
         self._prime_progress = 0.0
         self._hopper = {}
         self._hopper_details = {} 
         self._p_mode = "--"
         self._units = "C"
+        # Last applied state, diffed against each new payload
+        self._snapshot = StatusSnapshot()
+        # Row-level models: only changed rows/roles re-bind in QML
+        self._probe_model = ProbeListModel(self)
+        self._timer_model = TimerListModel(self)
+        self._notify_model = NotifyTargetModel(self)
         
         # I18n Init
         self._lang_data = {}
@@ -86,19 +226,90 @@ class PiFireBridge(QObject):
             'Referer': f'{self.base_url}/events/'
         }
         
+        # Transport: "poll" = polling only (the default, all that stock PiFire supports),
+        # "sse" = server-sent events from a custom endpoint at stream_path, with polling
+        # as the fallback. Stock PiFire pushes over Socket.IO only and serves no such
+        # endpoint; it needs a shim like the one in scripts/fake_pifire.py.
+        # "auto" is the old name of "sse".
+        self._transport = "poll"
+        self._stream_path = "/api/stream"
+        self._streaming = False
+        self._stream_future = None
+        self._last_data = None
+
+        # Instrumentation (see metrics.py); optional local HTTP endpoint and on-screen overlay
+        self.metrics = manager.metrics if manager is not None else Metrics()
+        self.metrics.set_buckets("history_fetch_points", (100, 500, 1000, 5000, 10000, 50000, 100000))
+        self._metrics_port = 0
+        self._debug_overlay = False
+        self._log_level = "INFO"
+        self._log_file = "" # Empty: stderr/journald only (no extra flash writes)
+        self._metrics_server = None
+        self._stall_ms = self.STALL_MS # GUI thread stall threshold, 0 disables the watchdog
+        self._stall_log = "" # Empty: stall log in the temp dir
+        self._watchdog = None
+
+        # Record API payloads to capture_dir, or replay a capture instead of talking to a server
+        self._capture_dir = ""
+        self._replay_file = ""
+        self._replay_speed = 1.0
+        self._capture = None
+        self._replay = None
+        self._replay_wall = 0.0 # Epoch seconds of the replayed capture's start record
+        self._replay_now = 0.0 # Epoch seconds of the record being replayed: the history clock
+
+        # Cached endpoint payloads, refreshed according to ENDPOINT_POLICIES
+        self._endpoints = {name: CachedEndpoint(*policy) for name, policy in self.ENDPOINT_POLICIES.items()}
+
         self.load_config()
         
-        # Threading State
-        self._is_updating = False
+        # One asyncio network loop + shared keep-alive session for all I/O
+        self.client = manager.client if manager is not None else PiFireClient(max_in_flight=4, metrics=self.metrics)
+        if not self._replay_file:
+            self.client.prefetch(self.base_url)
+        self._open_history()
+
+        # In-flight poll (concurrent.futures.Future from the network loop)
+        self._poll_future = None
+
+        # Reachability: polling pauses while offline, a backed-off health check probes instead
+        self._connection = ConnectionMonitor(self._on_connection_change)
+        self._probe_timer = QTimer(self)
+        self._probe_timer.setSingleShot(True)
+        self._probe_timer.timeout.connect(self._probe)
+
+        # Progress bars between polls: runs only while a progress mode is on screen
+        self._interp_timer = QTimer(self)
+        self._interp_timer.setInterval(self.INTERPOLATE_MS)
+        self._interp_timer.timeout.connect(self._interpolate)
+
+        # Ordered command pipeline + optimistic values {field: (value, deadline)}
+        self.commands = CommandQueue(self.client, self._send_command, self._on_command_done)
+        self._optimistic = {}
         self._apiResponseReceived.connect(self._process_response)
         
-        # Poll API every 100ms
-        self.timer = QTimer(self)
-        self.timer.timeout.connect(self.update_status)
-        self.timer.start(100)
+        # Poll API; interval is re-picked after every response (see _next_poll_interval)
+        # Grills on one panel share a single scheduler timer (see scheduler.py)
+        scheduler = manager.scheduler if manager is not None else PollScheduler(self)
+        self.timer = scheduler.timer(self.update_status)
+        self.timer.start(self._poll_min_ms)
         
         self._poll_counter = 0
         
+        # GUI lag probe and metrics endpoint are process wide: first bridge only
+        self._start_metrics(process_wide=manager is None or not manager.bridges)
+
+        # Push stream runs alongside; polling takes over whenever it is down
+        self._streamStateChanged.connect(self._on_stream_state)
+
+        if self._replay_file:
+            self.start_replay(self._replay_file, self._replay_speed)
+            return
+        if self._capture_dir:
+            self._start_capture()
+
+        self._start_stream()
+
         # Initial call
         self.update_status()
 
@@ -115,12 +326,12 @@ class PiFireBridge(QObject):
             if os.path.exists(path):
                 with open(path, 'r', encoding='utf-8') as f:
                     self._lang_data = json.load(f)
-                    print(f"Loaded language: {lang_code}")
+                    log.info("Loaded language: %s", lang_code)
                     self.langDataChanged.emit(self._lang_data)
             else:
-                print(f"Language file not found: {path} (CWD: {os.getcwd()})")
+                log.warning("Language file not found: %s (CWD: %s)", path, os.getcwd())
         except Exception as e:
-            print(f"Error loading language {lang_code}: {e}")
+            log.error("Error loading language %s: %s", lang_code, e)
 
     # --- Properties exposed to QML ---
     
@@ -128,10 +339,6 @@ class PiFireBridge(QObject):
     def grillTemp(self):
         return self._grill_temp
 
-    @Property(list, notify=probesChanged)
-    def probes(self):
-        return self._probes
-
     @Property(int, notify=setPointChanged)
     def setPoint(self):
         return self._set_point
@@ -184,9 +391,17 @@ class PiFireBridge(QObject):
     def primeProgress(self):
         return self._prime_progress
 
-    @Property(list, notify=timersChanged)
-    def timers(self):
-        return self._timers
+    @Property(QObject, constant=True)
+    def probeModel(self):
+        return self._probe_model
+
+    @Property(QObject, constant=True)
+    def timerModel(self):
+        return self._timer_model
+
+    @Property(QObject, constant=True)
+    def notifyModel(self):
+        return self._notify_model
 
     @Property(dict, notify=hopperChanged)
     def hopper(self):
@@ -204,10 +419,22 @@ class PiFireBridge(QObject):
     def historyData(self):
         return self._history_data
 
+    @Property(bool, notify=streamingChanged)
+    def streaming(self):
+        return self._streaming
+
     @Property(dict, notify=langDataChanged)
     def langData(self):
         return self._lang_data
 
+    @Property(str, notify=connectionStateChanged)
+    def connectionState(self):
+        return self._connection.state
+
+    @Property(bool, notify=staleChanged)
+    def stale(self):
+        return self._connection.stale
+
     @Slot(str, result=None)
     def setLanguage(self, lang_code):
         self._language = lang_code
@@ -224,9 +451,15 @@ class PiFireBridge(QObject):
     def serverSelection(self):
         return self._server_selection
 
+    @Property(str, notify=serverAddressChanged)
+    def grillName(self):
+        if self._grill is not None:
+            return self._grill["name"]
+        return urlsplit(self.base_url).hostname or self.base_url
+
     @Slot(str, str, result=None)
     def setServerConfig(self, selection, ip):
-        print(f"Bridge: Setting Server Config -> Mode: {selection}, IP: {ip}")
+        log.info("Setting Server Config -> Mode: %s, IP: %s", selection, ip)
         self._server_selection = selection
         self._custom_ip = ip
         self.save_config()
@@ -236,38 +469,94 @@ class PiFireBridge(QObject):
 
     def load_config(self):
         try:
-            current_dir = os.path.dirname(os.path.abspath(__file__))
-            path = os.path.join(current_dir, "config.json")
-            if os.path.exists(path):
-                with open(path, 'r') as f:
-                    data = json.load(f)
-                    self._server_selection = data.get('server_selection', 'pifire')
-                    self._custom_ip = data.get('custom_ip', '')
-                    self._language = data.get('language', 'en')
-                    print(f"Bridge: Config Loaded. Mode: {self._server_selection}, IP: {self._custom_ip}, Lang: {self._language}")
+            data = self._config
+            if data is None:
+                current_dir = os.path.dirname(os.path.abspath(__file__))
+                path = os.path.join(current_dir, "config.json")
+                if os.path.exists(path):
+                    with open(path, 'r') as f:
+                        data = json.load(f)
+            if data is not None:
+                self._server_selection = data.get('server_selection', 'pifire')
+                self._custom_ip = data.get('custom_ip', '')
+                self._language = data.get('language', 'en')
+                transport = data.get('transport', 'poll')
+                self._transport = 'sse' if transport == 'auto' else transport # Old name
+                self._stream_path = data.get('stream_path', '/api/stream')
+                self._poll_min_ms = int(data.get('poll_min_ms', self.POLL_INTERVAL_MS))
+                self._poll_max_ms = max(int(data.get('poll_max_ms', 5000)), self._poll_min_ms)
+                self._history_dir = data.get('history_dir', self._history_dir)
+                self._history_retention_h = float(data.get('history_retention_h', self.HISTORY_RETENTION_H))
+                self._history_max_rows = int(data.get('history_max_rows', self.HISTORY_MAX_ROWS))
+                self._metrics_port = int(data.get('metrics_port', 0))
+                self._debug_overlay = bool(data.get('debug_overlay', False))
+                self._log_level = data.get('log_level', 'INFO')
+                self._log_file = data.get('log_file', '')
+                self._stall_ms = int(data.get('stall_ms', self.STALL_MS))
+                self._stall_log = data.get('stall_log', '')
+                self._capture_dir = data.get('capture_dir', '')
+                self._replay_file = data.get('replay_file', '')
+                self._replay_speed = float(data.get('replay_speed', 1.0))
+                log.info("Config Loaded. Mode: %s, IP: %s, Lang: %s", self._server_selection, self._custom_ip, self._language)
             else:
-                 print("Bridge: No config file found. Using defaults.")
+                 log.info("No config file found. Using defaults.")
         except Exception as e:
-            print(f"Bridge: Error loading config: {e}")
-            
+            log.error("Error loading config: %s", e)
+
+        if self._grill is not None:
+            # One of several controllers: its address comes from the "grills" entry
+            self._server_selection = "custom"
+            self._custom_ip = self._grill["address"]
+
+        setup_logging(self._log_level, self._log_file)
         self.update_base_url()
         # Ensure language is loaded after config
         self.load_language(self._language)
 
     def save_config(self):
+        if self._config is not None:
+            return # Injected settings: config.json stays untouched
         try:
             current_dir = os.path.dirname(os.path.abspath(__file__))
             path = os.path.join(current_dir, "config.json")
-            data = {
-                'server_selection': self._server_selection,
-                'custom_ip': self._custom_ip,
-                'language': self._language
-            }
+            # Keep keys owned by others (e.g. the "grills" list)
+            data = {}
+            if os.path.exists(path):
+                with open(path, 'r') as f:
+                    data = json.load(f)
+            if self._grill is None:
+                data['server_selection'] = self._server_selection
+                data['custom_ip'] = self._custom_ip
+            else:
+                address = {"localhost": "localhost", "pifire": "pifire.local"}.get(self._server_selection, self._custom_ip)
+                self._grill["address"] = address
+                for entry in data.get('grills', []):
+                    if isinstance(entry, dict) and entry.get('name') == self._grill["name"]:
+                        entry['address'] = address
+            data.update({
+                'language': self._language,
+                'transport': self._transport,
+                'stream_path': self._stream_path,
+                'poll_min_ms': self._poll_min_ms,
+                'poll_max_ms': self._poll_max_ms,
+                'history_dir': self._history_dir,
+                'history_retention_h': self._history_retention_h,
+                'history_max_rows': self._history_max_rows,
+                'metrics_port': self._metrics_port,
+                'debug_overlay': self._debug_overlay,
+                'log_level': self._log_level,
+                'log_file': self._log_file,
+                'stall_ms': self._stall_ms,
+                'stall_log': self._stall_log,
+                'capture_dir': self._capture_dir,
+                'replay_file': self._replay_file,
+                'replay_speed': self._replay_speed
+            })
             with open(path, 'w') as f:
                 json.dump(data, f)
-            print("Bridge: Config saved.")
+            log.info("Config saved.")
         except Exception as e:
-             print(f"Bridge: Error saving config: {e}")
+             log.error("Error saving config: %s", e)
 
     def update_base_url(self):
         if self._server_selection == "localhost":
@@ -284,409 +573,624 @@ class PiFireBridge(QObject):
                  url = "http://" + url
              self.base_url = url
              
-        print(f"Bridge: Base URL updated to: {self.base_url}")
+        log.info("Base URL updated to: %s", self.base_url)
         # Re-init headers referer
         self.headers['Referer'] = f'{self.base_url}/events/'
+        # Cached payloads, the clock estimate and any open stream belong to the old server
+        for entry in self._endpoints.values():
+            entry.invalidate()
+        self._clock.reset()
+        if hasattr(self, "client"):
+            # Resolve the new host now so the first poll does not pay for DNS/mDNS
+            self.client.prefetch(self.base_url)
+            # New server, clean slate: no backoff carried over from the old one
+            self._probe_timer.stop()
+            self._connection.record_success()
+            self._restart_stream()
+            self._open_history()
 
     # --- Logic ---
 
     def update_status(self):
-        if self._is_updating:
+        if self._replay is not None:
+            return
+        self.metrics.inc("poll_ticks")
+        if not self._connection.polling:
+            self.metrics.inc("poll_ticks_skipped", "offline")
+            return
+        # Single-flight: skip the tick while the previous poll is still out
+        if self._poll_future is not None and not self._poll_future.done():
+            self.metrics.inc("poll_ticks_skipped", "in_flight")
             return
 
-        self._is_updating = True
-        # Fetch hopper every time as requested by user
-        fetch_hopper = True 
-        
-        threading.Thread(target=self._fetch_task, args=(fetch_hopper,), daemon=True).start()
+        # Only hit endpoints whose refresh policy says they are due
+        now = time.monotonic()
+        names = [name for name in ("current", "hopper") if self._endpoints[name].is_due(now)]
+        if self._background:
+            names = [name for name in names if name == "current"]
+        if self._streaming and "current" in names:
+            names.remove("current") # Delivered by the push stream
+        if not names:
+            self.metrics.inc("poll_ticks_skipped", "not_due")
+            return
 
-    def _fetch_task(self, fetch_hopper):
-        result = {"success": False, "data": {}, "hopper_data": None}
+        self._poll_future = self.client.submit(self._poll(names))
+
+    async def _refresh_endpoint(self, name):
+        """Conditional GET of one cached endpoint. Returns (status_code, changed)."""
+        entry = self._endpoints[name]
+        headers = dict(self.headers, **entry.request_headers())
+        response = await self.client.get(f"{self.base_url}{entry.path}", endpoint=entry.path, headers=headers)
+        changed = entry.update(response, time.monotonic())
+        self._count_decode(entry, changed)
+        return response.status_code, changed
+
+    def _count_decode(self, entry, changed):
+        # Hit rate = payload_unchanged / (payload_unchanged + decode_ms count)
+        if changed:
+            self.metrics.observe("decode_ms", entry.decoder.decode_ms, entry.path)
+        else:
+            self.metrics.inc("payload_unchanged", entry.path)
+
+    async def _poll(self, names):
+        # Independent endpoints go out in parallel; "data"/"hopper_data" are
+        # only set when that payload actually changed
+        outcomes = await asyncio.gather(*(self._refresh_endpoint(n) for n in names), return_exceptions=True)
+        outcomes = dict(zip(names, outcomes))
+
+        result = {"success": False, "data": None, "hopper_data": None}
         try:
-            # 1. Fetch Current Status
-            response = requests.get(f"{self.base_url}/api/current", headers=self.headers, timeout=2, verify=False)
-            if response.status_code in [200, 201]:
+            # 1. Current Status (not polled while the push stream delivers it)
+            if "current" not in outcomes:
                 result["success"] = True
-                result["data"] = response.json()
             else:
-                result["error"] = f"Error: {response.status_code}"
-                self._apiResponseReceived.emit(result)
-                return
+                status_code, changed = _unwrap(outcomes["current"])
+                if status_code in [200, 201, 304]:
+                    result["success"] = True
+                    if changed:
+                        result["data"] = self._endpoints["current"].data
+                else:
+                    result["error"] = f"Error: {status_code}"
+
+            # 2. Hopper (Optional) - fail silently, main status is more important
+            hopper = outcomes.get("hopper")
+            if result["success"] and hopper is not None and not isinstance(hopper, BaseException):
+                if hopper[1]:
+                    result["hopper_data"] = self._endpoints["hopper"].data
+        except (requests.exceptions.RequestException, asyncio.TimeoutError):
+            # Unreachable (refused, timed out, unresolvable): feeds the connection state machine
+            result = {"success": False, "unreachable": True}
+        except Exception as e:
+            result = {"success": False, "error": str(e)}
 
-            # 2. Fetch Hopper (Optional)
-            if fetch_hopper:
-                try:
-                    h_response = requests.get(f"{self.base_url}/api/hopper", headers=self.headers, timeout=2, verify=False)
-                    if h_response.status_code in [200, 201]:
-                        result["hopper_data"] = h_response.json()
-                except:
-                    pass # Fail silently for hopper, main status is more important
+        result["poll"] = True
+        self._emit_response(result)
 
+    def _emit_response(self, result):
+        # Network loop -> GUI thread (queued signal)
+        try:
+            if self._capture is not None and result.get("success") and not result.get("history"):
+                recorded = [(kind, result[key]) for kind, key in (("current", "data"), ("hopper", "hopper_data"))
+                            if result.get(key) is not None]
+                for kind, data in recorded:
+                    self._capture.record(kind, data)
+                if recorded:
+                    self.client.submit(self._capture_task()) # Compressed on the executor, not the loop
+            self._apiResponseReceived.emit(result)
+        except RuntimeError:
+            pass # App is shutting down
+
+    # --- Push Stream ---
+
+    def _start_stream(self):
+        if self._transport != "poll" and not self._background and self._replay is None:
+            self._stream_future = self.client.submit(self._stream_task())
+
+    def _restart_stream(self):
+        # Drop any stream bound to the old server and reconnect right away
+        if self._stream_future is not None:
+            self._stream_future.cancel()
+            self._stream_future = None
+            self._start_stream()
+
+    async def _stream_task(self):
+        retry = 1.0
+        while True:
+            url = f"{self.base_url}{self._stream_path}"
+            headers = dict(self.headers, Accept="text/event-stream")
+            response = None
             try:
-                self._apiResponseReceived.emit(result)
+                direct, headers = await self.client.direct_url(url, headers)
+                open_stream = functools.partial(self.client.session.get, direct, headers=headers, stream=True, timeout=(2, 15))
+                response = await self.client.run_blocking(open_stream)
+                if response.status_code == 200:
+                    retry = 1.0
+                    self._streamStateChanged.emit(True)
+                    events = iter_sse(response)
+                    while True:
+                        item = await self.client.run_blocking(next, events, None)
+                        if item is None:
+                            break
+                        self._on_stream_event(*item)
+                else:
+                    # Server has no stream endpoint, only check back occasionally
+                    if retry < self.STREAM_RETRY_MAX:
+                        log.warning("No event stream at %s (HTTP %d): stock PiFire needs an SSE shim for \"transport\": \"sse\"; polling",
+                                    url, response.status_code)
+                    retry = self.STREAM_RETRY_MAX
+            except asyncio.CancelledError:
+                raise
             except RuntimeError:
-                pass # App is shutting down
-            
-        except requests.exceptions.RequestException:
-             # Fallback to mock logic if connection fails
-             self._apiResponseReceived.emit({"success": False, "mock": True})
+                return # App is shutting down
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+                self.client.connection_failed(url) # Address may have changed: re-resolve
+            except Exception:
+                pass # Dropped/unreachable: polling covers us until we reconnect
+            finally:
+                if response is not None:
+                    response.close() # Also unblocks a read still parked in the executor
+                try:
+                    self._streamStateChanged.emit(False)
+                except RuntimeError:
+                    pass
+
+            await asyncio.sleep(retry)
+            retry = min(retry * 2, self.STREAM_RETRY_MAX)
+
+    def _on_stream_event(self, event, payload):
+        self.metrics.inc("stream_events", event)
+        # Same byte-level change detection as polling: repeats are not decoded or parsed
+        name = "hopper" if event == "hopper" else "current" if event in ("message", "current") else None
+        if name is None:
+            return
+        entry = self._endpoints[name]
+        changed = entry.apply(payload, time.monotonic())
+        self._count_decode(entry, changed)
+        data = entry.data if changed else None
+        if name == "hopper":
+            self._emit_response({"success": True, "stream": True, "data": None, "hopper_data": data})
+        else:
+            self._emit_response({"success": True, "stream": True, "data": data, "hopper_data": None})
+
+    def _on_stream_state(self, streaming):
+        if self._streaming == streaming:
+            return
+        self._streaming = streaming
+        log.info("Live stream connected" if streaming else "Live stream down, polling")
+        self._reschedule()
+        self.streamingChanged.emit(self._streaming)
+        if streaming:
+            self._connection.record_success()
+            self.update_status() # Pick up hopper details straight away
+
+    # --- Capture / Replay ---
+
+    def _start_capture(self):
+        host = re.sub(r"[^A-Za-z0-9.-]+", "_", urlsplit(self.base_url).netloc or "default")
+        path = os.path.join(self._capture_dir, f"{host}-{time.strftime('%Y%m%d-%H%M%S')}.jsonl.gz")
+        try:
+            os.makedirs(self._capture_dir, exist_ok=True)
+            self._capture = CaptureWriter(path, self.base_url)
+            log.info("Capturing API traffic to %s", path)
+        except OSError as e:
+            log.error("Capture disabled: %s", e)
+
+    async def _capture_task(self):
+        try:
+            await self.client.run_blocking(self._capture.drain)
         except Exception as e:
-             self._apiResponseReceived.emit({"success": False, "error": str(e)})
+            log.error("Capture Error: %s", e)
+
+    def start_replay(self, path, speed=1.0):
+        """Feed a capture through _process_response instead of talking to the server.
+
+        speed: 1 = as recorded, 10 = ten times faster, 0 = as fast as possible.
+        Polling, the stream, commands and history fetches stay off while replaying.
+        """
+        self.timer.stop()
+        self._probe_timer.stop()
+        if self._stream_future is not None:
+            self._stream_future.cancel()
+            self._stream_future = None
+        self._on_stream_state(False)
+        self._replay_file = path
+        self._replay_speed = speed
+        self._replay = CaptureReplay(path, self._replay_record, speed, self)
+        self._replay_wall = self._replay_now = 0.0
+        self._last_history_emit = 0 # The replay clock starts in the past
+        self._connection.record_success()
+        self._open_history()
+        self._replay.start()
+        return self._replay
+
+    def _replay_record(self, record):
+        # Same result dicts the network loop would have produced
+        kind, data = record.get("kind"), record.get("data")
+        if kind == "start":
+            self._replay_wall = data.get("wall", 0.0) - record.get("t", 0.0)
+        self._replay_now = self._replay_wall + record.get("t", 0.0)
+        if kind == "current":
+            self._process_response({"success": True, "data": data, "hopper_data": None})
+        elif kind == "hopper":
+            self._process_response({"success": True, "data": None, "hopper_data": data})
+        elif kind == "history":
+            self._process_response({"success": True, "history": True, "series": normalize_chart_data(data)})
+
+    # --- Reachability ---
+
+    def _on_connection_failure(self):
+        delay = self._connection.record_failure()
+        if delay is not None:
+            log.warning("Server unreachable, next check in %.1fs", delay)
+            self._probe_timer.start(int(delay * 1000))
+
+    def _probe(self):
+        # One cheap health check instead of the full poll while offline
+        self._connection.start_probe()
+        self.client.submit(self._probe_task())
+
+    async def _probe_task(self):
+        try:
+            response = await self.client.get(f"{self.base_url}/api/server", endpoint="probe", timeout=1, headers=self.headers)
+            ok = response.status_code < 500
+        except Exception:
+            ok = False
+        self._emit_response({"probe": True, "ok": ok})
+
+    def _on_connection_change(self, old, new):
+        self.metrics.inc("connection_state", new)
+        log.info("Connection %s -> %s", old, new)
+        self.connectionStateChanged.emit(new)
+        if (old in (OFFLINE, PROBING)) != (new in (OFFLINE, PROBING)):
+            self.staleChanged.emit(new in (OFFLINE, PROBING))
+            self._update_interpolation() # No extrapolating from a server we cannot reach
+        if new == CONNECTED and old in (OFFLINE, PROBING):
+            # Back online: resume straight away rather than waiting for the next tick
+            self._probe_timer.stop()
+            if not self._streaming:
+                self._restart_stream()
+            self.update_status()
+
+    # --- Poll Scheduling ---
+
+    def _next_poll_interval(self):
+        """Pick the next poll interval (ms) from mode, activity and open pages."""
+        if self._background:
+            return max(self.BACKGROUND_POLL_MS, self._poll_min_ms)
+
+        if self._streaming:
+            return self.STREAM_HOPPER_INTERVAL_MS
+
+        now = time.monotonic()
+        if now - self._last_command_time < self.COMMAND_BOOST_S:
+            return self._poll_min_ms
+
+        interval = self.MODE_POLL_INTERVALS.get(self._mode, self.DEFAULT_MODE_POLL_MS)
+
+        rate = self._temp_rate(now)
+        if rate is not None:
+            if rate >= self.FAST_RATE:
+                interval //= 2
+            elif rate <= self.STEADY_RATE:
+                interval *= 2
+
+        if self._history_active:
+            interval = min(interval, self.HISTORY_POLL_MS)
+
+        return max(self._poll_min_ms, min(interval, self._poll_max_ms))
+
+    def _temp_rate(self, now):
+        # Absolute grill temp change (deg/s) over the recent window, None until we have enough data
+        samples = self._temp_samples
+        while samples and now - samples[0][0] > self.RATE_WINDOW_S:
+            samples.popleft()
+        if len(samples) < 2:
+            return None
+        dt = samples[-1][0] - samples[0][0]
+        if dt < 1.0:
+            return None
+        return abs(samples[-1][1] - samples[0][1]) / dt
+
+    def set_background(self, background):
+        """Off screen on a multi-grill panel: /api/current at BACKGROUND_POLL_MS, no stream or hopper."""
+        if background == self._background:
+            return
+        self._background = background
+        if background:
+            if self._stream_future is not None:
+                self._stream_future.cancel()
+                self._stream_future = None
+            self._on_stream_state(False)
+        else:
+            self._start_stream()
+        self._reschedule()
+        self._update_interpolation()
+        if not background:
+            self.update_status() # Catch up straight away, the summary may be seconds old
+
+    def _reschedule(self):
+        interval = self._next_poll_interval()
+        if self.timer.interval() != interval:
+            self.timer.setInterval(interval)
+
+    def _note_command(self):
+        # Commands change state server side: poll fast for a few seconds to show it
+        self._last_command_time = time.monotonic()
+        self._reschedule()
+
+    @Slot(result=dict)
+    def latencyStats(self):
+        """Per-endpoint request latency (count, errors, last/avg/max ms)."""
+        stats = {}
+        for endpoint in self.metrics.labels("http_ms"):
+            h = self.metrics.histogram("http_ms", endpoint)
+            stats[endpoint] = {"count": h["count"], "errors": self.metrics.counter("http_errors", endpoint),
+                               "last_ms": h["last"], "avg_ms": h["avg"], "max_ms": h["max"]}
+        return stats
+
+    @Slot(result=dict)
+    def metricsSnapshot(self):
+        """All counters and histogram summaries (same as /metrics.json)."""
+        return self.metrics.snapshot()
+
+    @Slot(result=list)
+    def recentStalls(self):
+        """GUI thread stalls seen by the watchdog, oldest first, without the stacks."""
+        if self._watchdog is None:
+            return []
+        return [{k: v for k, v in stall.items() if k != "stack"} for stall in self._watchdog.stalls()]
+
+    @Slot(result=list)
+    def recentLogs(self):
+        """Last log lines from the in-memory ring buffer (oldest first)."""
+        return recent_lines()
+
+    @Property(bool, constant=True)
+    def debugOverlay(self):
+        return self._debug_overlay
+
+    def _start_metrics(self, process_wide=True):
+        # Per-signal emit counts: every public change signal QML can bind to
+        for name, attr in vars(PiFireBridge).items():
+            if isinstance(attr, Signal) and not name.startswith("_"):
+                getattr(self, name).connect(functools.partial(self._count_signal, name))
+
+        self._lag_timer = None
+        if not process_wide:
+            return
+
+        self._lag_expected = time.monotonic() + self.LAG_PROBE_MS / 1000.0
+        self._lag_timer = QTimer(self)
+        self._lag_timer.setTimerType(Qt.PreciseTimer)
+        self._lag_timer.timeout.connect(self._probe_lag)
+        self._lag_timer.start(self.LAG_PROBE_MS)
+
+        json_routes = {}
+        if self._stall_ms > 0:
+            # The lag probe doubles as the watchdog's heartbeat
+            self._watchdog = StallWatchdog(self.LAG_PROBE_MS, self._stall_ms, path=self._stall_log or None, metrics=self.metrics)
+            self._watchdog.start()
+            json_routes["/stalls.json"] = self._watchdog.stalls
+            log.info("Stall log: %s", self._watchdog.path)
+
+        if self._metrics_port:
+            try:
+                self._metrics_server = MetricsServer(self.metrics, self._metrics_port, json_routes)
+                self._metrics_server.start()
+                log.info("Metrics on http://127.0.0.1:%d/metrics", self._metrics_server.port)
+            except OSError as e:
+                log.warning("Metrics endpoint unavailable: %s", e)
+
+    def _count_signal(self, name, *args):
+        self.metrics.inc("signal_emits", name)
+
+    def _probe_lag(self):
+        now = time.monotonic()
+        self.metrics.observe("gui_lag_ms", max(now - self._lag_expected, 0.0) * 1000.0)
+        self._lag_expected = now + self.LAG_PROBE_MS / 1000.0
+        if self._watchdog is not None:
+            self._watchdog.beat()
 
     def _process_response(self, result):
-        self._is_updating = False
+        if self._replay is not None and (result.get("poll") or result.get("stream") or result.get("probe")):
+            return # Late network results from before the replay started
+        if result.get("poll"):
+            self._reschedule()
         
+        if result.get("command"):
+            self._handle_command_result(result)
+            return
+
         if result.get("history_point"):
             # Handle Single Point Update from Stream
             h_data = result.get("data", {})
-            # print(f"DEBUG Stream Data: {h_data}") # Uncomment to inspect if needed
             self.historyPointChanged.emit(h_data)
             return
         
+        if result.get("history_view"):
+            # Downsampled on the executor; a newer historyWindow() / queryHistory() supersedes it
+            if result["generation"] == self._history_view_generation:
+                self._history_points = result["points"]
+                if result.get("viewport"):
+                    self.historyViewportChanged.emit(result["meta"])
+                else:
+                    self._history_data = result["meta"]
+                    self.historyDataChanged.emit(self._history_data)
+            return
+
+        if result.get("history_merged"):
+            if result["generation"] != self._history_store_generation:
+                return # Store cleared for another server meanwhile
+            for name, (buf, since_x) in result["buffers"].items():
+                self._history_store.install(name, buf, since_x)
+            self._history_merges.pop(0)
+            if self._history_merges:
+                self._start_history_merge()
+            else:
+                self.historyWindow(self._history_window_min)
+            return
+
+        if result.get("history_loaded"):
+            # Stored samples for this server, read from disk on the network loop
+            if result["db"] is self._history_db:
+                self._merge_history(result["series"])
+            return
+
         if result.get("history"):
-             # Process History Data
-             raw_data = result.get("data", {})
-             # Normalize for QML: [ {name: "Grill", points: [{x,y},...]}, ... ]
-             
-             # PiFire structure usually: 
-             # { "result": "OK", "data": { "time_labels": [...], "Grill": [...], ... } }
-             # OR direct keys if via refresh?
-             
-             # Let's assume the payload IS the data or data is inside 'data'.
-             actual_data = raw_data.get('data', raw_data) 
-             
-             labels = actual_data.get('time_labels', [])
-             # labels are usually strings "HH:MM". ChartView needs X (timestamp or index) and Y.
-             # If we only have labels, we might map them to index 0..N.
-             
-             series_list = []
-             
-             # Iterate keys to find probe data
-             for key, values in actual_data.items():
-                 # Structure: {'chart_data': [ {'label': 'Grill', 'data': [{'x':..., 'y':...}]}, ...]}
-                 
-                 if key == 'chart_data' and isinstance(values, list):
-                     print(f"DEBUG Found chart_data with {len(values)} datasets")
-                     for dataset in values:
-                         if not isinstance(dataset, dict): continue
-                         
-                         name = dataset.get('label', 'Unknown')
-                         raw_points = dataset.get('data', [])
-                         # DEBUG: Inspect the first point to verify format
-                         if len(raw_points) > 0:
-                             print(f"DEBUG {name} First Point: {raw_points[0]}")
-                         
-                         points = []
-                         for i, p in enumerate(raw_points):
-                             if isinstance(p, dict):
-                                 # Use 'x' (timestamp ms) and 'y' (temp)
-                                 x = p.get('x')
-                                 y = p.get('y')
-                                 
-                                 # Fallback to index if x missing
-                                 x_val = float(x) if x is not None else float(i)
-                                 
-                                 if y is not None:
-                                     points.append({"x": x_val, "y": float(y)})
-                             else:
-                                 # Fallback if just list of numbers
-                                 points.append({"x": float(i), "y": float(p)})
-                         
-                         series_list.append({"name": name, "points": points})
-                 
-                 # Original fallback (if specific probe keys exist directly)
-                 elif isinstance(values, list) and key not in ['time_labels', 'annotations', 'result']:
-                     # ... (Old logic if mixed, but seems it's all in chart_data now)
-                     pass
-
-             self._history_data = series_list
-                 
-             self._history_data = series_list
-             self.historyDataChanged.emit(self._history_data)
+             # Already normalized to columnar buffers on the network loop
+             if result.get("generation", self._history_generation) != self._history_generation:
+                 self.metrics.inc("history_fetch_stale")
+                 return # Cancelled or superseded after it was queued
+             self._merge_history(result.get("series", []))
              return
 
+        if result.get("probe"):
+            if result["ok"]:
+                self._connection.record_success()
+            else:
+                self._on_connection_failure()
+            return
+
         if result.get("success"):
-            # print("Bridge: API Success") # Uncomment for verbose debug
+            self._connection.record_success()
             data = result["data"]
             
-            # Merge Hopper Data if present
+            # Merge Hopper Data if present (only sent when it changed)
+            hopper_changed = False
             if result.get("hopper_data"):
                 h_data = result["hopper_data"]
                 self._hopper_details = {
                     "level": h_data.get("hopper_level", 0),
                     "name": h_data.get("hopper_pellets", "Unknown")
                 }
+                hopper_changed = True
                 # We also inject this into 'notify_data' parsing logic via override if needed, 
                 # but since we merge in _parse_data using _hopper_details, we just need to set the attribute here.
-                
-            # Synthetic History Point Emission (1Hz)
-            if self._history_active:
-                now = time.time()
-                if now - self._last_history_emit >= 1.0:
-                    self._last_history_emit = now
-                    
-                    # Construct point data based on current state
-                    # We utilize the RAW 'data' dict for current values to be accurate
-                    curr = data.get('current', {})
-                    p_temps = curr.get('P', {})
-                    f_temps = curr.get('F', {})
-                    
-                    temps = {}
-                    if 'Grill' in p_temps:
-                        temps["Grill"] = int(float(p_temps['Grill']))
-                    
-                    # SetPoint
-                    # Use existing self._set_point if tracked, or parse fresh
-                    temps["SetPoint"] = self._set_point
-                    
-                    for pname, pval in f_temps.items():
-                        temps[pname] = int(float(pval))
-                        
-                    point_data = {
-                        "x": int(now * 1000), # ms timestamp
-                        "temps": temps
-                    }
-                    self.historyPointChanged.emit(point_data)
 
+            if data is None:
+                # Status unchanged (or delivered by the stream): re-apply only if the hopper moved
+                if self._last_data is not None:
+                    # Optimistic values still pending also need reconciling
+                    if hopper_changed or self._optimistic:
+                        self._parse_data(self._last_data)
+                    self._emit_history_point(self._last_data)
+                return
+            self._last_data = data
+
+            self._emit_history_point(data)
             self._parse_data(data)
-        elif result.get("mock"):
-            print("Bridge: connection failed, using Mock Data")
-            self._handle_mock_data()
+        elif result.get("unreachable"):
+            # Keep showing the last real state; the UI marks it stale once offline
+            log.warning("Connection failed")
+            self._on_connection_failure()
         else:
-            print(f"Bridge: Update Error: {result.get('error')}")
+            log.warning("Update Error: %s", result.get('error'))
             self._status = result.get("error", "Unknown Error")
             self.statusChanged.emit(self._status)
+            # The error is in no payload: record it in the snapshot so the next good one
+            # diffs against it, and refetch that payload in full (no 304 / unchanged skip)
+            self._snapshot.status = self._status
+            self._endpoints["current"].invalidate()
+
+    def _emit_history_point(self, data):
+        # Synthetic History Point (1Hz): always recorded, emitted while the Graph is open
+        now = self._history_now()
+        if now - self._last_history_emit < 1.0:
+            return
+        self._last_history_emit = now
 
-    def _parse_data(self, data):
-        # 1. Parse Status & Mode
-        status_node = data.get('status', {})
-        # ...
-        
-        # Debugging Temp
-        p_current = data.get('current', {}).get('P', {})
-        if 'Grill' in p_current:
-             g_temp = p_current['Grill']
-             # print(f"Bridge: Parsed Grill Temp: {g_temp}") 
-             
-        # ... rest of parsing logic stays same, just re-inserting method to ensure correct indentation/scope if needed
-        # but replace_file_content needs context.
-        
-        new_mode = status_node.get('mode', 'Unknown')
-        new_display_mode = status_node.get('display_mode', 'Unknown')
-        
-        if self._mode != new_mode:
-            self._mode = new_mode
-            self.modeChanged.emit(self._mode)
-            
-        if self._status != new_display_mode:
-            self._status = new_display_mode
-            self.statusChanged.emit(self._status)
-
-        # Extended Status Parsing
-        new_outpins = status_node.get('outpins', {})
-        if self._outpins != new_outpins:
-            self._outpins = new_outpins
-            self.outpinsChanged.emit(self._outpins)
+        # Construct point data based on current state
+        # We utilize the RAW 'data' dict for current values to be accurate
+        curr = data.get('current', {})
+        p_temps = curr.get('P', {})
+        f_temps = curr.get('F', {})
 
-        new_lid_open = status_node.get('lid_open_detected', False)
-        if self._lid_open != new_lid_open:
-            self._lid_open = new_lid_open
-            self.lidOpenChanged.emit(self._lid_open)
+        temps = {}
+        if 'Grill' in p_temps:
+            temps["Grill"] = int(float(p_temps['Grill']))
 
-        new_s_plus = status_node.get('s_plus', False)
-        if self._s_plus != new_s_plus:
-            self._s_plus = new_s_plus
-            self.sPlusChanged.emit(self._s_plus)
-            
-        new_p_mode = str(status_node.get('p_mode', '--'))
-        if self._p_mode != new_p_mode:
-            self._p_mode = new_p_mode
-            self.pModeChanged.emit(self._p_mode)
-
-        if self._p_mode != new_p_mode:
-            self._p_mode = new_p_mode
-            self.pModeChanged.emit(self._p_mode)
-
-        # Mode Progress Parsing
-        # Startup
-        start_duration = status_node.get('start_duration', 0)
-        
-        if self._start_duration != start_duration:
-            self._start_duration = start_duration
-            self.startDurationChanged.emit(self._start_duration)
+        # SetPoint
+        # Use existing self._set_point if tracked, or parse fresh
+        temps["SetPoint"] = self._set_point
 
-        startup_timestamp = status_node.get('startup_timestamp', 0)
-        current_ts_ms = data.get('current', {}).get('TS', 0)
-        current_ts = current_ts_ms / 1000.0 if current_ts_ms > 0 else 0
-        
-        new_startup_progress = 0.0
-        if start_duration > 0 and startup_timestamp > 0 and current_ts > 0:
-            elapsed = current_ts - startup_timestamp
-            new_startup_progress = min(max(elapsed / start_duration, 0.0), 1.0)
-            
-        if self._startup_progress != new_startup_progress:
-             self._startup_progress = new_startup_progress
-             self.startupProgressChanged.emit(self._startup_progress)
-             
-        # Start Time (Global)
-        if startup_timestamp != self._start_time:
-            self._start_time = startup_timestamp
-            self.startTimeChanged.emit(self._start_time)
-
-        # Prime Duration & Mode Start Time
-        prime_duration = status_node.get('prime_duration', 0)
-        mode_start_time = status_node.get('start_time', 0)
-        
-        if self._prime_duration != prime_duration:
-            self._prime_duration = prime_duration
-            self.primeDurationChanged.emit(self._prime_duration)
-            
-        if self._mode_start_time != mode_start_time:
-             self._mode_start_time = mode_start_time
-             self.modeStartTimeChanged.emit(self._mode_start_time)
-
-        # Calculate Prime Progress
-        new_prime_progress = 0.0
-        if prime_duration > 0 and mode_start_time > 0 and current_ts > 0:
-            p_elapsed = current_ts - mode_start_time
-            new_prime_progress = min(max(p_elapsed / prime_duration, 0.0), 1.0)
-            
-        if self._prime_progress != new_prime_progress:
-            self._prime_progress = new_prime_progress
-            self.primeProgressChanged.emit(self._prime_progress)
-
-        # Shutdown
-        shutdown_duration = status_node.get('shutdown_duration', 0)
-        # shutdown_timestamp isn't explicit in API usually, but if mode is Shutdown we can guess or use a timer?
-        # Actually API logic usually sends 'shutdown_duration' as remaining or static?
-        # Let's check status 'shutdown_duration' usually static total.
-        # But for now let's just expose the duration if needed, or if available, use it.
-        # Actually, if display_mode is Shutdown, often we don't get a timestamp easily unless we track it
-        # or if PiFire sends it. Let's stick to startup which is clean.
-        
-        new_units = status_node.get('units', 'C')
-        if self._units != new_units:
-            self._units = new_units
-            self.unitsChanged.emit(self._units)
-
-        # 2. Parse Grill Temp
-        current = data.get('current', {})
-        p_current = current.get('P', {})
-        
-        new_grill_temp = 0
-        if 'Grill' in p_current:
-            new_grill_temp = int(float(p_current['Grill']))
-        
-        if self._grill_temp != new_grill_temp:
-            self._grill_temp = new_grill_temp
-            self.grillTempChanged.emit(self._grill_temp)
-            
-        # 3. Parse Notify Data (Set Point, Timers, Hopper, Probe Targets)
-        notify_data = data.get('notify_data', [])
-        
-        # Try to get set_point from current['PSP'] first (User specified location)
-        current_data = data.get('current', {})
-        new_set_point = int(float(current_data.get('PSP', 0)))
-        
-        # Fallback to status if not found (though user says it's in PSP)
-        if new_set_point == 0:
-             new_set_point = int(status_node.get('primary_setpoint', 0))
-        if new_set_point == 0:
-             new_set_point = int(status_node.get('set_point', 0))
-
-        new_timers = []
-        new_hopper = {}
-        probe_targets = {} # Map 'ProbeName' -> target_temp
-        probe_names = {} # Map 'ProbeName' -> Friendly Name
-        
-        # Probe Status for Enabled check
-        probe_status = status_node.get('probe_status', {}).get('F', {}) # Food probes section
-        
-        for item in notify_data:
-            # Set Point (Grill) - only use if we didn't find it in status
-            if new_set_point == 0 and item.get('label') == 'Grill' and item.get('type') == 'probe':
-                new_set_point = int(float(item.get('target', 0)))
-            
-            # Probe Targets & Names
-            if item.get('label') != 'Grill' and item.get('type') == 'probe':
-                label = item.get('label')
-                target = int(float(item.get('target', 0)))
-                probe_targets[label] = target
-                if 'name' in item:
-                    probe_names[label] = item['name']
-
-            # Timers
-            if item.get('type') == 'timer':
-                new_timers.append(item)
-                
-            # Hopper
-            if item.get('type') == 'hopper':
-                new_hopper = item
-
-        if self._set_point != new_set_point:
-            self._set_point = new_set_point
-            self.setPointChanged.emit(self._set_point)
+        for pname, pval in f_temps.items():
+            temps[pname] = int(float(pval))
 
-        if self._timers != new_timers:
-            self._timers = new_timers
-            self.timersChanged.emit(self._timers)
-            
-        # Always merge persisted hopper details (level/name) into the current hopper state
-        if self._hopper_details:
-             new_hopper.update(self._hopper_details)
-            
-        if self._hopper != new_hopper:
-            self._hopper = new_hopper
-            self.hopperChanged.emit(self._hopper)
-
-        # 4. Parse Probes (with Targets and Names)
-        f_current = current.get('F', {})
-        new_probes = []
-        for key in sorted(f_current.keys()):
-            # Check enabled string/bool in probe_status
-            p_config = probe_status.get(key, {})
-            is_enabled = p_config.get('enabled', False)
-            if not is_enabled:
-               continue
-               
-            temp = int(float(f_current[key]))
-            target = probe_targets.get(key, 0) # Default to 0 if no target
-            name = probe_names.get(key, key) # Default to key if no name
-            new_probes.append({'name': name, 'temp': temp, 'target': target})
-            
-        if self._probes != new_probes:
-            self._probes = new_probes
-            self.probesChanged.emit(self._probes)
-
-    def _handle_mock_data(self):
-        # Only print once to avoid spamming
-        # print("Bridge: Using Mock Data (Extended)")
-        mock_json = {
-            "current": {
-                "AUX": {},
-                "F": {"Probe1": 85, "Probe2": 90}, 
-                "NT": {"Grill": 0, "Probe1": 0, "Probe2": 0},
-                "P": {"Grill": 24},
-                "PSP": 0
-            },
-            "notify_data": [
-                {"condition": "equal_above", "label": "Grill", "target": 110, "type": "probe"},
-                {"condition": "equal_above", "label": "Probe1", "target": 95, "type": "probe"}, # Mock Target
-                {"keep_warm": False, "label": "Timer", "req": False, "shutdown": False, "type":"timer", "time_remaining": 300}, 
-                {"keep_warm": False, "label": "Hopper", "last_check": 0, "req": True, "shutdown": False, "type":"hopper", "level": 80, "name": "Hickory"} # Mock Hopper Level
-            ],
-            "status": {
-                "critical_error": False,
-                "display_mode": "Startup",
-                "lid_open_detected": True,
-                "mode": "Startup",
-                "outpins": {"auger": True, "fan": True, "igniter": False, "power": True},
-                "s_plus": True,
-                "p_mode": "4",
-                "units": "C"
-            }
+        point_data = {
+            "x": int(now * 1000), # ms timestamp
+            "temps": temps
         }
-        self._parse_data(mock_json)
+        self._history_store.append(point_data["x"], temps)
+        if self._history_db is not None:
+            self._history_db.append(point_data["x"], temps)
+            if time.monotonic() - self._last_history_flush >= self.HISTORY_FLUSH_S:
+                self._last_history_flush = time.monotonic()
+                self.client.submit(self._history_db_task(self._history_db.flush))
+        if self._history_active:
+            self.historyPointChanged.emit(point_data)
+
+    def _history_now(self):
+        # Epoch seconds the history is stamped with: the recorded time while replaying
+        return self._replay_now if self._replay is not None else time.time()
+
+    def _parse_data(self, data):
+        # Decode once into a typed snapshot, then emit only what changed
+        start = time.perf_counter()
+        snap = decode_current(data, self._hopper_details)
+        snap.s_plus = self._reconcile("s_plus", snap.s_plus)
+        snap.set_point = self._reconcile("set_point", snap.set_point)
+        if snap.grill_raw is not None:
+            self._temp_samples.append((time.monotonic(), snap.grill_raw))
+        if self._replay is None:
+            # Progress as of now on the server, not as of its last sample (no step back on each poll)
+            self._clock.update(snap.ts)
+            server_now = self._clock.now()
+            if server_now is not None:
+                snap.advance(server_now)
+
+        self._apply_snapshot(snap)
+        self._update_interpolation()
+        self.metrics.observe("parse_ms", (time.perf_counter() - start) * 1000.0)
+
+        # Mode / temperature trend may have changed the right poll rate
+        self._reschedule()
+
+    def _apply_snapshot(self, snap):
+        changed = diff_snapshots(self._snapshot, snap)
+        self._snapshot = snap
+        for name in changed:
+            value = getattr(snap, name)
+            model = self.MODEL_BINDINGS.get(name)
+            if model is not None:
+                getattr(self, model).set_items(value)
+                continue
+            attr, signal = self.SNAPSHOT_BINDINGS[name]
+            setattr(self, attr, value)
+            if signal is not None:
+                getattr(self, signal).emit(value)
+
+    def _update_interpolation(self):
+        running = (self._mode in self.PROGRESS_MODES and not self._background and self._replay is None
+                   and self._clock.offset is not None and self._connection.polling)
+        if running and not self._interp_timer.isActive():
+            self._interp_timer.start()
+        elif not running:
+            self._interp_timer.stop()
+
+    def _interpolate(self):
+        # Only the clock-driven fields can change, so only their signals fire
+        server_now = self._clock.now()
+        if server_now is None:
+            return
+        snap = copy.copy(self._snapshot)
+        snap.advance(server_now)
+        self._apply_snapshot(snap)
+
+    @Slot(result=float)
+    def serverTime(self):
+        """Estimated server time (epoch seconds) for countdowns; local time until the first TS."""
+        server_now = self._clock.now()
+        return server_now if server_now is not None else time.time()
 
     # --- Slots called from QML ---
 
@@ -695,26 +1199,17 @@ class PiFireBridge(QObject):
         """Generic command sender.
            command: 'startup', 'shutdown', 'smoke', 'hold', 'stop', 'monitor'
         """
-        endpoint = "/api/control" 
-        
         # Capitalize command for API (startup -> Startup)
         mode_str = command.capitalize() 
         # API expects JSON payload: {"updated": true, "mode": "Startup"}
         payload = {'updated': True, 'mode': mode_str}
         
-        # Specific headers for Control
-        control_headers = self.headers.copy()
-        control_headers['Referer'] = f'{self.base_url}/dash/'
-        control_headers['Content-Type'] = 'application/json; charset=utf-8'
-        
-        print(f"Sending command: {mode_str} data={payload}")
-        
-        threading.Thread(target=lambda: self._send_post(endpoint, payload, control_headers, is_json=True), daemon=True).start()
+        log.info("Sending command: %s data=%s", mode_str, payload)
+        self._queue_command(Command("mode", [("/api/control", payload)], label=mode_str))
 
     @Slot(int, str, result=None)
     def sendPrime(self, amount, next_mode):
         """Send Prime command with amount and next mode."""
-        endpoint = "/api/control"
         # Payload: {"updated": true, "mode": "Prime", "prime_amount": 10, "next_mode": "Stop"}
         payload = {
             'updated': True, 
@@ -723,83 +1218,161 @@ class PiFireBridge(QObject):
             'next_mode': next_mode
         }
         
-        control_headers = self.headers.copy()
-        control_headers['Referer'] = f'{self.base_url}/dash/'
-        control_headers['Content-Type'] = 'application/json; charset=utf-8'
-        
-        print(f"Sending Prime: {amount}g -> {next_mode}")
-        threading.Thread(target=lambda: self._send_post(endpoint, payload, control_headers, is_json=True), daemon=True).start()
+        log.info("Sending Prime: %sg -> %s", amount, next_mode)
+        self._queue_command(Command(None, [("/api/control", payload)], label="Prime"))
 
     @Slot(bool, result=None)
     def toggleSmokePlus(self, current_state):
         """Toggle Smoke Plus mode."""
-        endpoint = "/api/control"
         # Payload: {"s_plus": true/false}
         target_state = not current_state
         payload = {'s_plus': target_state}
         
-        control_headers = self.headers.copy()
-        control_headers['Referer'] = f'{self.base_url}/dash/'
-        control_headers['Content-Type'] = 'application/json; charset=utf-8'
-        
-        print(f"Sending Smoke Plus: {target_state}")
-        threading.Thread(target=lambda: self._send_post(endpoint, payload, control_headers, is_json=True), daemon=True).start()
+        log.info("Sending Smoke Plus: %s", target_state)
+        self._set_optimistic("s_plus", target_state)
+        self._queue_command(Command("s_plus", [("/api/control", payload)], label="Smoke Plus", value=target_state))
 
     @Slot(int, result=None)
     def setPMode(self, p_mode):
         """Set P-Mode profile (0-9) via settings then trigger update."""
-        
-        def sequence():
-            headers = self.headers.copy()
-            headers['Referer'] = f'{self.base_url}/dash/'
-            headers['Content-Type'] = 'application/json; charset=utf-8'
-            
-            # 1. Update Settings
-            print(f"Setting P-Mode: {p_mode} -> /api/settings")
-            try:
-                requests.post(
-                    f"{self.base_url}/api/settings", 
-                    json={'cycle_data': {'PMode': p_mode}}, 
-                    headers=headers, 
-                    timeout=2, 
-                    verify=False
-                )
-            except Exception as e:
-                print(f"Error setting PMode: {e}")
-                return
-
-            # 2. Trigger Update
-            print(f"Triggering Settings Update -> /api/control")
-            try:
-                requests.post(
-                    f"{self.base_url}/api/control", 
-                    json={'settings_update': True}, 
-                    headers=headers, 
-                    timeout=2, 
-                    verify=False
-                )
-            except Exception as e:
-                print(f"Error triggering update: {e}")
-
-        threading.Thread(target=sequence, daemon=True).start()
+        log.info("Setting P-Mode: %s -> /api/settings + /api/control", p_mode)
+        steps = [
+            ("/api/settings", {'cycle_data': {'PMode': p_mode}}),
+            ("/api/control", {'settings_update': True}),
+        ]
+        self._queue_command(Command("p_mode", steps, label="P-Mode"))
 
     @Slot()
     def startHistoryStream(self):
         """Enable 1Hz history updates via polling."""
-        print("DEBUG: Enabling History Updates (1Hz)")
+        log.debug("Enabling History Updates (1Hz)")
         self._history_active = True
+        self._reschedule()
 
     @Slot()
     def stopHistoryStream(self):
-        """Disable history updates."""
+        """Disable history updates (Graph page closed); drops any history download too."""
         self._history_active = False
+        self._cancel_history_fetch()
+        self._reschedule()
 
     # Stream task removed in favor of polling emission in _process_response
 
+    @Slot(int)
+    def historyWindow(self, minutes=60):
+        """Load locally recorded history for the last `minutes` into the Graph page.
+
+        Only the ring buffer copy happens here; downsampling to the plot
+        width runs on the executor. historyDataChanged then delivers the
+        series meta, with the points ready for charts.fillSeries().
+        """
+        self._history_window_min = minutes
+        x_min = self._history_now() * 1000 - minutes * 60 * 1000
+        columns = {name: self._history_store.columns(name, x_min) for name in self._history_store.channels()}
+        self._history_view_generation += 1
+        self.client.submit(self._history_view_task(columns, self._history_max_points, self._history_view_generation))
+
+    async def _history_view_task(self, columns, max_points, generation):
+        try:
+            columns, meta = await self.client.run_blocking(window_view, columns, max_points)
+            points = await self.client.run_blocking(_series_points, columns)
+            self._emit_response({"history_view": True, "points": points, "meta": meta, "generation": generation})
+        except Exception as e:
+            log.error("History view Error: %s", e)
+
+    @Slot(float, float, int)
+    def queryHistory(self, start_ms, end_ms, max_points):
+        """Viewport query over the on-disk history, at most `max_points` per series.
+
+        Runs on the executor: picks the raw/10 s/1 min resolution that fits the
+        span, downsamples the averages with LTTB and builds the points for
+        charts.fillSeries(). historyViewportChanged then delivers the series
+        meta; minY/maxY come from the rollup min/max so short spikes still set
+        the axis.
+        """
+        if self._history_db is None:
+            return
+        self._history_max_points = max_points
+        self._history_view_generation += 1
+        self.client.submit(self._history_query_task(self._history_db, start_ms, end_ms, max_points, self._history_view_generation))
+
+    async def _history_query_task(self, db, start_ms, end_ms, max_points, generation):
+        try:
+            res = HistoryDB.resolution_for(end_ms - start_ms, max_points)
+            rows = await self.client.run_blocking(db.query, start_ms, end_ms, res)
+            points, meta = await self.client.run_blocking(_viewport_view, rows, max_points)
+            self._emit_response({"history_view": True, "viewport": True, "points": points, "meta": meta, "generation": generation})
+        except Exception as e:
+            log.error("History DB Error: %s", e)
+
+    def _open_history(self):
+        """Switch the on-disk history to the current server and preload the live window from it."""
+        old = self._history_db
+        if self._replay_file:
+            # Replayed cooks stay in memory: never on disk, never mixed with a real server's history.
+            # No age limit, the recorded timestamps are in the past.
+            self._history_db = HistoryDB(":memory:", retention_s=0, max_rows=self._history_max_rows)
+        else:
+            host = urlsplit(self.base_url).netloc or "default"
+            directory = self._history_dir or os.path.join(os.path.dirname(os.path.abspath(__file__)), "history")
+            path = os.path.join(directory, re.sub(r"[^A-Za-z0-9.-]+", "_", host) + ".sqlite3")
+            self._history_db = HistoryDB(path, retention_s=self._history_retention_h * 3600, max_rows=self._history_max_rows)
+        self._cancel_history_fetch() # Old server's history must not land in the new store
+        self._history_store.clear()
+        self._history_merges = []
+        self._history_store_generation += 1
+        self._history_points = {}
+        self._history_view_generation += 1
+        self.client.submit(self._load_history_task(old, self._history_db))
+
+    async def _load_history_task(self, old, db):
+        try:
+            if old is not None:
+                await self.client.run_blocking(old.close)
+            since = time.time() * 1000 - self.HISTORY_CAPACITY * 1000
+            series = await self.client.run_blocking(db.load, since)
+            self._emit_response({"history_loaded": True, "db": db, "series": series})
+        except Exception as e:
+            log.error("History DB Error: %s", e)
+
+    async def _history_db_task(self, fn, *args):
+        try:
+            await self.client.run_blocking(fn, *args)
+        except Exception as e:
+            log.error("History DB Error: %s", e)
+
+    def _merge_history(self, series):
+        # Fetched/stored ranges replace whatever the ring buffer had inside them. The splice
+        # runs on the executor, one merge at a time so each one starts from the last result
+        self._history_merges.append(series)
+        if len(self._history_merges) == 1:
+            self._start_history_merge()
+
+    def _start_history_merge(self):
+        series = self._history_merges[0]
+        # Only array copies here; live points appended meanwhile are carried over by install()
+        current = {name: self._history_store.columns(name) for name, _, _ in series}
+        self.client.submit(self._history_merge_task(series, current, self._history_store_generation))
+
+    async def _history_merge_task(self, series, current, generation):
+        try:
+            buffers = await self.client.run_blocking(_merged_buffers, self._history_store.capacity, series, current)
+        except Exception as e:
+            log.error("History merge Error: %s", e)
+            buffers = {} # Still answered, so the next merge is not stuck behind this one
+        self._emit_response({"history_merged": True, "buffers": buffers, "generation": generation})
+
+    @Property(QObject, constant=True)
+    def charts(self):
+        """Graph page series loader (charts.fillSeries); QtCharts is imported on first use."""
+        if self._charts is None:
+            from charts import SeriesLoader
+            self._charts = SeriesLoader(self)
+        return self._charts
+
     @Slot(int, result=None)
     def setTargetTemp(self, temp):
         """Set target temperature (switches to Hold mode)."""
-        endpoint = "/api/control"
         # Payload: {"updated": true, "mode": "Hold", "primary_setpoint": 470}
         payload = {
             'updated': True,
@@ -807,45 +1380,205 @@ class PiFireBridge(QObject):
             'primary_setpoint': temp
         }
         
-        control_headers = self.headers.copy()
-        control_headers['Referer'] = f'{self.base_url}/dash/'
-        control_headers['Content-Type'] = 'application/json; charset=utf-8'
-        
-        print(f"Setting Target Temp: {temp} (Hold Mode)")
-        threading.Thread(target=lambda: self._send_post(endpoint, payload, control_headers, is_json=True), daemon=True).start()
+        log.info("Setting Target Temp: %s (Hold Mode)", temp)
+        # +/- auto-repeat fires this every 100 ms: the queue coalesces the burst
+        self._set_optimistic("set_point", temp)
+        self._queue_command(Command("set_point", [("/api/control", payload)], label="Target Temp", value=temp, idempotent=True))
 
     @Slot(str, result=None)
     def fetchHistory(self, mins_str="60"):
-        """Fetch history data (default last 60 mins)."""
+        """Make sure the last `mins_str` minutes are local, fetching only the gap the store is missing."""
+        mins = int(mins_str)
+        self._history_window_min = mins
+        now_ms = time.time() * 1000
+        since = self._history_store.missing_since(now_ms - mins * 60 * 1000, now_ms, self.HISTORY_MAX_GAP_S * 1000)
+        if since is None:
+            return
+        self._request_history(min(mins, math.ceil((now_ms - since) / 60000) + 1))
+
+    @Slot(str, result=None)
+    def reloadHistory(self, mins_str="60"):
+        """Re-download the whole window (default last 60 mins), ignoring local data."""
+        self._history_window_min = int(mins_str)
+        self._request_history(int(mins_str))
+
+    def _request_history(self, mins):
+        """Single-flight /history/refresh: one download at a time, keyed by its range.
+
+        A request the in-flight download already covers (same or shorter
+        range) shares it; any other range cancels it and starts over.
+        """
+        if self._replay is not None:
+            return # History comes from the capture
+        if self._history_fetch is not None and not self._history_fetch[1].done():
+            if self._history_fetch[0] >= mins:
+                self.metrics.inc("history_fetch_shared")
+                return
+            self._cancel_history_fetch()
         endpoint = "/history/refresh"
-        payload = {"num_mins": mins_str}
+        payload = {"num_mins": str(mins)}
         
         hist_headers = self.headers.copy()
         hist_headers['Referer'] = f'{self.base_url}/history/'
         hist_headers['Content-Type'] = 'application/json; charset=utf-8'
         hist_headers['Origin'] = self.base_url
         
-        print(f"Fetching History: {mins_str} mins")
-        threading.Thread(target=lambda: self._fetch_history_task(endpoint, payload, hist_headers), daemon=True).start()
-
-    def _fetch_history_task(self, endpoint, payload, headers):
+        log.info("Fetching History: %s mins", mins)
+        future = self.client.submit(self._fetch_history_task(endpoint, payload, hist_headers, self._history_generation))
+        self._history_fetch = (mins, future)
+
+    def _cancel_history_fetch(self):
+        # Invalidates the in-flight download even if its result is already queued
+        self._history_generation += 1
+        if self._history_fetch is not None:
+            _, future = self._history_fetch
+            self._history_fetch = None
+            if future.cancel():
+                self.metrics.inc("history_fetch_cancelled")
+
+    async def _fetch_history_task(self, endpoint, payload, headers, generation):
+        start = time.perf_counter()
         try:
-             response = requests.post(f"{self.base_url}{endpoint}", json=payload, headers=headers, timeout=5, verify=False)
+             response = await self.client.post(f"{self.base_url}{endpoint}", endpoint=endpoint, json=payload, headers=headers, timeout=5)
              if response.status_code == 200:
-                  json_data = response.json()
-                  self._apiResponseReceived.emit({"success": True, "history": True, "data": json_data})
+                  # Decode + normalize in the executor, never on the GUI thread
+                  json_data = await self.client.run_blocking(response.json)
+                  if self._capture is not None:
+                      self._capture.record("history", json_data)
+                      await self._capture_task()
+                  series = await self.client.run_blocking(normalize_chart_data, json_data)
+                  if generation != self._history_generation:
+                      self.metrics.inc("history_fetch_stale")
+                      return # Superseded while decoding: keep the newer data
+                  if self._history_db is not None:
+                      await self.client.run_blocking(self._history_db.replace, series)
+                  self.metrics.observe("history_fetch_ms", (time.perf_counter() - start) * 1000.0)
+                  self.metrics.observe("history_fetch_points", sum(len(xs) for _, xs, _ in series))
+                  self._emit_response({"success": True, "history": True, "series": series, "generation": generation})
              else:
-                  print(f"History Fetch Failed: {response.status_code}")
+                  log.warning("History Fetch Failed: %s", response.status_code)
+        except asyncio.CancelledError:
+            raise
         except Exception as e:
-             print(f"History Fetch Error: {e}")
+             log.warning("History Fetch Error: %s", e)
 
-    def _send_post(self, endpoint, data, headers, is_json=False):
-        try:
-            if is_json:
-                requests.post(f"{self.base_url}{endpoint}", json=data, headers=headers, timeout=2, verify=False)
-            else:
-                requests.post(f"{self.base_url}{endpoint}", data=data, headers=headers, timeout=2, verify=False)
-            # Force immediate logic update handled by next poll
-        except Exception as e:
-            print(f"Command failed: {e}") 
+    # --- Command Pipeline ---
+
+    def _queue_command(self, command):
+        if self._replay is not None:
+            log.info("Replay: %s not sent", command.label)
+            return
+        self._note_command()
+        self.commands.enqueue(command)
+
+    async def _send_command(self, command):
+        # Runs on the network loop; raising fails the command (retried only if idempotent, see CommandQueue)
+        headers = self.headers.copy()
+        headers['Referer'] = f'{self.base_url}/dash/'
+        headers['Content-Type'] = 'application/json; charset=utf-8'
+        for endpoint, payload in command.steps:
+            response = await self.client.post(f"{self.base_url}{endpoint}", endpoint=endpoint, json=payload, headers=headers)
+            response.raise_for_status()
+
+    def _on_command_done(self, command, ok, error):
+        # Issue -> delivered (or given up), including queueing and retries
+        self.metrics.observe("command_ms", (time.monotonic() - command.created) * 1000.0)
+        if not ok:
+            self.metrics.inc("command_failures", command.label)
+        self._emit_response({"command": True, "key": command.key, "label": command.label,
+                             "value": command.value, "ok": ok, "error": str(error) if error else ""})
+
+    def _set_optimistic(self, field, value):
+        # Show the new value right away; _parse_data reconciles it with the server
+        self._optimistic[field] = (value, time.monotonic() + self.OPTIMISTIC_PENDING_S)
+        setattr(self._snapshot, field, value)
+        if field == "set_point" and self._set_point != value:
+            self._set_point = value
+            self.setPointChanged.emit(self._set_point)
+        elif field == "s_plus" and self._s_plus != value:
+            self._s_plus = value
+            self.sPlusChanged.emit(self._s_plus)
+
+    def _reconcile(self, field, server_value):
+        """Keep an optimistic value until the server agrees or it times out."""
+        entry = self._optimistic.get(field)
+        if entry is None:
+            return server_value
+        value, deadline = entry
+        if server_value == value or time.monotonic() > deadline:
+            del self._optimistic[field]
+            return server_value
+        return value
+
+    def _handle_command_result(self, result):
+        key = result["key"]
+        entry = self._optimistic.get(key)
+        if result["ok"]:
+            # Acknowledged: give the server a few polls to reflect it
+            if entry is not None and entry[0] == result["value"]:
+                self._optimistic[key] = (entry[0], time.monotonic() + self.OPTIMISTIC_SETTLE_S)
+            return
+
+        log.warning("Command failed: %s: %s", result['label'], result['error'])
+        self.commandFailed.emit(result["label"])
+        if entry is not None and entry[0] == result["value"]:
+            # Roll back to what the server last told us
+            del self._optimistic[key]
+            if self._last_data is not None:
+                self._parse_data(self._last_data)
+
+    @Slot()
+    def shutdown(self):
+        """Stop polling and cancel all network work (connected to app.aboutToQuit)."""
+        self.timer.stop()
+        self._probe_timer.stop()
+        self._interp_timer.stop()
+        if self._lag_timer is not None:
+            self._lag_timer.stop()
+        if self._watchdog is not None:
+            self._watchdog.stop()
+        if self._metrics_server is not None:
+            self._metrics_server.stop()
+        if self._manager is None:
+            self.client.close() # Shared clients are closed by the GrillManager
+        if self._replay is not None:
+            self._replay.stop()
+        if self._capture is not None:
+            self._capture.close()
+        if self._history_db is not None:
+            self._history_db.close()
+            self._history_db = None # History results still queued are dropped
+        self._history_store_generation += 1
+
+
+def _merged_buffers(capacity, series, current):
+    # {name: (RingBuffer, last x it was built from)}, see HistoryStore.install()
+    buffers = {}
+    for name, xs, ys in series:
+        cur_x, cur_y = current[name]
+        buffers[name] = (merged_buffer(capacity, cur_x, cur_y, xs, ys), cur_x[-1] if len(cur_x) else float("-inf"))
+    return buffers
+
+
+def _series_points(columns):
+    # {name: (xs, ys)} -> {name: [QPointF]} for QXYSeries.replace(); value types, fine off the GUI thread
+    return {name: [QPointF(x, y) for x, y in zip(xs, ys)] for name, (xs, ys) in columns.items()}
+
+
+def _viewport_view(rows, max_points):
+    # HistoryDB.query() rows -> (points, series meta) for the Graph page, off the GUI thread
+    columns = {name: lttb(xs, avg, max_points) for name, xs, avg, _, _ in rows}
+    meta = series_meta(columns)
+    for entry, (_, _, _, mins, maxs) in zip(meta, rows):
+        if entry["count"]:
+            entry["minY"] = min(mins)
+            entry["maxY"] = max(maxs)
+    return _series_points(columns), meta
+
+
+def _unwrap(outcome):
+    # asyncio.gather(return_exceptions=True) result -> value or raise
+    if isinstance(outcome, BaseException):
+        raise outcome
+    return outcome
 
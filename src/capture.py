@@ -0,0 +1,154 @@
+import gzip
+import json
+import logging
+import threading
+import time
+
+from PySide6.QtCore import QObject, Signal, QTimer
+
+log = logging.getLogger("pifire.capture")
+
+CAPTURE_VERSION = 1
+
+
+class CaptureWriter:
+    """Records API payloads to a gzip-compressed JSON-lines file.
+
+    One record per line: {"t": seconds since start, "kind": ..., "data": ...}.
+    The first record is {"kind": "start", "data": {version, wall, base_url}}.
+    Kinds written by the bridge: "current", "hopper" (changed payloads only,
+    from polls and the push stream) and "history" (raw /history/refresh).
+    The stream is sync-flushed every FLUSH_S, so a capture cut short by a
+    crash or power loss is readable up to the last flush.
+
+    record() only timestamps and buffers (cheap enough for the network
+    loop); drain() serializes, compresses and writes the batch in order and
+    is meant to run on the executor. Thread safe.
+    """
+
+    FLUSH_S = 10.0
+
+    def __init__(self, path, base_url=""):
+        self.path = path
+        self._pending = []
+        self._pending_lock = threading.Lock() # Held only to swap the batch, never during I/O
+        self._lock = threading.Lock()
+        self._file = gzip.open(path, "wt", encoding="utf-8", compresslevel=6)
+        self._t0 = time.monotonic()
+        self._last_flush = self._t0
+        self.records = 0
+        self.record("start", {"version": CAPTURE_VERSION, "wall": time.time(), "base_url": base_url})
+
+    def record(self, kind, data):
+        """Buffer one record; `data` must not be mutated afterwards."""
+        with self._pending_lock:
+            self._pending.append((round(time.monotonic() - self._t0, 3), kind, data))
+
+    def drain(self):
+        """Write the buffered records (blocking: executor)."""
+        with self._lock:
+            with self._pending_lock:
+                batch, self._pending = self._pending, []
+            if self._file is None or not batch:
+                return
+            for t, kind, data in batch:
+                self._file.write(json.dumps({"t": t, "kind": kind, "data": data}, separators=(",", ":")) + "\n")
+            self.records += len(batch)
+            now = time.monotonic()
+            if now - self._last_flush >= self.FLUSH_S:
+                self._file.flush()
+                self._last_flush = now
+
+    def close(self):
+        self.drain()
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+def read_capture(path):
+    """Yield capture records in order, decompressing one line at a time.
+
+    A truncated tail (unclean shutdown) ends the iteration quietly.
+    """
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        try:
+            for line in f:
+                if not line.strip():
+                    continue
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    return # Half-written last line
+        except (EOFError, OSError) as e:
+            log.warning("Capture %s ends early: %s", path, e)
+
+
+class CaptureReplay(QObject):
+    """Plays a capture back through `handler(record)` on the GUI thread.
+
+    speed is a multiplier on the recorded timing (1 = real time, 10 = ten
+    times faster); 0 replays as fast as possible, one record per event loop
+    pass so QML bindings and painting keep up with it. Records are read
+    lazily from the file, so long captures are never held in memory.
+    """
+
+    finished = Signal()
+
+    def __init__(self, path, handler, speed=1.0, parent=None):
+        super().__init__(parent)
+        self.path = path
+        self.speed = max(float(speed), 0.0)
+        self.records = 0
+        self._handler = handler
+        self._iter = None
+        self._next = None
+        self._t0 = 0.0
+        self._started = 0.0
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.timeout.connect(self._step)
+
+    def start(self):
+        self._iter = read_capture(self.path)
+        self._next = next(self._iter, None)
+        self._t0 = self._next["t"] if self._next is not None else 0.0
+        self._started = time.monotonic()
+        log.info("Replaying %s at %s", self.path, f"x{self.speed:g}" if self.speed else "max speed")
+        self._schedule()
+
+    def stop(self):
+        self._timer.stop()
+        if self._iter is not None:
+            self._iter.close()
+        self._iter = None
+        self._next = None
+
+    def _due_at(self, record):
+        return self._started + (record["t"] - self._t0) / self.speed
+
+    def _step(self):
+        now = time.monotonic()
+        while self._next is not None:
+            record = self._next
+            if self.speed and self._due_at(record) > now:
+                break
+            self._next = next(self._iter, None)
+            self.records += 1
+            try:
+                self._handler(record)
+            except Exception as e:
+                log.error("Replay record %d (%s) failed: %s", self.records, record.get("kind"), e)
+            if not self.speed:
+                break
+        self._schedule()
+
+    def _schedule(self):
+        if self._next is None:
+            log.info("Replay finished: %d records", self.records)
+            self.stop()
+            self.finished.emit()
+            return
+        delay = 0.0 if not self.speed else max(self._due_at(self._next) - time.monotonic(), 0.0)
+        self._timer.start(int(delay * 1000))
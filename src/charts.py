@@ -0,0 +1,28 @@
+from PySide6.QtCore import QObject, Slot
+from PySide6.QtCharts import QXYSeries
+
+
+class SeriesLoader(QObject):
+    """Bulk-loads Graph page series from the bridge's history columns.
+
+    Lives in its own module so QtCharts is only imported once the Graph
+    page is first opened (see PiFireBridge.charts), not at start-up.
+    """
+
+    def __init__(self, bridge):
+        super().__init__(bridge)
+        self._bridge = bridge
+
+    @Slot(QXYSeries, str)
+    def fillSeries(self, series, name):
+        """Bulk-load a QML LineSeries from the current history points (single replace, no JS loop).
+
+        The points are cut to the plot width and built off the GUI thread
+        (see historyWindow / queryHistory), so this is one replace() of a few
+        hundred points.
+        """
+        points = self._bridge._history_points.get(name)
+        if points is None:
+            series.clear()
+            return
+        series.replace(points)
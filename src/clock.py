@@ -0,0 +1,40 @@
+import time
+from collections import deque
+
+
+class ServerClock:
+    """Estimate of the PiFire server's clock from the TS of /api/current.
+
+    TS is when the server took its last sample, so it trails the moment the
+    payload arrives by up to one sample period. Every new TS gives one offset
+    sample (TS - local monotonic time at arrival); the largest of the last
+    WINDOW samples is the freshest reading and is the estimate. Samples age
+    out of the window, so a server clock that was set back is followed within
+    WINDOW new timestamps, one set forward at once. Local wall clock changes
+    (NTP, RTC-less boards at boot) do not matter: only monotonic time is used.
+    """
+
+    WINDOW = 8
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self._samples = deque(maxlen=self.WINDOW)
+        self._last_ts = None
+        self.offset = None # Server time - time.monotonic(), seconds
+
+    def update(self, ts, now=None):
+        """Feed a server timestamp (s); repeats of the same TS carry no new information."""
+        if ts <= 0 or ts == self._last_ts:
+            return
+        self._last_ts = ts
+        now = time.monotonic() if now is None else now
+        self._samples.append(ts - now)
+        self.offset = max(self._samples)
+
+    def now(self):
+        """Estimated server time (epoch seconds), None before the first TS."""
+        if self.offset is None:
+            return None
+        return time.monotonic() + self.offset
@@ -0,0 +1,100 @@
+import asyncio
+import collections
+import time
+
+import requests
+
+
+class Command:
+    """One user action bound for the server.
+
+    steps is a list of (endpoint, payload) POSTs sent in order. Commands
+    sharing a non-None key coalesce while queued: a burst of setpoint
+    changes only sends the last value. idempotent: sending it twice leaves
+    the grill as sending it once (an absolute set point); only those are
+    retried, since a lost reply does not mean the request never arrived.
+    """
+
+    __slots__ = ("key", "steps", "label", "value", "idempotent", "created", "attempts")
+
+    def __init__(self, key, steps, label="", value=None, idempotent=False):
+        self.key = key
+        self.steps = steps
+        self.value = value # Optimistic value shown until the server confirms
+        self.label = label or (steps[0][0] if steps else "")
+        self.idempotent = idempotent
+        self.created = time.monotonic()
+        self.attempts = 0
+
+
+class CommandQueue:
+    """Ordered, coalescing command pipeline with retry/backoff.
+
+    Runs on the PiFireClient network loop. A single worker sends commands
+    strictly in the order they were issued; `send(command)` is a coroutine
+    supplied by the bridge that raises on failure. Idempotent commands are
+    retried with backoff on connection errors, timeouts and 5xx; everything
+    else (4xx, a Prime or mode change whose reply was lost) fails on the
+    first error. `on_done(command, ok, error)` is called from the network
+    loop once a command is delivered or has failed.
+    """
+
+    RETRY_DELAYS = (0.5, 1.0, 2.0)
+
+    def __init__(self, client, send, on_done):
+        self._client = client
+        self._send = send
+        self._on_done = on_done
+        self._pending = collections.deque()
+        self._wakeup = None
+        self._worker = None
+
+    def enqueue(self, command):
+        """Queue a command (any thread)."""
+        self._client.call_soon(self._enqueue, command)
+
+    def _enqueue(self, command):
+        # Only coalesce with the tail so ordering against other commands is kept
+        if command.key is not None and self._pending and self._pending[-1].key == command.key:
+            self._pending[-1] = command
+            self._client.metrics.inc("commands_coalesced")
+        else:
+            self._pending.append(command)
+
+        if self._wakeup is None:
+            self._wakeup = asyncio.Event()
+        self._wakeup.set()
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.ensure_future(self._run())
+
+    async def _run(self):
+        while True:
+            if not self._pending:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+
+            command = self._pending.popleft()
+            error = None
+            for delay in (0.0,) + self.RETRY_DELAYS:
+                if delay:
+                    await asyncio.sleep(delay)
+                command.attempts += 1
+                try:
+                    await self._send(command)
+                    error = None
+                    break
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    error = e
+                    if not (command.idempotent and self.retryable(e)):
+                        break
+            self._on_done(command, error is None, error)
+
+    @staticmethod
+    def retryable(error):
+        """True for failures worth sending again: no answer, or a server-side error."""
+        if isinstance(error, requests.exceptions.HTTPError):
+            return error.response is not None and error.response.status_code >= 500
+        return isinstance(error, (requests.exceptions.ConnectionError, requests.exceptions.Timeout, asyncio.TimeoutError))
@@ -0,0 +1,78 @@
+import random
+import time
+
+CONNECTED = "connected"
+DEGRADED = "degraded"
+OFFLINE = "offline"
+PROBING = "probing"
+
+
+class ConnectionMonitor:
+    """Server reachability state machine.
+
+        connected --failure--> degraded --OFFLINE_AFTER failures--> offline
+        offline --backoff elapsed--> probing --health check ok--> connected
+                                     probing --fails--> offline (longer backoff)
+        any state --success--> connected
+
+    Regular polling runs in connected/degraded only. While offline, a single
+    cheap health check is sent after an exponential, jittered backoff, so a
+    rebooting PiFire costs neither CPU nor a pile of timed-out requests.
+    Plain Python, driven from the GUI thread.
+    """
+
+    OFFLINE_AFTER = 3
+    BACKOFF_BASE_S = 1.0
+    BACKOFF_MAX_S = 30.0
+
+    def __init__(self, on_change=None):
+        self.state = CONNECTED
+        self.failures = 0
+        self.probes = 0 # Failed health checks since going offline
+        self.offline_since = None
+        self._on_change = on_change
+
+    @property
+    def polling(self):
+        return self.state in (CONNECTED, DEGRADED)
+
+    @property
+    def stale(self):
+        """True when the state on screen is the last known one, not live."""
+        return self.state in (OFFLINE, PROBING)
+
+    def _set(self, state):
+        if state != self.state:
+            old, self.state = self.state, state
+            if self._on_change is not None:
+                self._on_change(old, state)
+
+    def record_success(self):
+        self.failures = 0
+        self.probes = 0
+        self.offline_since = None
+        self._set(CONNECTED)
+
+    def record_failure(self):
+        """Count a failed request; returns the backoff (s) when this goes offline, else None."""
+        self.failures += 1
+        if self.state == PROBING:
+            self.probes += 1
+            self._set(OFFLINE)
+            return self.backoff()
+        if self.state == OFFLINE:
+            return None # Straggler from before going offline
+        if self.failures >= self.OFFLINE_AFTER:
+            self.offline_since = time.time()
+            self._set(OFFLINE)
+            return self.backoff()
+        self._set(DEGRADED)
+        return None
+
+    def start_probe(self):
+        self._set(PROBING)
+
+    def backoff(self):
+        """Next probe delay: exponential in failed probes, with +/-50% jitter so panels don't sync up."""
+        delay = min(self.BACKOFF_BASE_S * (2 ** self.probes), self.BACKOFF_MAX_S)
+        return delay * random.uniform(0.5, 1.5)
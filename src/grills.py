@@ -0,0 +1,135 @@
+import json
+import logging
+import os
+
+from PySide6.QtCore import QObject, Signal, Slot, Property
+
+from api_client import PiFireClient
+from bridge import PiFireBridge
+from metrics import Metrics
+from models import GrillListModel
+from scheduler import PollScheduler
+
+log = logging.getLogger("pifire.grills")
+
+
+def load_grills(path=None):
+    """Controllers listed under "grills" in config.json as [{name, address}], [] if none.
+
+    Names are made unique since they key the grill model and the config entries.
+    """
+    path = path or os.path.join(os.path.dirname(os.path.abspath(__file__)), "config.json")
+    try:
+        with open(path, "r") as f:
+            entries = json.load(f).get("grills") or []
+    except (OSError, ValueError) as e:
+        if os.path.exists(path):
+            log.error("Error loading grills: %s", e)
+        return []
+
+    grills = []
+    seen = set()
+    for i, entry in enumerate(entries):
+        if not isinstance(entry, dict):
+            continue
+        address = str(entry.get("address", "")).strip()
+        if not address:
+            continue
+        name = str(entry.get("name") or f"Grill {i + 1}")
+        while name in seen:
+            name += "'"
+        seen.add(name)
+        grills.append({"name": name, "address": address})
+    return grills
+
+
+class GrillManager(QObject):
+    """Several PiFire controllers on one panel.
+
+    One PiFireBridge per controller, all sharing a single PiFireClient
+    (network loop, connection pool, resolver), one Metrics registry and one
+    PollScheduler. The active grill is the one QML's `bridge` points at: it
+    gets the push stream and the full adaptive poll rate. Background grills
+    only poll /api/current every PiFireBridge.BACKGROUND_POLL_MS to keep
+    their row of `model` (name, temps, mode, connection) current.
+
+    With no "grills" in config.json this is a single bridge configured the
+    usual way (server_selection / custom_ip). `config` is passed on to every
+    bridge in place of config.json (see PiFireBridge).
+    """
+
+    activeChanged = Signal()
+
+    MODEL_SIGNALS = ("grillTempChanged", "setPointChanged", "modeChanged", "unitsChanged", "connectionStateChanged", "serverAddressChanged")
+
+    def __init__(self, grills=None, parent=None, config=None):
+        super().__init__(parent)
+        grills = grills or [None]
+        self.metrics = Metrics()
+        # One pool per controller host (+ slack for a custom server change)
+        self.client = PiFireClient(max_in_flight=4, metrics=self.metrics, hosts=len(grills) + 1)
+        self.scheduler = PollScheduler(self)
+        self.bridges = []
+        for i, grill in enumerate(grills):
+            self.bridges.append(PiFireBridge(self, grill=grill, manager=self, background=i > 0, config=config))
+        self._active = 0
+        self._model = GrillListModel(self)
+
+        for bridge in self.bridges:
+            for name in self.MODEL_SIGNALS:
+                getattr(bridge, name).connect(self._update_model)
+        self._update_model()
+
+    @Property(QObject, constant=True)
+    def model(self):
+        return self._model
+
+    @Property(int, notify=activeChanged)
+    def activeIndex(self):
+        return self._active
+
+    @Property(QObject, notify=activeChanged)
+    def active(self):
+        return self.bridges[self._active]
+
+    @Slot(int)
+    def setActive(self, index):
+        if index == self._active or not 0 <= index < len(self.bridges):
+            return
+        old, new = self.bridges[self._active], self.bridges[index]
+        log.info("Active grill: %s", new.grillName)
+        # Page-level state follows the screen, not the controller
+        if new._language != old._language:
+            new._language = old._language
+            new.load_language(old._language)
+        if old._history_active:
+            old.stopHistoryStream()
+            new.startHistoryStream()
+        old.set_background(True)
+        new.set_background(False)
+        self._active = index
+        self._update_model()
+        self.activeChanged.emit()
+
+    def _update_model(self, *args):
+        self._model.set_items([
+            {
+                "name": bridge.grillName,
+                "address": bridge.base_url,
+                "grillTemp": bridge.grillTemp,
+                "setPoint": bridge.setPoint,
+                "mode": bridge.mode,
+                "units": bridge.units,
+                "connectionState": bridge.connectionState,
+                "active": i == self._active,
+            }
+            for i, bridge in enumerate(self.bridges)
+        ])
+
+    @Slot()
+    def shutdown(self):
+        """Stop every grill and the shared network loop (connected to app.aboutToQuit)."""
+        self.scheduler.stop()
+        self.client.close()
+        for bridge in self.bridges:
+            bridge.shutdown()
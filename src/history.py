@@ -0,0 +1,243 @@
+from array import array
+from bisect import bisect_left, bisect_right
+from operator import itemgetter
+
+_get_x = itemgetter('x')
+_get_y = itemgetter('y')
+
+
+class RingBuffer:
+    """Fixed-capacity (x, y) series backed by two preallocated array('d').
+
+    Appends overwrite the oldest sample once full, so memory stays flat no
+    matter how long a cook runs. x must be appended in non-decreasing order.
+    """
+
+    __slots__ = ("capacity", "_x", "_y", "_start", "_size")
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self._x = array('d', bytes(8 * capacity))
+        self._y = array('d', bytes(8 * capacity))
+        self._start = 0
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    def append(self, x, y):
+        if self._size < self.capacity:
+            i = (self._start + self._size) % self.capacity
+            self._size += 1
+        else:
+            i = self._start
+            self._start = (self._start + 1) % self.capacity
+        self._x[i] = x
+        self._y[i] = y
+
+    @classmethod
+    def from_columns(cls, capacity, xs, ys):
+        """Buffer holding the newest `capacity` samples of chronological array('d') columns (C-level copies)."""
+        buf = cls(capacity)
+        n = min(len(xs), capacity)
+        if n:
+            buf._x[:n] = xs[len(xs) - n:]
+            buf._y[:n] = ys[len(ys) - n:]
+            buf._size = n
+        return buf
+
+    def clear(self):
+        self._start = 0
+        self._size = 0
+
+    def last_x(self):
+        if not self._size:
+            return None
+        return self._x[(self._start + self._size - 1) % self.capacity]
+
+    def _ordered(self, buf):
+        # Logical (oldest -> newest) copy of one column
+        end = self._start + self._size
+        if end <= self.capacity:
+            return buf[self._start:end]
+        return buf[self._start:] + buf[:end - self.capacity]
+
+    def columns(self, x_min=None):
+        """(xs, ys) arrays in chronological order, optionally only x >= x_min."""
+        xs = self._ordered(self._x)
+        ys = self._ordered(self._y)
+        if x_min is not None:
+            first = bisect_left(xs, x_min)
+            if first:
+                xs = xs[first:]
+                ys = ys[first:]
+        return xs, ys
+
+
+class HistoryStore:
+    """Per-channel ring buffers (Grill, SetPoint, each probe) for live history."""
+
+    def __init__(self, capacity=3600):
+        self.capacity = capacity
+        self._channels = {}
+
+    def append(self, x_ms, temps):
+        for name, value in temps.items():
+            buf = self._channels.get(name)
+            if buf is None:
+                buf = self._channels[name] = RingBuffer(self.capacity)
+            buf.append(x_ms, value)
+
+    def clear(self):
+        self._channels.clear()
+
+    def channels(self):
+        return list(self._channels)
+
+    def __len__(self):
+        return max((len(b) for b in self._channels.values()), default=0)
+
+    def last_x(self):
+        return max((b.last_x() or 0 for b in self._channels.values()), default=None)
+
+    def columns(self, name, x_min=None):
+        buf = self._channels.get(name)
+        if buf is None:
+            return array('d'), array('d')
+        return buf.columns(x_min)
+
+    def install(self, name, buf, since_x):
+        """Swap in a buffer built off the GUI thread (see merged_buffer) from this
+        channel's columns as of `since_x`, keeping samples appended after that."""
+        cur = self._channels.get(name)
+        if cur is not None and len(cur):
+            xs, ys = cur.columns()
+            last = buf.last_x()
+            for i in range(bisect_right(xs, since_x if last is None else max(since_x, last)), len(xs)):
+                buf.append(xs[i], ys[i])
+        self._channels[name] = buf
+
+    def missing_since(self, start_ms, now_ms, max_gap_ms):
+        """Oldest x from which [start_ms, now_ms] has a hole longer than max_gap_ms, or None if covered.
+
+        Coverage is judged on the longest channel (Grill is recorded on every sample).
+        """
+        if not self._channels:
+            return start_ms
+        ref = max(self._channels.values(), key=len)
+        xs, _ = ref.columns(start_ms)
+        if not len(xs) or xs[0] - start_ms > max_gap_ms:
+            return start_ms
+        prev = xs[0]
+        for x in xs:
+            if x - prev > max_gap_ms:
+                return prev
+            prev = x
+        if now_ms - prev > max_gap_ms:
+            return prev
+        return None
+
+
+def merged_buffer(capacity, cur_x, cur_y, xs, ys):
+    """Ring buffer of (cur_x, cur_y) with the chronological (xs, ys) range spliced in:
+    it replaces the samples inside [xs[0], xs[-1]]. Meant to run off the GUI thread."""
+    if not len(xs):
+        return RingBuffer.from_columns(capacity, cur_x, cur_y)
+    lo = bisect_left(cur_x, xs[0])
+    hi = bisect_right(cur_x, xs[-1])
+    return RingBuffer.from_columns(capacity, cur_x[:lo] + array('d', xs) + cur_x[hi:], cur_y[:lo] + array('d', ys) + cur_y[hi:])
+
+
+def _dataset_columns(raw_points):
+    # Fast path: every point is {'x': ..., 'y': ...} with numbers -> C-level conversion
+    try:
+        return array('d', map(_get_x, raw_points)), array('d', map(_get_y, raw_points))
+    except (TypeError, KeyError):
+        pass
+
+    # Tolerant path: missing x -> index, missing y -> skipped, bare numbers -> y
+    xs = array('d')
+    ys = array('d')
+    for i, p in enumerate(raw_points):
+        if isinstance(p, dict):
+            x = p.get('x')
+            y = p.get('y')
+            if y is None:
+                continue
+            xs.append(float(x) if x is not None else float(i))
+            ys.append(float(y))
+        else:
+            xs.append(float(i))
+            ys.append(float(p))
+    return xs, ys
+
+
+def normalize_chart_data(raw_data):
+    """/history/refresh payload -> [(name, xs, ys)] columnar array('d') buffers.
+
+    PiFire structure: {'chart_data': [{'label': 'Grill', 'data': [{'x': ms, 'y': temp}, ...]}, ...]},
+    possibly wrapped in a 'data' key. Meant to run off the GUI thread.
+    """
+    actual_data = raw_data.get('data', raw_data) if isinstance(raw_data, dict) else {}
+    if not isinstance(actual_data, dict):
+        return []
+    series = []
+    for dataset in actual_data.get('chart_data') or ():
+        if not isinstance(dataset, dict):
+            continue
+        xs, ys = _dataset_columns(dataset.get('data') or [])
+        series.append((dataset.get('label', 'Unknown'), xs, ys))
+    return series
+
+
+def series_meta(columns):
+    """Per-series count and bounds for QML axis setup: [{name, count, minX, maxX, minY, maxY}]."""
+    meta = []
+    for name, (xs, ys) in columns.items():
+        entry = {"name": name, "count": len(xs)}
+        if len(xs):
+            entry.update(minX=min(xs), maxX=max(xs), minY=min(ys), maxY=max(ys))
+        meta.append(entry)
+    return meta
+
+
+def window_view(columns, max_points):
+    """Graph page view of full-resolution {name: (xs, ys)}: (downsampled columns, series meta).
+
+    The meta (count, bounds) describes the full data so short spikes still
+    set the axis; each series is cut to `max_points` with LTTB. Meant to run
+    off the GUI thread.
+    """
+    meta = series_meta(columns)
+    return {name: lttb(xs, ys, max_points) for name, (xs, ys) in columns.items()}, meta
+
+
+def lttb(xs, ys, threshold):
+    """Largest-Triangle-Three-Buckets: downsample to `threshold` points, keeping peaks and shape."""
+    n = len(xs)
+    if threshold >= n or threshold < 3:
+        return xs, ys
+    out_x = array('d', (xs[0],))
+    out_y = array('d', (ys[0],))
+    every = (n - 2) / (threshold - 2)
+    a = 0
+    for i in range(threshold - 2):
+        # Average of the next bucket is the third triangle vertex
+        nxt_lo = int((i + 1) * every) + 1
+        nxt_hi = min(int((i + 2) * every) + 1, n)
+        avg_x = sum(xs[nxt_lo:nxt_hi]) / (nxt_hi - nxt_lo)
+        avg_y = sum(ys[nxt_lo:nxt_hi]) / (nxt_hi - nxt_lo)
+
+        ax = xs[a]
+        ay = ys[a]
+        best = -1.0
+        for j in range(int(i * every) + 1, nxt_lo):
+            area = abs((ax - avg_x) * (ys[j] - ay) - (ax - xs[j]) * (avg_y - ay))
+            if area > best:
+                best = area
+                a = j
+        out_x.append(xs[a])
+        out_y.append(ys[a])
+    out_x.append(xs[n - 1])
+    out_y.append(ys[n - 1])
+    return out_x, out_y
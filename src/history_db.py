@@ -0,0 +1,275 @@
+import os
+import sqlite3
+import threading
+import time
+from array import array
+
+
+class HistoryDB:
+    """On-disk sample log for one grill (SQLite in WAL mode).
+
+    append() only buffers in memory (cheap enough for the GUI thread);
+    flush() writes the batch in one transaction and is meant to run on the
+    network executor every few tens of seconds, which keeps SD card writes
+    coarse. Retention trims rows by age (retention_s 0: no age limit) and
+    by total count. Thread-safe. path may be ":memory:" for a log that is
+    never written to disk.
+
+    Every write also refreshes min/max/avg rollups for the buckets it
+    touched, so long ranges can be read at a coarser resolution.
+    """
+
+    PRUNE_INTERVAL_S = 3600
+    # Query resolutions; 1 s is served from the raw (1 Hz) samples, the rest from rollups
+    RESOLUTIONS_MS = (1000, 10000, 60000)
+    ROLLUP_MS = (10000, 60000)
+
+    SCHEMA = (
+        "CREATE TABLE IF NOT EXISTS samples ("
+        " channel TEXT NOT NULL, ts INTEGER NOT NULL, value REAL NOT NULL,"
+        " PRIMARY KEY (channel, ts)) WITHOUT ROWID",
+        "CREATE INDEX IF NOT EXISTS samples_ts ON samples (ts)",
+        "CREATE TABLE IF NOT EXISTS rollups ("
+        " res INTEGER NOT NULL, channel TEXT NOT NULL, bucket INTEGER NOT NULL,"
+        " n INTEGER NOT NULL, avg REAL NOT NULL, min REAL NOT NULL, max REAL NOT NULL,"
+        " PRIMARY KEY (res, channel, bucket)) WITHOUT ROWID",
+    )
+
+    def __init__(self, path, retention_s=48 * 3600, max_rows=1000000):
+        self.path = path
+        self.retention_s = retention_s
+        self.max_rows = max_rows
+        self._pending = []
+        self._pending_lock = threading.Lock() # Held only to swap the batch, never during I/O
+        self._db_lock = threading.Lock()
+        self._conn = None
+        self._last_prune = float("-inf") # First flush prunes: retention holds right after boot too
+
+    def _connection(self):
+        # Opened lazily under _db_lock so the constructor does no I/O
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            for statement in self.SCHEMA:
+                conn.execute(statement)
+            if conn.execute("SELECT 1 FROM rollups LIMIT 1").fetchone() is None:
+                # Database from before rollups existed (or empty): build them once
+                span = conn.execute("SELECT MIN(ts), MAX(ts) FROM samples").fetchone()
+                if span[0] is not None:
+                    conn.execute("BEGIN")
+                    self._update_rollups(conn, span[0], span[1])
+                    conn.execute("COMMIT")
+            self._conn = conn
+        return self._conn
+
+    def append(self, x_ms, temps):
+        """Buffer one sample row per channel; written by the next flush()."""
+        x_ms = int(x_ms)
+        rows = [(name, x_ms, float(value)) for name, value in temps.items()]
+        with self._pending_lock:
+            self._pending.extend(rows)
+
+    def _take_pending(self):
+        with self._pending_lock:
+            rows, self._pending = self._pending, []
+        return rows
+
+    def _update_rollups(self, conn, ts_min, ts_max):
+        # Recompute every bucket overlapping [ts_min, ts_max] from the raw samples
+        for res in self.ROLLUP_MS:
+            lo = int(ts_min) // res * res
+            hi = (int(ts_max) // res + 1) * res
+            conn.execute("DELETE FROM rollups WHERE res = ? AND bucket >= ? AND bucket < ?", (res, lo, hi))
+            conn.execute(
+                "INSERT INTO rollups (res, channel, bucket, n, avg, min, max)"
+                " SELECT ?, channel, ts / ? * ?, COUNT(*), AVG(value), MIN(value), MAX(value)"
+                " FROM samples WHERE ts >= ? AND ts < ? GROUP BY channel, ts / ?",
+                (res, res, res, lo, hi, res))
+
+    def _write(self, conn, rows):
+        if rows:
+            conn.execute("BEGIN")
+            try:
+                conn.executemany("INSERT OR REPLACE INTO samples (channel, ts, value) VALUES (?, ?, ?)", rows)
+                self._update_rollups(conn, min(r[1] for r in rows), max(r[1] for r in rows))
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+
+    def flush(self):
+        """Write buffered samples; also applies retention once per PRUNE_INTERVAL_S."""
+        with self._db_lock:
+            conn = self._connection()
+            self._write(conn, self._take_pending())
+            if time.monotonic() - self._last_prune >= self.PRUNE_INTERVAL_S:
+                self._prune(conn)
+
+    def _prune(self, conn, now_ms=None):
+        self._last_prune = time.monotonic()
+        if self.retention_s:
+            now_ms = now_ms if now_ms is not None else time.time() * 1000
+            self._drop_before(conn, int(now_ms - self.retention_s * 1000))
+        row = conn.execute("SELECT ts FROM samples ORDER BY ts DESC LIMIT 1 OFFSET ?", (self.max_rows,)).fetchone()
+        if row is not None:
+            self._drop_before(conn, row[0] + 1)
+
+    def _drop_before(self, conn, cutoff):
+        # Samples older than cutoff and every rollup built from them, so coarse
+        # queries never reach further back than the raw data
+        conn.execute("BEGIN")
+        try:
+            conn.execute("DELETE FROM samples WHERE ts < ?", (cutoff,))
+            for res in self.ROLLUP_MS:
+                conn.execute("DELETE FROM rollups WHERE res = ? AND bucket < ?", (res, cutoff // res * res))
+            # The bucket holding the cutoff is rebuilt from its remaining samples
+            self._update_rollups(conn, cutoff, cutoff)
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    def load(self, since_ms):
+        """[(name, xs, ys)] for samples with ts >= since_ms, same shape as normalize_chart_data()."""
+        with self._db_lock:
+            if self._conn is None and not self._pending and not os.path.exists(self.path):
+                return [] # Nothing stored yet; do not create files for servers never reached
+            conn = self._connection()
+            self._write(conn, self._take_pending())
+            cursor = conn.execute(
+                "SELECT channel, ts, value FROM samples WHERE ts >= ? ORDER BY channel, ts", (int(since_ms),))
+            series = []
+            name = None
+            for channel, ts, value in cursor:
+                if channel != name:
+                    name = channel
+                    xs = array('d')
+                    ys = array('d')
+                    series.append((name, xs, ys))
+                xs.append(ts)
+                ys.append(value)
+            return series
+
+    @classmethod
+    def resolution_for(cls, span_ms, max_points, oversample=4):
+        """Finest resolution giving at most max_points * oversample buckets over span_ms."""
+        for res in cls.RESOLUTIONS_MS:
+            if span_ms / res <= max_points * oversample:
+                return res
+        return cls.RESOLUTIONS_MS[-1]
+
+    def query(self, start_ms, end_ms, res):
+        """[(name, xs, avg, mins, maxs)] over [start_ms, end_ms] at one of RESOLUTIONS_MS.
+
+        Rollup buckets are placed at their centre; at 1 s the raw samples are
+        returned with avg == min == max. Samples still waiting for flush() are
+        merged in from memory: a read never writes. Blocks while a flush holds
+        the database, so it belongs on the executor like flush().
+        """
+        raw = res == self.RESOLUTIONS_MS[0]
+        with self._pending_lock:
+            pending = list(self._pending)
+        with self._db_lock:
+            conn = self._connection()
+            if raw:
+                cursor = conn.execute(
+                    "SELECT channel, ts, 1, value, value, value FROM samples"
+                    " WHERE ts >= ? AND ts <= ? ORDER BY channel, ts", (int(start_ms), int(end_ms)))
+            else:
+                cursor = conn.execute(
+                    "SELECT channel, bucket + ?, n, avg, min, max FROM rollups"
+                    " WHERE res = ? AND bucket >= ? AND bucket <= ? ORDER BY channel, bucket",
+                    (res // 2, res, int(start_ms) // res * res, int(end_ms)))
+            rows = cursor.fetchall()
+        buckets = self._pending_buckets(pending, start_ms, end_ms, res)
+        if buckets:
+            rows = _merge_buckets(rows, buckets, raw)
+
+        series = []
+        name = None
+        for channel, x, _, avg, low, high in rows:
+            if channel != name:
+                name = channel
+                columns = (array('d'), array('d'), array('d'), array('d'))
+                series.append((name,) + columns)
+            columns[0].append(x)
+            columns[1].append(avg)
+            columns[2].append(low)
+            columns[3].append(high)
+        return series
+
+    def _pending_buckets(self, pending, start_ms, end_ms, res):
+        """Unflushed samples inside the query as {channel: {x: [n, sum, min, max]}}, x placed like query() does."""
+        raw = res == self.RESOLUTIONS_MS[0]
+        first = int(start_ms) // res * res
+        buckets = {}
+        for channel, ts, value in pending:
+            if raw:
+                if not start_ms <= ts <= end_ms:
+                    continue
+                x = ts
+            else:
+                bucket = ts // res * res
+                if bucket < first or bucket > end_ms:
+                    continue
+                x = bucket + res // 2
+            entry = buckets.setdefault(channel, {}).get(x)
+            if entry is None or raw:
+                buckets[channel][x] = [1, value, value, value]
+            else:
+                entry[0] += 1
+                entry[1] += value
+                entry[2] = min(entry[2], value)
+                entry[3] = max(entry[3], value)
+        return buckets
+
+    def replace(self, series):
+        """Store fetched [(name, xs, ys)]; each range replaces what was stored inside it."""
+        with self._db_lock:
+            conn = self._connection()
+            self._write(conn, self._take_pending())
+            conn.execute("BEGIN")
+            try:
+                for name, xs, ys in series:
+                    if not len(xs):
+                        continue
+                    conn.execute("DELETE FROM samples WHERE channel = ? AND ts BETWEEN ? AND ?",
+                                 (name, int(min(xs)), int(max(xs))))
+                    conn.executemany("INSERT OR REPLACE INTO samples (channel, ts, value) VALUES (?, ?, ?)",
+                                     [(name, int(x), y) for x, y in zip(xs, ys)])
+                    self._update_rollups(conn, min(xs), max(xs))
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+
+    def close(self):
+        """Flush and close; buffered samples are not lost on a clean shutdown."""
+        with self._db_lock:
+            if self._conn is None and not self._pending:
+                return
+            conn = self._connection()
+            self._write(conn, self._take_pending())
+            conn.close()
+            self._conn = None
+
+
+def _merge_buckets(rows, buckets, raw):
+    # Stored (channel, x, n, avg, min, max) rows + pending buckets, ordered by channel, x.
+    # A raw pending sample replaces a stored one at the same ts (like INSERT OR REPLACE);
+    # a rollup bucket that is part flushed, part pending is combined
+    merged = {}
+    for channel, x, n, avg, low, high in rows:
+        merged.setdefault(channel, {})[x] = (n, avg, low, high)
+    for channel, entries in buckets.items():
+        target = merged.setdefault(channel, {})
+        for x, (n, total, low, high) in entries.items():
+            old = target.get(x)
+            if old is None or raw:
+                target[x] = (n, total / n, low, high)
+            else:
+                old_n, old_avg, old_low, old_high = old
+                target[x] = (old_n + n, (old_avg * old_n + total) / (old_n + n), min(old_low, low), max(old_high, high))
+    return [(channel, x) + merged[channel][x] for channel in sorted(merged) for x in sorted(merged[channel])]
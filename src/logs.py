@@ -0,0 +1,161 @@
+import collections
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import tempfile
+import threading
+import time
+
+FORMAT = "%(levelname)s %(name)s: %(message)s" # journald adds its own timestamps
+FILE_FORMAT = "%(asctime)s " + FORMAT
+
+
+class RateLimitFilter(logging.Filter):
+    """Per-call-site rate limiting with "repeated Nx" deduplication.
+
+    Records are keyed by (logger, level, unformatted msg), so log with
+    %-style args rather than f-strings to group a call site. Each key may
+    emit `burst` records per `interval` seconds; the rest are counted and
+    the next record that gets through says how many were dropped.
+    """
+
+    MAX_KEYS = 512
+
+    def __init__(self, interval=10.0, burst=3):
+        super().__init__()
+        self.interval = interval
+        self.burst = burst
+        self._lock = threading.Lock()
+        self._state = {} # key -> [window start, sent in window, suppressed]
+
+    def filter(self, record):
+        key = (record.name, record.levelno, record.msg)
+        now = time.monotonic()
+        with self._lock:
+            state = self._state.get(key)
+            if state is None or now - state[0] >= self.interval:
+                suppressed = state[2] if state is not None else 0
+                if state is None and len(self._state) >= self.MAX_KEYS:
+                    self._expire(now)
+                self._state[key] = [now, 1, 0]
+                if suppressed:
+                    record.msg = f"{record.msg} (repeated {suppressed}x)"
+                return True
+            if state[1] < self.burst:
+                state[1] += 1
+                return True
+            state[2] += 1
+            return False
+
+    def _expire(self, now):
+        # f-string messages make unbounded keys; forget idle ones
+        for key in [k for k, s in self._state.items() if now - s[0] >= self.interval]:
+            del self._state[key]
+
+
+class RingBufferHandler(logging.Handler):
+    """Keeps the last `capacity` formatted records in memory for dump on demand."""
+
+    def __init__(self, capacity=500):
+        super().__init__()
+        self._records = collections.deque(maxlen=capacity)
+        self._ring_lock = threading.Lock()
+        self.setFormatter(logging.Formatter(FILE_FORMAT))
+
+    def emit(self, record):
+        line = self.format(record)
+        with self._ring_lock:
+            self._records.append(line)
+
+    def lines(self):
+        with self._ring_lock:
+            return list(self._records)
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that never blocks the caller: a full queue drops the record."""
+
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+_state = {}
+
+
+def setup_logging(level="INFO", log_file=None, ring_size=500, max_bytes=1024 * 1024):
+    """Route the "pifire" loggers through a bounded queue to stderr (journald),
+    an optional size-capped file and an in-memory ring buffer.
+
+    Callers only format and enqueue; all I/O happens on the listener thread.
+    Safe to call again (e.g. after config.json is read) to change the level
+    or log file.
+    """
+    root = logging.getLogger("pifire")
+    root.setLevel(getattr(logging, str(level).upper(), logging.INFO))
+
+    if not _state:
+        log_queue = queue.Queue(maxsize=10000)
+        queue_handler = DroppingQueueHandler(log_queue)
+        queue_handler.addFilter(RateLimitFilter())
+        root.addHandler(queue_handler)
+        root.propagate = False
+
+        console = logging.StreamHandler(sys.stderr)
+        console.setFormatter(logging.Formatter(FORMAT))
+        ring = RingBufferHandler(ring_size)
+        listener = logging.handlers.QueueListener(log_queue, console, ring, respect_handler_level=True)
+        listener.start()
+        _state.update(queue=queue_handler, listener=listener, ring=ring, file=None, file_path=None)
+
+    if (log_file or None) != _state["file_path"]:
+        old = _state["file"]
+        handlers = [h for h in _state["listener"].handlers if h is not old]
+        _state["file"] = None
+        _state["file_path"] = log_file or None
+        if log_file:
+            os.makedirs(os.path.dirname(os.path.abspath(log_file)), exist_ok=True)
+            file_handler = logging.handlers.RotatingFileHandler(log_file, maxBytes=max_bytes, backupCount=2)
+            file_handler.setFormatter(logging.Formatter(FILE_FORMAT))
+            handlers.append(file_handler)
+            _state["file"] = file_handler
+        _state["listener"].handlers = tuple(handlers)
+        if old is not None:
+            old.close()
+    return root
+
+
+def recent_lines():
+    """Recent log lines (oldest first), [] before setup_logging()."""
+    ring = _state.get("ring")
+    return ring.lines() if ring is not None else []
+
+
+def dump_recent(path=None):
+    """Write the ring buffer to `path` (default: a file in the temp dir, usually RAM). Returns the path."""
+    path = path or os.path.join(tempfile.gettempdir(), "pifire-touch-recent.log")
+    lines = recent_lines()
+    dropped = _state["queue"].dropped if _state else 0
+    with open(path, "w") as f:
+        f.write("\n".join(lines) + "\n")
+        if dropped:
+            f.write(f"({dropped} records dropped: log queue full)\n")
+    return path
+
+
+def shutdown_logging():
+    """Drain the queue and close handlers (call last on exit)."""
+    listener = _state.get("listener")
+    if listener is not None:
+        listener.stop()
+        for handler in listener.handlers:
+            handler.close()
+        _state.clear()
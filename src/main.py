@@ -1,45 +1,111 @@
 import sys
 import os
+import json
+import logging
+
+from startup import StartupProfile, binding_problem, configure_qml_cache, precompile_qml
 
 from PySide6.QtWidgets import QApplication
-from PySide6.QtQml import QQmlApplicationEngine
-from PySide6.QtCore import QUrl, QCoreApplication, QTimer
+from PySide6.QtCore import QUrl, QTimer, Qt
+
+# Import our bridge logic (one PiFireBridge per controller)
+from grills import GrillManager, load_grills
+from logs import setup_logging, dump_recent, shutdown_logging
 
-# Import our bridge logic
-from bridge import PiFireBridge
+log = logging.getLogger("pifire.main")
 
 def main():
+    # Phase timings count from process start (python3 main.py --profile-startup prints them and exits)
+    profile = StartupProfile()
+    profile.mark("imports")
+    profiling = "--profile-startup" in sys.argv
+
+    # Queue-backed logging first; the bridge re-applies level/file from config.json
+    setup_logging()
+    problem = binding_problem()
+    if problem:
+        log.error(problem)
+    # Compiled QML survives reboots; must be set before any QML engine exists
+    configure_qml_cache()
     app = QApplication(sys.argv)
     app.setApplicationName("PiFire Touch")
     app.setOrganizationName("PiFire")
     
-    # Instantiate the bridge (Backend logic) - Parent appropriately
-    print("Main: Creating Bridge...")
-    bridge = PiFireBridge(app)
-    
+    current_dir = os.path.dirname(os.path.abspath(__file__))
+    if "--precompile-qml" in sys.argv:
+        # Install/upgrade step: fill the QML disk cache so the first boot is fast too
+        failed = [(name, error) for name, error in precompile_qml(os.path.join(current_dir, "ui")) if error]
+        for name, error in failed:
+            log.error("QML compile error in %s: %s", name, error)
+        shutdown_logging()
+        sys.exit(1 if failed else 0)
+    profile.mark("qt_app")
+
+    # Instantiate the bridges (Backend logic) - Parent appropriately
+    # The first poll goes out from here and runs on the network thread while QML loads
+    log.info("Creating Bridge...")
+    grills = GrillManager(load_grills(), app)
+    # Cancel in-flight requests and stop the network loop on quit (incl. SIGINT)
+    app.aboutToQuit.connect(grills.shutdown)
+    grills.active.modeChanged.connect(lambda *args: profile.mark("first_data"))
+    profile.mark("bridge")
+
+    from PySide6.QtQml import QQmlApplicationEngine
     engine = QQmlApplicationEngine()
     
-    # Expose the bridge to QML as a global property "bridge"
-    print("Main: Setting Context Property 'bridge'...")
-    engine.rootContext().setContextProperty("bridge", bridge)
+    # Expose the active grill's bridge to QML as a global property "bridge"
+    log.info("Setting Context Property 'bridge'...")
+    context = engine.rootContext()
+    context.setContextProperty("grills", grills)
+    context.setContextProperty("bridge", grills.active)
+    # Switching grills re-points every `bridge.*` binding at the other controller
+    grills.activeChanged.connect(lambda: context.setContextProperty("bridge", grills.active))
     
-    # Load the main QML file
+    # Load the main QML file (only the dashboard; other pages load on first visit)
     # Requires absolute path or robust relative path logic
-    current_dir = os.path.dirname(os.path.abspath(__file__))
     qml_file = os.path.join(current_dir, "ui", "main.qml")
     
     engine.load(QUrl.fromLocalFile(qml_file))
     
     if not engine.rootObjects():
         sys.exit(-1)
-        
+    profile.mark("qml_load")
+
+    # "ready": the first frame drawn once the dashboard has server data
+    window = engine.rootObjects()[0]
+
+    def on_frame():
+        profile.mark("first_frame")
+        if "first_data" not in profile.marks:
+            return
+        profile.mark("ready")
+        window.frameSwapped.disconnect(on_frame)
+        log.info("Startup ms since process start: %s", profile.summary())
+        for phase, ms in profile.marks.items():
+            grills.metrics.observe("startup_ms", ms, phase)
+        if profiling:
+            print(json.dumps(profile.marks), flush=True)
+            app.quit()
+
+    # frameSwapped comes from the render thread: handle it on the GUI thread
+    window.frameSwapped.connect(on_frame, Qt.QueuedConnection)
+    if profiling:
+        QTimer.singleShot(60000, app.quit) # No server data: give up
+
     # Handle KeyboardInterrupt (Ctrl+C) nicely allowing Qt to cleanup
     import signal
     def handle_sigint(signum, frame):
-        print("\nStopping PiFire Touch...")
+        log.info("Stopping PiFire Touch...")
         app.quit()
         
     signal.signal(signal.SIGINT, handle_sigint)
+
+    # `kill -USR1 <pid>` dumps the recent log ring buffer (to the temp dir, not the SD card)
+    def handle_dump(signum, frame):
+        log.info("Recent log written to %s", dump_recent())
+
+    if hasattr(signal, "SIGUSR1"):
+        signal.signal(signal.SIGUSR1, handle_dump)
     
     # Timer to let the python interpreter run periodically to catch signals
     # (Qt event loop can block python signals otherwise)
@@ -47,7 +113,9 @@ def main():
     timer.start(500)
     timer.timeout.connect(lambda: None) 
     
-    sys.exit(app.exec())
+    code = app.exec()
+    shutdown_logging()
+    sys.exit(code)
 
 if __name__ == "__main__":
     main()
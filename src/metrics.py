@@ -0,0 +1,200 @@
+import json
+import threading
+from bisect import bisect_left
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Upper bounds (ms) for latency-style histograms; the last bucket is open ended
+BUCKETS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+
+class Histogram:
+    """Fixed-bucket histogram with count/sum/max/last and interpolated quantiles."""
+
+    __slots__ = ("buckets", "counts", "count", "total", "max", "last")
+
+    def __init__(self, buckets=BUCKETS_MS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.last = 0.0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.total += value
+        self.last = value
+        if value > self.max:
+            self.max = value
+
+    def quantile(self, q):
+        # Linear interpolation inside the bucket holding the q-th sample
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            if n and seen + n >= rank:
+                lower = self.buckets[i - 1] if i > 0 else 0.0
+                upper = min(self.buckets[i], self.max) if i < len(self.buckets) else self.max
+                return round(lower + (upper - lower) * (rank - seen) / n, 3)
+            seen += n
+        return self.max
+
+    def summary(self):
+        return {
+            "count": self.count,
+            "avg": round(self.total / self.count, 3) if self.count else 0.0,
+            "last": round(self.last, 3),
+            "max": round(self.max, 3),
+            "p50": self.quantile(0.5),
+            "p95": self.quantile(0.95),
+        }
+
+
+class Metrics:
+    """Thread-safe counters and histograms for the bridge hot paths.
+
+    Every metric has a name and an optional label (endpoint, signal name...).
+    Recording is a dict lookup plus a few additions under one lock, cheap
+    enough for every poll and every signal emit.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters = {}
+        self._histograms = {}
+        self._buckets = {}
+
+    def set_buckets(self, name, buckets):
+        """Use custom bucket bounds for histogram `name` (before its first observe)."""
+        self._buckets[name] = tuple(buckets)
+
+    def inc(self, name, label=None, n=1):
+        key = (name, label)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + n
+
+    def observe(self, name, value, label=None):
+        key = (name, label)
+        with self._lock:
+            h = self._histograms.get(key)
+            if h is None:
+                h = self._histograms[key] = Histogram(self._buckets.get(name, BUCKETS_MS))
+            h.observe(value)
+
+    def counter(self, name, label=None):
+        with self._lock:
+            return self._counters.get((name, label), 0)
+
+    def histogram(self, name, label=None):
+        """Summary dict of one histogram (zeros if never observed)."""
+        with self._lock:
+            h = self._histograms.get((name, label))
+            return h.summary() if h is not None else Histogram(()).summary()
+
+    def labels(self, name):
+        with self._lock:
+            return sorted({label for (n, label) in list(self._counters) + list(self._histograms) if n == name and label is not None})
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+    def snapshot(self):
+        """{"counters": {"name[:label]": n}, "histograms": {"name[:label]": summary}}"""
+        with self._lock:
+            return {
+                "counters": {_flat(k): v for k, v in self._counters.items()},
+                "histograms": {_flat(k): h.summary() for k, h in self._histograms.items()},
+            }
+
+    def render_prometheus(self, prefix="pifire_"):
+        """Prometheus text exposition format, labels as key="..."."""
+        lines = []
+        with self._lock:
+            for (name, label), value in sorted(self._counters.items(), key=_sort_key):
+                lines.append(f"{prefix}{name}_total{_labels(label)} {value}")
+            for (name, label), h in sorted(self._histograms.items(), key=_sort_key):
+                seen = 0
+                for bound, n in zip(list(h.buckets) + ["+Inf"], h.counts):
+                    seen += n
+                    lines.append(f"{prefix}{name}_bucket{_labels(label, le=bound)} {seen}")
+                lines.append(f"{prefix}{name}_sum{_labels(label)} {h.total}")
+                lines.append(f"{prefix}{name}_count{_labels(label)} {h.count}")
+        return "\n".join(lines) + "\n"
+
+
+def _flat(key):
+    name, label = key
+    return name if label is None else f"{name}:{label}"
+
+
+def _sort_key(item):
+    name, label = item[0]
+    return (name, "" if label is None else str(label))
+
+
+def _labels(label, le=None):
+    parts = []
+    if label is not None:
+        parts.append('key="%s"' % str(label).replace("\\", "\\\\").replace('"', '\\"'))
+    if le is not None:
+        parts.append(f'le="{le}"')
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class MetricsServer:
+    """Local-only HTTP endpoint for a Metrics registry.
+
+    GET /metrics       Prometheus text format
+    GET /metrics.json  Metrics.snapshot()
+    GET <path>         json_routes[path]() as JSON (e.g. /stalls.json)
+
+    Always binds to 127.0.0.1; reach it from elsewhere over SSH.
+    """
+
+    def __init__(self, metrics, port, json_routes=None):
+        self.metrics = metrics
+        self.json_routes = dict(json_routes or {})
+        owner = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path == "/metrics":
+                    body = owner.metrics.render_prometheus().encode("utf-8")
+                    content_type = "text/plain; version=0.0.4"
+                elif self.path == "/metrics.json":
+                    body = json.dumps(owner.metrics.snapshot()).encode("utf-8")
+                    content_type = "application/json"
+                elif self.path in owner.json_routes:
+                    body = json.dumps(owner.json_routes[self.path]()).encode("utf-8")
+                    content_type = "application/json"
+                else:
+                    self.send_error(404)
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, name="pifire-metrics", daemon=True)
+
+    @property
+    def port(self):
+        return self._server.server_address[1]
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
@@ -0,0 +1,129 @@
+from PySide6.QtCore import QAbstractListModel, QModelIndex, Qt, Signal, Slot, Property
+
+
+class KeyedListModel(QAbstractListModel):
+    """List model over plain dicts, updated in place from fresh lists.
+
+    set_items() matches rows by KEY_FIELDS and only emits dataChanged for
+    the rows/roles whose values moved, plus insert/remove for rows that
+    appeared or disappeared, so QML delegates are not rebuilt on every poll.
+    Subclasses declare ROLES (dict keys exposed as roles) and KEY_FIELDS.
+    """
+
+    ROLES = ()
+    KEY_FIELDS = ("label",)
+
+    countChanged = Signal()
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._items = []
+        self._role_names = {Qt.UserRole + 1 + i: name.encode() for i, name in enumerate(self.ROLES)}
+        self._role_ids = {name: Qt.UserRole + 1 + i for i, name in enumerate(self.ROLES)}
+
+    def _key(self, item):
+        return tuple(item.get(f) for f in self.KEY_FIELDS)
+
+    # --- QAbstractListModel ---
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._items)
+
+    def roleNames(self):
+        return self._role_names
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or not 0 <= index.row() < len(self._items):
+            return None
+        name = self._role_names.get(role)
+        if name is None:
+            return None
+        return self._items[index.row()].get(name.decode())
+
+    # --- QML helpers ---
+
+    @Property(int, notify=countChanged)
+    def count(self):
+        return len(self._items)
+
+    @Slot(int, result=dict)
+    def get(self, row):
+        if 0 <= row < len(self._items):
+            return dict(self._items[row])
+        return {}
+
+    # --- Updates ---
+
+    def items(self):
+        return list(self._items)
+
+    def set_items(self, items):
+        old_count = len(self._items)
+        keys = [self._key(item) for item in items]
+        wanted = set(keys)
+
+        # 1. Rows whose key is gone
+        for row in reversed(range(len(self._items))):
+            if self._key(self._items[row]) not in wanted:
+                self._remove_row(row)
+
+        # 2. Walk the new list: update in place, or insert (moving if reordered)
+        for row, item in enumerate(items):
+            key = keys[row]
+            if row < len(self._items) and self._key(self._items[row]) == key:
+                old = self._items[row]
+                if old != item:
+                    roles = [self._role_ids[n] for n in self.ROLES if old.get(n) != item.get(n)]
+                    self._items[row] = item
+                    if roles:
+                        idx = self.index(row)
+                        self.dataChanged.emit(idx, idx, roles)
+                continue
+
+            for later in range(row + 1, len(self._items)):
+                if self._key(self._items[later]) == key:
+                    self._remove_row(later)
+                    break
+            self.beginInsertRows(QModelIndex(), row, row)
+            self._items.insert(row, item)
+            self.endInsertRows()
+
+        # 3. Leftovers (duplicate keys that shrank)
+        while len(self._items) > len(items):
+            self._remove_row(len(self._items) - 1)
+
+        if len(self._items) != old_count:
+            self.countChanged.emit()
+
+    def _remove_row(self, row):
+        self.beginRemoveRows(QModelIndex(), row, row)
+        del self._items[row]
+        self.endRemoveRows()
+
+
+class ProbeListModel(KeyedListModel):
+    """Enabled food probes: label, name, temp, target."""
+
+    ROLES = ("label", "name", "temp", "target")
+    KEY_FIELDS = ("label",)
+
+
+class TimerListModel(KeyedListModel):
+    """Timer entries from notify_data."""
+
+    ROLES = ("label", "req", "time_remaining", "shutdown", "keep_warm")
+    KEY_FIELDS = ("label",)
+
+
+class NotifyTargetModel(KeyedListModel):
+    """Probe notification targets (probe, probe_limit_high, probe_limit_low)."""
+
+    ROLES = ("label", "name", "type", "target", "condition", "req", "triggered", "eta", "shutdown", "keep_warm", "reignite")
+    KEY_FIELDS = ("label", "type")
+
+
+class GrillListModel(KeyedListModel):
+    """One row per controller on a multi-grill panel (see GrillManager)."""
+
+    ROLES = ("name", "address", "grillTemp", "setPoint", "mode", "units", "connectionState", "active")
+    KEY_FIELDS = ("name",)
@@ -0,0 +1,144 @@
+import hashlib
+import json
+import re
+import time
+
+try:
+    import orjson
+except ImportError: # Optional: pip install orjson
+    orjson = None
+
+DECODER = "orjson" if orjson is not None else "json"
+
+# /api/current top-level keys in the order the server writes them
+CURRENT_SECTIONS = ("current", "notify_data", "status")
+
+
+def loads(body):
+    """Decode a JSON body (bytes or str) with orjson when installed, else the stdlib."""
+    if orjson is not None:
+        return orjson.loads(body)
+    return json.loads(body)
+
+
+def body_hash(body):
+    if isinstance(body, str):
+        body = body.encode("utf-8")
+    return hashlib.blake2b(body, digest_size=16).digest()
+
+
+class SectionDecoder:
+    """Decodes a JSON object whose top-level keys come in a known order, one section at a time.
+
+    /api/current is three sections: "current" (temperatures and TS, moves
+    every tick while cooking), "notify_data" (the bulk of the bytes, rarely
+    changes) and "status". The section boundaries are found by a byte search
+    for the next key, each section's bytes are hashed, and only sections
+    whose bytes changed are decoded; the others reuse the previous (shared,
+    never mutated) objects. A body that does not split cleanly - other key
+    order, extra keys, a key name inside a string - is decoded whole.
+    """
+
+    def __init__(self, keys):
+        self.keys = tuple(keys)
+        # Compact separators (what the server sends) are found with bytes.find,
+        # anything with whitespace falls back to a regex search
+        self._literals = [(b"{" if i == 0 else b",") + b'"' + k.encode() + b'":' for i, k in enumerate(self.keys)]
+        self._markers = [re.compile((rb"\{" if i == 0 else rb",") + rb'\s*"' + re.escape(k.encode()) + rb'"\s*:')
+                         for i, k in enumerate(self.keys)]
+        self._sections = {} # key -> (hash, decoded value)
+        self.sections_decoded = 0
+        self.sections_reused = 0
+
+    def reset(self):
+        self._sections = {}
+
+    def _split(self, body):
+        spans = []
+        pos = 0
+        for literal, marker in zip(self._literals, self._markers):
+            start = body.find(literal, pos)
+            if start >= 0:
+                end = start + len(literal)
+            else:
+                m = marker.search(body, pos)
+                if m is None:
+                    return None
+                start, end = m.span()
+            if not spans and body[:start].strip():
+                return None
+            if spans:
+                spans[-1][1] = start
+            spans.append([end, None])
+            pos = end
+        end = body.rstrip()
+        if not end.endswith(b"}"):
+            return None
+        spans[-1][1] = len(end) - 1
+        return spans
+
+    def decode(self, body):
+        if isinstance(body, str):
+            body = body.encode("utf-8")
+        spans = self._split(body)
+        if spans is None:
+            self.reset()
+            return loads(body)
+
+        data = {}
+        sections = {}
+        decoded = 0
+        try:
+            for key, (start, end) in zip(self.keys, spans):
+                chunk = body[start:end]
+                digest = hashlib.blake2b(chunk, digest_size=16).digest()
+                previous = self._sections.get(key)
+                if previous is not None and previous[0] == digest:
+                    value = previous[1]
+                else:
+                    value = loads(chunk)
+                    decoded += 1
+                data[key] = value
+                sections[key] = (digest, value)
+        except ValueError:
+            self.reset()
+            return loads(body)
+        self._sections = sections
+        self.sections_decoded += decoded
+        self.sections_reused += len(self.keys) - decoded
+        return data
+
+
+class PayloadDecoder:
+    """Byte-level change detection in front of the JSON decoder.
+
+    decode(body) returns (data, changed): a body identical to the previous
+    one is only hashed, and the caller skips everything downstream of it.
+    Changed bodies go through the SectionDecoder when the endpoint's
+    top-level layout is known, else a plain decode. decode_ms is the cost
+    of the last decode (0 on a hit).
+    """
+
+    def __init__(self, sections=None):
+        self.sections = SectionDecoder(sections) if sections else None
+        self.hash = None
+        self.data = None
+        self.decode_ms = 0.0
+
+    def reset(self):
+        self.hash = None
+        self.data = None
+        if self.sections is not None:
+            self.sections.reset()
+
+    def decode(self, body):
+        digest = body_hash(body)
+        if digest == self.hash and self.data is not None:
+            self.decode_ms = 0.0
+            return self.data, False
+        start = time.perf_counter()
+        data = self.sections.decode(body) if self.sections is not None else loads(body)
+        self.decode_ms = (time.perf_counter() - start) * 1000.0
+        self.hash = digest
+        self.data = data
+        return data, True
@@ -0,0 +1,88 @@
+import math
+import time
+
+from PySide6.QtCore import QObject, QTimer
+
+
+class ScheduledTimer:
+    """The slice of the QTimer API the bridge uses (start/stop/interval), on a PollScheduler."""
+
+    def __init__(self, scheduler, callback):
+        self._scheduler = scheduler
+        self.callback = callback
+        self._interval = 0
+
+    def interval(self):
+        return self._interval
+
+    def isActive(self):
+        return self._scheduler.is_armed(self)
+
+    def start(self, msec=None):
+        if msec is not None:
+            self._interval = int(msec)
+        self._scheduler.arm(self, time.monotonic() + self._interval / 1000.0)
+
+    def setInterval(self, msec):
+        # Like QTimer: a running timer restarts with the new interval
+        self._interval = int(msec)
+        if self.isActive():
+            self.start()
+
+    def stop(self):
+        self._scheduler.disarm(self)
+
+
+class PollScheduler(QObject):
+    """One single-shot QTimer driving every grill's poll loop.
+
+    Each bridge gets a ScheduledTimer with its own (adaptive) interval; the
+    scheduler sleeps until the earliest deadline and fires everything due
+    within SLACK_S of it in one wakeup, so N grills cost one timer and at
+    most one wakeup per poll rather than N fixed-rate timers.
+    """
+
+    SLACK_S = 0.01
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._due = {} # ScheduledTimer -> monotonic deadline
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.timeout.connect(self._fire)
+
+    def timer(self, callback):
+        return ScheduledTimer(self, callback)
+
+    def is_armed(self, entry):
+        return entry in self._due
+
+    def arm(self, entry, deadline):
+        self._due[entry] = deadline
+        self._rearm()
+
+    def disarm(self, entry):
+        if self._due.pop(entry, None) is not None:
+            self._rearm()
+
+    def stop(self):
+        self._due.clear()
+        self._timer.stop()
+
+    def _rearm(self):
+        if not self._due:
+            self._timer.stop()
+            return
+        delay = max(min(self._due.values()) - time.monotonic(), 0.0)
+        self._timer.start(int(math.ceil(delay * 1000)))
+
+    def _fire(self):
+        now = time.monotonic()
+        due = [entry for entry, deadline in self._due.items() if deadline <= now + self.SLACK_S]
+        for entry in due:
+            self._due[entry] = now + entry.interval() / 1000.0
+        for entry in due:
+            # A callback may stop or re-arm any timer, including itself
+            if entry in self._due:
+                entry.callback()
+        self._rearm()
@@ -0,0 +1,156 @@
+def _num(value, default=0):
+    # Server sends numbers as int, float or numeric strings
+    try:
+        return int(float(value))
+    except (TypeError, ValueError):
+        return default
+
+
+NOTIFY_TARGET_TYPES = ('probe', 'probe_limit_high', 'probe_limit_low')
+
+
+class StatusSnapshot:
+    """Decoded /api/current payload, one slot per value the UI shows.
+
+    Built once per payload by decode_current(); diff_snapshots() then tells
+    the bridge which fields (and therefore which signals) actually changed.
+    """
+
+    # Order matters: it is the order change signals are emitted in
+    FIELDS = (
+        "mode", "status", "outpins", "lid_open", "s_plus", "p_mode",
+        "start_duration", "startup_progress", "start_time",
+        "prime_duration", "mode_start_time", "prime_progress",
+        "units", "grill_temp", "set_point", "timers", "hopper", "probes",
+        "notify_targets",
+    )
+
+    __slots__ = FIELDS + ("grill_raw", "ts")
+
+    def __init__(self):
+        self.mode = "Disconnected"
+        self.status = "Connecting..."
+        self.outpins = {"fan": False, "auger": False, "igniter": False, "power": False}
+        self.lid_open = False
+        self.s_plus = False
+        self.p_mode = "--"
+        self.start_duration = 0
+        self.startup_progress = 0.0
+        self.start_time = 0.0
+        self.prime_duration = 0
+        self.mode_start_time = 0.0
+        self.prime_progress = 0.0
+        self.units = "C"
+        self.grill_temp = 0
+        self.set_point = 0
+        self.timers = []
+        self.hopper = {}
+        self.probes = []
+        self.notify_targets = []
+        self.grill_raw = None # Unrounded grill temp, None if the payload has none
+        self.ts = 0.0 # Server timestamp (s)
+
+    def advance(self, now):
+        """Recompute the clock-driven fields (mode progress) for server time `now` (s)."""
+        self.startup_progress = _progress(now, self.start_time, self.start_duration)
+        self.prime_progress = _progress(now, self.mode_start_time, self.prime_duration)
+
+
+def _progress(now, started, duration):
+    if duration > 0 and started > 0 and now > 0:
+        return min(max((now - started) / duration, 0.0), 1.0)
+    return 0.0
+
+
+def decode_current(data, hopper_details=None):
+    """Decode an /api/current payload into a StatusSnapshot (single pass)."""
+    snap = StatusSnapshot()
+    status_node = data.get('status') or {}
+    current = data.get('current') or {}
+
+    # 1. Status & Mode
+    snap.mode = status_node.get('mode', 'Unknown')
+    snap.status = status_node.get('display_mode', 'Unknown')
+    snap.outpins = status_node.get('outpins', {})
+    snap.lid_open = status_node.get('lid_open_detected', False)
+    snap.s_plus = status_node.get('s_plus', False)
+    snap.p_mode = str(status_node.get('p_mode', '--'))
+    snap.units = status_node.get('units', 'C')
+
+    # Mode progress (Startup / Prime), relative to the server clock
+    current_ts_ms = current.get('TS', 0)
+    snap.ts = current_ts_ms / 1000.0 if current_ts_ms > 0 else 0
+    snap.start_duration = status_node.get('start_duration', 0)
+    snap.start_time = status_node.get('startup_timestamp', 0)
+    snap.prime_duration = status_node.get('prime_duration', 0)
+    snap.mode_start_time = status_node.get('start_time', 0)
+    snap.advance(snap.ts)
+
+    # 2. Grill Temp
+    p_current = current.get('P') or {}
+    if 'Grill' in p_current:
+        snap.grill_raw = float(p_current['Grill'])
+        snap.grill_temp = int(snap.grill_raw)
+
+    # 3. Set Point: current['PSP'] first, then status fallbacks
+    set_point = _num(current.get('PSP', 0))
+    if set_point == 0:
+        set_point = _num(status_node.get('primary_setpoint', 0))
+    if set_point == 0:
+        set_point = _num(status_node.get('set_point', 0))
+
+    # Notify Data (Timers, Hopper, Probe Targets)
+    timers = []
+    hopper = {}
+    probe_targets = {}
+    probe_names = {}
+    notify_targets = []
+    for item in data.get('notify_data') or ():
+        kind = item.get('type')
+        if kind in NOTIFY_TARGET_TYPES:
+            notify_targets.append(item)
+        if kind == 'probe':
+            label = item.get('label')
+            if label == 'Grill':
+                if set_point == 0:
+                    set_point = _num(item.get('target', 0))
+            else:
+                probe_targets[label] = _num(item.get('target', 0))
+                if 'name' in item:
+                    probe_names[label] = item['name']
+        elif kind == 'timer':
+            timers.append(item)
+        elif kind == 'hopper':
+            hopper = dict(item)
+
+    # Always merge persisted hopper details (level/name) into the current hopper state
+    if hopper_details:
+        hopper.update(hopper_details)
+
+    snap.set_point = set_point
+    snap.timers = timers
+    snap.notify_targets = notify_targets
+    snap.hopper = hopper
+
+    # 4. Probes (enabled only, with Targets and Names)
+    probe_status = (status_node.get('probe_status') or {}).get('F', {})
+    f_current = current.get('F') or {}
+    probes = []
+    for key in sorted(f_current):
+        if not probe_status.get(key, {}).get('enabled', False):
+            continue
+        probes.append({
+            'label': key,
+            'name': probe_names.get(key, key),
+            'temp': _num(f_current[key]),
+            'target': probe_targets.get(key, 0),
+        })
+    snap.probes = probes
+    return snap
+
+
+def diff_snapshots(old, new):
+    """Return the FIELDS whose value differs between two snapshots, in emit order."""
+    if old is None:
+        return list(StatusSnapshot.FIELDS)
+    return [name for name in StatusSnapshot.FIELDS if getattr(old, name) != getattr(new, name)]
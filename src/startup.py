@@ -0,0 +1,98 @@
+import logging
+import os
+import sys
+import time
+
+log = logging.getLogger("pifire.startup")
+
+
+def process_age_s():
+    """Seconds since this process was exec'd (Linux), so interpreter start-up is counted too."""
+    try:
+        with open("/proc/self/stat", "r") as f:
+            # Field 22 (starttime, clock ticks since boot) comes after the "(comm)" field
+            start_ticks = int(f.read().rsplit(")", 1)[1].split()[19])
+        with open("/proc/uptime", "r") as f:
+            uptime = float(f.read().split()[0])
+        return max(uptime - start_ticks / os.sysconf("SC_CLK_TCK"), 0.0)
+    except (OSError, ValueError, IndexError):
+        return 0.0
+
+
+def binding_problem():
+    """Why this PySide6 / Python pair cannot run the panel, or None.
+
+    PySide6 6.12.0 on Python < 3.12 drops a reference to True on every
+    signal emit (and to None on void calls); the interpreter aborts with
+    bool_dealloc once the count reaches zero, within minutes of polling or
+    seconds of a fast replay. From 3.12 on those objects are immortal.
+    """
+    import PySide6
+    if PySide6.__version__ == "6.12.0" and sys.version_info < (3, 12):
+        return "PySide6 6.12.0 is not supported on Python %d.%d, install another version (see requirements.txt)" % sys.version_info[:2]
+    return None
+
+
+class StartupProfile:
+    """Phase timings from process start to the first usable dashboard frame.
+
+    mark(phase) records the time since process start (ms); the phases
+    main.py marks are imports, qt_app, bridge, qml_load, first_frame,
+    first_data and ready (first frame drawn with server data). Marks are
+    logged once, at ready, and kept for metrics.
+    """
+
+    def __init__(self):
+        self._t0 = time.monotonic() - process_age_s()
+        self.marks = {}
+
+    def mark(self, phase):
+        if phase not in self.marks:
+            self.marks[phase] = round((time.monotonic() - self._t0) * 1000.0, 1)
+        return self.marks[phase]
+
+    def summary(self):
+        return ", ".join(f"{phase} {ms:.0f}" for phase, ms in self.marks.items())
+
+
+def configure_qml_cache(path=None):
+    """Keep the QML disk cache (compiled .qmlc) in a persistent, writable place.
+
+    Qt caches compiled QML next to the user's cache dir, which a service
+    without a HOME (or with a read-only one) silently loses, recompiling
+    every QML file on every boot. Must run before the QML engine is created.
+    Returns the cache directory or None when left to Qt.
+    """
+    if os.environ.get("QML_DISK_CACHE_PATH") or os.environ.get("QML_DISABLE_DISK_CACHE"):
+        return os.environ.get("QML_DISK_CACHE_PATH")
+    if not path:
+        base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+        path = os.path.join(base, "pifire-touch", "qmlcache")
+    try:
+        os.makedirs(path, exist_ok=True)
+    except OSError as e:
+        log.warning("QML cache unavailable (%s), compiling at every start", e)
+        return None
+    if not os.access(path, os.W_OK):
+        return None
+    os.environ["QML_DISK_CACHE_PATH"] = path
+    return path
+
+
+def precompile_qml(directory):
+    """Compile every .qml under `directory` into the disk cache without instantiating it.
+
+    Run once after install or upgrade (main.py --precompile-qml) so the first
+    boot does not pay for compilation either. Returns [(file, error or "")].
+    """
+    from PySide6.QtCore import QUrl
+    from PySide6.QtQml import QQmlComponent, QQmlEngine
+
+    engine = QQmlEngine()
+    results = []
+    for name in sorted(os.listdir(directory)):
+        if name.endswith(".qml"):
+            component = QQmlComponent(engine, QUrl.fromLocalFile(os.path.join(directory, name)))
+            errors = [e.toString() for e in component.errors()]
+            results.append((name, "; ".join(errors)))
+    return results
@@ -887,7 +887,7 @@ Page {
                             interval: 500; running: bridge.mode === "Prime"; repeat: true
                             onTriggered: {
                                 if (bridge.modeStartTime > 0 && bridge.primeDuration > 0) {
-                                    var now = new Date().getTime() / 1000;
+                                    var now = bridge.serverTime();
                                     var elapsed = now - bridge.modeStartTime;
                                     var remaining = Math.max(0, Math.ceil(bridge.primeDuration - elapsed));
                                     primeTimerText.text = remaining + "s";
@@ -911,7 +911,7 @@ Page {
                             interval: 500; running: (bridge.mode === "Startup" || bridge.mode === "Reignite"); repeat: true
                             onTriggered: {
                                 if (bridge.startTime > 0 && bridge.startDuration > 0) {
-                                    var now = new Date().getTime() / 1000;
+                                    var now = bridge.serverTime();
                                     var elapsed = now - bridge.startTime;
                                     var remaining = Math.max(0, Math.ceil(bridge.startDuration - elapsed));
                                     startupTimerText.text = remaining + "s";
@@ -946,7 +946,7 @@ Page {
                         width: parent.width * bridge.primeProgress
                         radius: 5
                         color: "#FF3D00"
-                        Behavior on width { NumberAnimation { duration: 500 } }
+                        Behavior on width { NumberAnimation { duration: 100 } } // One interpolation tick
                     }
                 }
 
@@ -964,7 +964,7 @@ Page {
                         width: parent.width * bridge.startupProgress
                         radius: 5
                         color: window.primaryColor
-                        Behavior on width { NumberAnimation { duration: 500 } }
+                        Behavior on width { NumberAnimation { duration: 100 } } // One interpolation tick
                     }
                 }
 
@@ -1022,7 +1022,7 @@ Page {
                     Layout.fillWidth: true
                     Layout.fillHeight: true
                     clip: true
-                    model: bridge.probes
+                    model: bridge.probeModel
                     spacing: 12
 
                     delegate: Rectangle {
@@ -1066,7 +1066,7 @@ Page {
                                 
                                 // Probe Name
                                 Text {
-                                    text: modelData.name
+                                    text: model.name
                                     color: "#DDD"
                                     font.pixelSize: 15
                                     font.bold: true
@@ -1076,7 +1076,7 @@ Page {
                                 
                                 // Current Temp (Large)
                                 Text {
-                                    text: modelData.temp + "°" + bridge.units
+                                    text: model.temp + "°" + bridge.units
                                     color: "white"
                                     font.pixelSize: 28
                                     font.bold: true
@@ -1085,7 +1085,7 @@ Page {
 
                             // Target Temp (Badge style)
                             Rectangle {
-                                visible: modelData.target > 0
+                                visible: model.target > 0
                                 width: 50; height: 40
                                 color: "#333"
                                 radius: 8
@@ -1103,7 +1103,7 @@ Page {
                                         Layout.alignment: Qt.AlignHCenter
                                     }
                                     Text {
-                                        text: modelData.target + "°"
+                                        text: model.target + "°"
                                         color: "#CCC"
                                         font.pixelSize: 14
                                         font.bold: true
@@ -1116,7 +1116,7 @@ Page {
                 }
 
                 Text {
-                    visible: bridge.probes.length === 0
+                    visible: bridge.probeModel.count === 0
                     text: window.strings.status_no_probes
                     color: "#555"
                     font.italic: true
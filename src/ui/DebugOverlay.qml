@@ -0,0 +1,93 @@
+import QtQuick 2.15
+
+// Field-tuning overlay: key bridge metrics, refreshed once per second.
+// Enabled with "debug_overlay": true in config.json.
+Rectangle {
+    id: overlay
+    width: 260
+    height: column.implicitHeight + 16
+    radius: 6
+    color: "#CC000000"
+    border.color: "#444"
+
+    property var snap: ({ counters: {}, histograms: {} })
+    property var stalls: []
+    property int lastSignals: 0
+    property real signalsPerSec: 0
+
+    function hist(key) {
+        return snap.histograms[key] || { count: 0, avg: 0, last: 0, max: 0, p50: 0, p95: 0 }
+    }
+    function counter(key) {
+        return snap.counters[key] || 0
+    }
+
+    Timer {
+        interval: 1000
+        running: overlay.visible
+        repeat: true
+        triggeredOnStart: true
+        onTriggered: {
+            overlay.snap = bridge.metricsSnapshot()
+            overlay.stalls = bridge.recentStalls()
+            var total = 0
+            for (var key in overlay.snap.counters) {
+                if (key.indexOf("signal_emits:") === 0) total += overlay.snap.counters[key]
+            }
+            overlay.signalsPerSec = overlay.lastSignals > 0 ? total - overlay.lastSignals : 0
+            overlay.lastSignals = total
+        }
+    }
+
+    Column {
+        id: column
+        anchors.fill: parent
+        anchors.margins: 8
+        spacing: 2
+
+        property int fontSize: 12
+
+        Text {
+            color: "#40C4FF"; font.pixelSize: column.fontSize; font.family: "monospace"
+            text: "rtt /api/current  " + hist("http_ms:/api/current").avg.toFixed(1) + " avg  " + hist("http_ms:/api/current").p95 + " p95"
+        }
+        Text {
+            color: "white"; font.pixelSize: column.fontSize; font.family: "monospace"
+            text: "parse            " + hist("parse_ms").avg.toFixed(2) + " avg  " + hist("parse_ms").max.toFixed(1) + " max"
+        }
+        Text {
+            // Bodies identical to the previous one are only hashed (not decoded or parsed)
+            property int hits: counter("payload_unchanged:/api/current")
+            property int total: hits + hist("decode_ms:/api/current").count
+            color: "white"; font.pixelSize: column.fontSize; font.family: "monospace"
+            text: "decode hit " + (total > 0 ? Math.round(100 * hits / total) : 0) + "%  " + hist("decode_ms:/api/current").avg.toFixed(2) + " ms avg"
+        }
+        Text {
+            color: "white"; font.pixelSize: column.fontSize; font.family: "monospace"
+            text: "ticks " + counter("poll_ticks") + "  skipped " + counter("poll_ticks_skipped:in_flight") + "/" + counter("poll_ticks_skipped:not_due")
+        }
+        Text {
+            color: hist("gui_lag_ms").p95 > 50 ? "#FF3D00" : "white"; font.pixelSize: column.fontSize; font.family: "monospace"
+            text: "gui lag          " + hist("gui_lag_ms").p95 + " p95  " + hist("gui_lag_ms").max.toFixed(0) + " max"
+        }
+        Text {
+            // Details (handler, stack) in the stall log / GET /stalls.json
+            property var last: overlay.stalls.length > 0 ? overlay.stalls[overlay.stalls.length - 1] : null
+            visible: last !== null
+            color: "#FFAB40"; font.pixelSize: column.fontSize; font.family: "monospace"
+            text: last ? "stalls " + overlay.stalls.length + "  last " + last.ms.toFixed(0) + " ms " + last.handler : ""
+        }
+        Text {
+            color: "white"; font.pixelSize: column.fontSize; font.family: "monospace"
+            text: "signals/s " + overlay.signalsPerSec + "  stream ev " + (counter("stream_events:current") + counter("stream_events:message"))
+        }
+        Text {
+            color: "white"; font.pixelSize: column.fontSize; font.family: "monospace"
+            text: "commands " + hist("command_ms").count + "  " + hist("command_ms").avg.toFixed(0) + " ms avg"
+        }
+        Text {
+            color: "white"; font.pixelSize: column.fontSize; font.family: "monospace"
+            text: "history " + hist("history_fetch_ms").last.toFixed(0) + " ms  " + hist("history_fetch_points").last + " pts"
+        }
+    }
+}
@@ -8,9 +8,13 @@ Page {
     background: Rectangle { color: "#121212" }
 
     property var currentSeriesMap: ({})
+    // Visible window; series are trimmed to it so they never grow unbounded
+    property int windowMinutes: 60
 
     Component.onCompleted: {
-        bridge.fetchHistory("60")
+        // Locally recorded points first (via onHistoryDataChanged), then the server's full history
+        bridge.historyWindow(windowMinutes)
+        bridge.fetchHistory(String(windowMinutes))
         bridge.startHistoryStream()
     }
     
@@ -18,21 +22,37 @@ Page {
         bridge.stopHistoryStream()
     }
 
+    // Multi-grill panel: `bridge` was re-pointed at another controller
+    property QtObject boundBridge: bridge
+    onBoundBridgeChanged: {
+        bridge.historyWindow(windowMinutes)
+        bridge.fetchHistory(String(windowMinutes))
+    }
+
     Connections {
         target: bridge
         function onHistoryDataChanged(data) {
             updateGraph(data)
         }
+        function onHistoryViewportChanged(data) {
+            // Answer to refreshViewport(); series with no data in range are cleared by charts.fillSeries
+            for (var name in currentSeriesMap) {
+                bridge.charts.fillSeries(currentSeriesMap[name], name)
+            }
+        }
         function onHistoryPointChanged(pointData) {
             // pointData = { x: timestamp_ms, temps: { Grill: 200, ... } }
             var xVal = pointData.x || new Date().getTime()
             var temps = pointData.temps || pointData 
+            // Keep whatever the user zoomed/panned out to
+            var cutoff = Math.min(xVal - windowMinutes * 60000, axisX.min.getTime())
             
             for (var key in temps) {
                 if (currentSeriesMap[key]) {
                     var val = temps[key]
                     var series = currentSeriesMap[key]
                     series.append(xVal, val)
+                    trimSeries(series, cutoff)
                 }
             }
             
@@ -46,7 +66,28 @@ Page {
         }
     }
 
+    function trimSeries(series, cutoff) {
+        // Drop points that scrolled out of the window
+        var n = 0
+        while (n < series.count && series.at(n).x < cutoff) n++
+        if (n > 0) series.removePoints(0, n)
+    }
+
+    function refreshViewport() {
+        // Re-query the visible range at a resolution that fits the plot width (see onHistoryViewportChanged)
+        bridge.queryHistory(axisX.min.getTime(), axisX.max.getTime(), Math.max(100, Math.round(chart.plotArea.width)))
+    }
+
+    // Zoom / pan gestures settle before the viewport is re-queried
+    Timer {
+        id: viewportTimer
+        interval: 250
+        onTriggered: graphPage.refreshViewport()
+    }
+
     function updateGraph(seriesList) {
+        // seriesList = [{ name, count, minX, maxX, minY, maxY }]; points are
+        // bulk-loaded by bridge.charts.fillSeries, no per-point work in JS
         chart.removeAllSeries()
         currentSeriesMap = {}
 
@@ -59,7 +100,6 @@ Page {
         for (var i = 0; i < seriesList.length; i++) {
             var sData = seriesList[i]
             var sName = sData.name
-            var points = sData.points
             
             // Create Series
             var series = chart.createSeries(ChartView.SeriesTypeLine, sName, axisX, axisY)
@@ -77,21 +117,17 @@ Page {
                 series.style = Qt.DotLine
             }
             
-            for (var j = 0; j < points.length; j++) {
-                var p = points[j]
-                var xTs = p.x
-                var yVal = p.y
-                
-                series.append(xTs, yVal)
-                
+            bridge.charts.fillSeries(series, sName)
+            
+            if (sData.count > 0) {
                 if (!hasPoints) {
-                    minX = xTs; maxX = xTs; minY = yVal; maxY = yVal
+                    minX = sData.minX; maxX = sData.maxX; minY = sData.minY; maxY = sData.maxY
                     hasPoints = true
                 } else {
-                    if (xTs < minX) minX = xTs
-                    if (xTs > maxX) maxX = xTs
-                    if (yVal < minY) minY = yVal
-                    if (yVal > maxY) maxY = yVal
+                    minX = Math.min(minX, sData.minX)
+                    maxX = Math.max(maxX, sData.maxX)
+                    minY = Math.min(minY, sData.minY)
+                    maxY = Math.max(maxY, sData.maxY)
                 }
             }
             
@@ -134,14 +170,17 @@ Page {
             
             Button {
                 text: "Rafraîchir (60m)"
-                onClicked: bridge.fetchHistory("60")
+                onClicked: bridge.reloadHistory(String(graphPage.windowMinutes))
                 background: Rectangle { color: "#333"; radius: 5 }
                 contentItem: Text { text: parent.text; color: "white"; horizontalAlignment: Text.AlignHCenter; verticalAlignment: Text.AlignVCenter }
             }
 
             Button {
                 text: "Zoom Reset"
-                onClicked: chart.zoomReset()
+                onClicked: {
+                    chart.zoomReset()
+                    viewportTimer.restart()
+                }
                 background: Rectangle { color: "#333"; radius: 5 }
                 contentItem: Text { text: parent.text; color: "white"; horizontalAlignment: Text.AlignHCenter; verticalAlignment: Text.AlignVCenter }
             }
@@ -191,7 +230,7 @@ Page {
                     if (axisY.max > 600) axisY.max = 600
                 }
                 onPinchFinished: {
-                    // Verify bounds or snap back if needed
+                    viewportTimer.restart()
                 }
                 
                 // Pan support (Drag)
@@ -205,6 +244,7 @@ Page {
                         lastX = mouseX
                         lastY = mouseY
                     }
+                    onReleased: viewportTimer.restart()
                     
                     onPositionChanged: {
                         var dx = mouseX - lastX
@@ -59,4 +59,12 @@ QtObject {
     readonly property string settings_units: db["settings_units"] || "settings_units"
     readonly property string settings_server_title: db["settings_server_title"] || "settings_server_title"
     readonly property string settings_server_placeholder: db["settings_server_placeholder"] || "settings_server_placeholder"
+
+    // Connection
+    readonly property string conn_offline: db["conn_offline"] || "conn_offline"
+    readonly property string conn_probing: db["conn_probing"] || "conn_probing"
+    readonly property string grill_select_title: db["grill_select_title"] || "grill_select_title"
+
+    // Commands
+    readonly property string cmd_failed: db["cmd_failed"] || "cmd_failed"
 }
@@ -60,6 +60,40 @@ ApplicationWindow {
                 }
             }
 
+            // Active grill (multi-grill panel only): tap to switch
+            Rectangle {
+                visible: grills.model.count > 1
+                Layout.leftMargin: 15
+                implicitWidth: grillChipRow.implicitWidth + 20
+                implicitHeight: 40
+                radius: 20
+                color: "#1A1A1A"
+                border.color: bridge.stale ? "#FFB300" : "#333"
+
+                RowLayout {
+                    id: grillChipRow
+                    anchors.centerIn: parent
+                    spacing: 8
+                    Text {
+                        text: bridge.grillName
+                        color: textColor
+                        font.pixelSize: 18
+                        font.bold: true
+                    }
+                    Text {
+                        text: "\uf078" // Chevron down
+                        font.family: faFont.name
+                        font.pixelSize: 14
+                        color: inactiveColor
+                    }
+                }
+
+                MouseArea {
+                    anchors.fill: parent
+                    onClicked: grillPopup.open()
+                }
+            }
+
             Item { Layout.fillWidth: true }
             
             // CENTER: Hardware Icons & P-Mode
@@ -162,6 +196,24 @@ ApplicationWindow {
                         color: bridge.lidOpen ? "#D32F2F" : "#777" // Red if open, Gray if closed
                     }
                 }
+
+                // Server unreachable: values on screen are the last known ones
+                RowLayout {
+                    visible: bridge.stale
+                    spacing: 6
+                    Text {
+                        text: "\uf071" // Warning triangle
+                        font.family: faFont.name
+                        font.pixelSize: 22
+                        color: "#FFB300"
+                    }
+                    Text {
+                        text: bridge.connectionState === "probing" ? strings.conn_probing : strings.conn_offline
+                        color: "#FFB300"
+                        font.pixelSize: 18
+                        font.bold: true
+                    }
+                }
             }
             
             Item { Layout.fillWidth: true }
@@ -186,7 +238,7 @@ ApplicationWindow {
                     interval: 1000; running: true; repeat: true
                     onTriggered: {
                         if (bridge.startTime > 0) {
-                            var now = new Date().getTime() / 1000;
+                            var now = bridge.serverTime(); // startTime is on the server clock
                             chronoText.elapsedSeconds = Math.max(0, Math.floor(now - bridge.startTime));
                         } else {
                             chronoText.elapsedSeconds = 0;
@@ -324,9 +376,9 @@ ApplicationWindow {
             replaceExit: Transition { PropertyAnimation { property: "opacity"; from: 1; to: 0; duration: 200 } }
 
             // Define Components 
+            // Only the dashboard is compiled at start-up; the other pages are
+            // loaded by URL on first visit (Graph.qml pulls in QtCharts)
             Component { id: dashboardTab; Dashboard {} }
-            Component { id: graphTab; Graph {} }
-            Component { id: pelletTab; Pellet {} }
             Component { 
                 id: recipeTab
                 Item {
@@ -339,7 +391,6 @@ ApplicationWindow {
                     }
                 }
             }
-            Component { id: settingsTab; ControlPanel {} }
         }
     }
 
@@ -433,6 +484,158 @@ ApplicationWindow {
         }
     }
 
+    // Grill Selection Popup (multi-grill panel)
+    Popup {
+        id: grillPopup
+        parent: Overlay.overlay
+        x: Math.round((parent.width - width) / 2)
+        y: Math.round((parent.height - height) / 2)
+        width: 460
+        height: Math.min(380, grillList.contentHeight + 90)
+        modal: true
+        dim: true
+        enter: Transition { NumberAnimation { property: "opacity"; from: 0.0; to: 1.0; duration: 200 } }
+        exit: Transition { NumberAnimation { property: "opacity"; from: 1.0; to: 0.0; duration: 200 } }
+
+        background: Rectangle {
+            color: "#222"
+            border.color: window.primaryColor
+            border.width: 2
+            radius: 12
+        }
+
+        ColumnLayout {
+            anchors.fill: parent
+            anchors.margins: 20
+
+            Text {
+                text: strings.grill_select_title
+                color: window.primaryColor
+                font.pixelSize: 24
+                font.bold: true
+                Layout.alignment: Qt.AlignHCenter
+            }
+
+            ListView {
+                id: grillList
+                Layout.fillWidth: true
+                Layout.fillHeight: true
+                clip: true
+                spacing: 8
+                model: grills.model
+
+                // Roles: name, address, grillTemp, setPoint, mode, units, connectionState, active
+                delegate: Rectangle {
+                    width: grillList.width
+                    height: 60
+                    radius: 8
+                    color: model.active ? "#333" : "#2A2A2A"
+                    border.color: model.active ? window.accentColor : "#444"
+                    border.width: model.active ? 2 : 1
+
+                    property bool offline: model.connectionState === "offline" || model.connectionState === "probing"
+
+                    RowLayout {
+                        anchors.fill: parent
+                        anchors.leftMargin: 15
+                        anchors.rightMargin: 15
+                        spacing: 15
+
+                        ColumnLayout {
+                            spacing: 2
+                            Layout.fillWidth: true
+                            Text {
+                                text: model.name
+                                color: "white"
+                                font.pixelSize: 20
+                                font.bold: true
+                            }
+                            Text {
+                                text: offline ? strings.conn_offline : model.mode
+                                color: offline ? "#FFB300" : inactiveColor
+                                font.pixelSize: 14
+                            }
+                        }
+
+                        Text {
+                            text: model.grillTemp + "°" + model.units
+                            color: offline ? "#777" : "white"
+                            font.pixelSize: 26
+                            font.bold: true
+                        }
+                        Text {
+                            visible: model.setPoint > 0
+                            text: "/ " + model.setPoint + "°"
+                            color: inactiveColor
+                            font.pixelSize: 18
+                        }
+                    }
+
+                    MouseArea {
+                        anchors.fill: parent
+                        onClicked: {
+                            grills.setActive(index)
+                            grillPopup.close()
+                        }
+                    }
+                }
+            }
+        }
+    }
+
+    // Command Failed Toast (after the queue gave up; the value is already rolled back)
+    Popup {
+        id: commandToast
+        parent: Overlay.overlay
+        x: (parent.width - width) / 2
+        y: parent.height - height - 30
+        padding: 15
+        closePolicy: Popup.CloseOnPressOutside
+        background: Rectangle {
+            color: window.surfaceColor
+            border.color: window.accentColor
+            radius: 10
+        }
+
+        property string label: ""
+
+        Text {
+            text: window.strings.cmd_failed + ": " + commandToast.label
+            color: window.textColor
+            font.pixelSize: 18
+        }
+
+        Timer {
+            id: toastTimer
+            interval: 4000
+            onTriggered: commandToast.close()
+        }
+    }
+
+    Connections {
+        target: bridge
+        function onCommandFailed(label) {
+            commandToast.label = label
+            commandToast.open()
+            toastTimer.restart()
+        }
+    }
+
+    // Metrics overlay for field tuning (config.json "debug_overlay")
+    Loader {
+        active: bridge.debugOverlay
+        source: "DebugOverlay.qml"
+        anchors.right: parent.right
+        anchors.bottom: parent.bottom
+        anchors.margins: 8
+        z: 100
+    }
+
     // STATE TRACKING
     property int mainNavIndex: 0
+
+    // Lazily loaded pages (see StackView)
+    readonly property url graphTab: Qt.resolvedUrl("Graph.qml")
+    readonly property url pelletTab: Qt.resolvedUrl("Pellet.qml")
+    readonly property url settingsTab: Qt.resolvedUrl("ControlPanel.qml")
 }
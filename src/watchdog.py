@@ -0,0 +1,127 @@
+import collections
+import json
+import logging
+import os
+import sys
+import tempfile
+import threading
+import time
+import traceback
+
+log = logging.getLogger("pifire.watchdog")
+
+SRC_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+class StallWatchdog:
+    """Detects GUI thread stalls and records what the GUI thread was doing.
+
+    The GUI thread calls beat() from a timer every `interval_ms`. A helper
+    thread ("pifire-watchdog") checks the last beat every few ms; once a
+    beat is more than `threshold_ms` late, it captures the GUI thread's
+    Python stack (sys._current_frames) while the stall is still going on.
+    The next beat closes the stall.
+
+    Each stall record holds: wall time, duration, handler and where.
+    - ms is how late the heartbeat came, like "gui_lag_ms".
+    - handler is the outermost frame below the entry script, i.e. the slot,
+      signal handler or timer callback Qt called into. It is "qt" when no
+      Python frame was running, which points at QML, JS or rendering.
+    - where is the innermost frame of our code.
+    - stack is the full captured stack.
+    The last `capacity` stalls are kept in memory (stalls()). They are also
+    appended as JSON lines to `path`, in the temp dir by default (usually
+    RAM, so no flash writes). The file is capped at `max_bytes`, with one
+    previous generation (.1). Stall duration goes into `metrics` as
+    "gui_stall_ms" per handler.
+    """
+
+    def __init__(self, interval_ms=250, threshold_ms=200, capacity=50, path=None, max_bytes=256 * 1024, metrics=None):
+        self.interval = interval_ms / 1000.0
+        self.threshold = threshold_ms / 1000.0
+        self.path = path or os.path.join(tempfile.gettempdir(), "pifire-touch-stalls.jsonl")
+        self.max_bytes = max_bytes
+        self.metrics = metrics
+        self._gui_thread = threading.get_ident()
+        self._lock = threading.Lock()
+        self._stalls = collections.deque(maxlen=capacity)
+        self._last_beat = None # Armed by the first beat (the event loop is running)
+        self._current = None # Stall in progress: record, stack captured, duration pending
+        self._finished = [] # Closed by beat(), written out by the helper thread
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="pifire-watchdog", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread.is_alive():
+            self._thread.join(timeout=1.0)
+
+    def beat(self):
+        """GUI thread heartbeat; closes a stall in progress."""
+        now = time.monotonic()
+        with self._lock:
+            if self._current is not None:
+                stall = self._current
+                self._current = None
+                stall["ms"] = round((now - self._last_beat - self.interval) * 1000.0, 1)
+                self._finished.append(stall)
+            self._last_beat = now
+
+    def stalls(self):
+        """Recorded stalls, oldest first (stack included)."""
+        with self._lock:
+            return list(self._stalls)
+
+    def _run(self):
+        check = max(self.threshold / 4, 0.02)
+        while not self._stop.wait(check):
+            with self._lock:
+                late = self._last_beat is not None and self._current is None and \
+                    time.monotonic() - self._last_beat - self.interval > self.threshold
+            if late:
+                stall = self._capture()
+                with self._lock:
+                    # The beat may have come in while we were capturing: not a stall after all
+                    if time.monotonic() - self._last_beat - self.interval > self.threshold:
+                        self._current = stall
+            with self._lock:
+                finished, self._finished = self._finished, []
+                self._stalls.extend(finished)
+            for stall in finished:
+                self._record(stall)
+
+    def _capture(self):
+        frame = sys._current_frames().get(self._gui_thread)
+        # No source lines: no file reads here, and linecache does not grow with every new stack
+        stack = traceback.StackSummary.extract(traceback.walk_stack(frame), lookup_lines=False) if frame is not None else []
+        stack.reverse()
+        # Below the entry script (main.py, parked in app.exec()) are the frames Qt called into
+        entry = os.path.abspath(getattr(sys.modules.get("__main__"), "__file__", None) or os.path.join(SRC_DIR, "main.py"))
+        called = [f for f in stack if os.path.abspath(f.filename) != entry]
+        ours = [f for f in called if f.filename.startswith(SRC_DIR)] or called
+        return {
+            "time": round(time.time(), 3),
+            "ms": None,
+            "handler": _frame_name(called[0]) if called else "qt",
+            "where": f"{_frame_name(ours[-1])}:{ours[-1].lineno}" if ours else "",
+            "stack": [f"{os.path.basename(f.filename)}:{f.lineno} {f.name}" for f in stack],
+        }
+
+    def _record(self, stall):
+        log.warning("GUI thread stalled %.0f ms in %s (%s)", stall["ms"], stall["handler"], stall["where"] or "no Python frame")
+        if self.metrics is not None:
+            self.metrics.observe("gui_stall_ms", stall["ms"], stall["handler"])
+        try:
+            if os.path.exists(self.path) and os.path.getsize(self.path) >= self.max_bytes:
+                os.replace(self.path, self.path + ".1")
+            with open(self.path, "a") as f:
+                f.write(json.dumps(stall, separators=(",", ":")) + "\n")
+        except OSError as e:
+            log.warning("Stall log %s unavailable: %s", self.path, e)
+
+
+def _frame_name(frame):
+    return f"{os.path.splitext(os.path.basename(frame.filename))[0]}.{frame.name}"